@@ -1,12 +1,24 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import StreamingResponse
+from typing import List, Optional
 import logging
 
-from app.core.database import get_supabase, get_supabase_admin
+from app.core.database import get_supabase, get_supabase_admin, get_pool_metrics
+from app.core.cache import get_cache_stats
+from app.core.security import get_password_hash_metrics
 from app.core.auth import get_current_user
+from app.core.jobs import get_job, get_job_metrics
+from app.services.image_service import get_image_pipeline_metrics
+from app.services.payment_gateways import get_gateway_metrics
+from app.services.webhook_service import get_webhook_metrics
 from app.models.user import User
 from app.models.campaign import CampaignStatus
 from app.services.admin_service import AdminService
+from app.models.email_outbox import EmailStatus
+from app.services.ledger_service import LedgerService, RECONCILIATION_JOB
+from app.services.export_service import ExportService, ExportEntity, ExportFormat, MEDIA_TYPES
+from app.services.email_outbox_service import EmailOutboxService, get_email_worker_metrics
+from app.services.email_service import get_smtp_pool_metrics
 from app.core.exceptions import AuthorizationException
 
 router = APIRouter()
@@ -35,15 +47,52 @@ async def get_platform_stats(admin_user: User = Depends(get_admin_user)):
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@router.get("/metrics")
+async def get_metrics(admin_user: User = Depends(get_admin_user)):
+    """Get runtime performance metrics"""
+    return {
+        "db_pool": get_pool_metrics(),
+        "caches": get_cache_stats(),
+        "password_hashing": get_password_hash_metrics(),
+        "image_pipeline": get_image_pipeline_metrics(),
+        "email_outbox": get_email_worker_metrics(),
+        "smtp_pool": get_smtp_pool_metrics(),
+        "jobs": get_job_metrics(),
+        "payment_gateways": get_gateway_metrics(),
+        "payment_webhooks": get_webhook_metrics()
+    }
+
+
+@router.get("/export/{entity}")
+async def export_entity(
+    entity: ExportEntity,
+    format: ExportFormat = ExportFormat.CSV,
+    admin_user: User = Depends(get_admin_user)
+):
+    """Stream every payment, user or campaign as CSV or NDJSON"""
+    supabase = get_supabase_admin()
+    export_service = ExportService(supabase)
+    
+    return StreamingResponse(
+        export_service.stream(entity, format),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{entity.value}.{format.value}"'}
+    )
+
+
 @router.get("/campaigns")
-async def get_all_campaigns(admin_user: User = Depends(get_admin_user)):
-    """Get all campaigns for admin"""
+async def get_all_campaigns(
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=100),
+    admin_user: User = Depends(get_admin_user)
+):
+    """Get all campaigns for admin (paginated: pass `next_cursor` back as `cursor`)"""
     try:
         # Use admin client to bypass RLS for admin operations
         supabase = get_supabase_admin()
         admin_service = AdminService(supabase)
         
-        campaigns = await admin_service.get_all_campaigns()
+        campaigns = await admin_service.get_all_campaigns(cursor=cursor, limit=limit)
         return campaigns
     except Exception as e:
         logger.error(f"Error getting all campaigns: {e}")
@@ -112,13 +161,17 @@ async def set_campaign_status(
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/users")
-async def get_all_users(admin_user: User = Depends(get_admin_user)):
-    """Get all users for admin"""
+async def get_all_users(
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=100),
+    admin_user: User = Depends(get_admin_user)
+):
+    """Get all users for admin (paginated: pass `next_cursor` back as `cursor`)"""
     try:
         supabase = get_supabase_admin()
         admin_service = AdminService(supabase)
         
-        users = await admin_service.get_all_users()
+        users = await admin_service.get_all_users(cursor=cursor, limit=limit)
         return users
     except Exception as e:
         logger.error(f"Error getting all users: {e}")
@@ -213,13 +266,17 @@ async def admin_delete_campaign(
 
 # Payment Management
 @router.get("/payments")
-async def get_all_payments(admin_user: User = Depends(get_admin_user)):
-    """Get all payments for admin"""
+async def get_all_payments(
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=100),
+    admin_user: User = Depends(get_admin_user)
+):
+    """Get all payments for admin (paginated: pass `next_cursor` back as `cursor`)"""
     try:
         supabase = get_supabase_admin()
         admin_service = AdminService(supabase)
         
-        payments = await admin_service.get_all_payments()
+        payments = await admin_service.get_all_payments(cursor=cursor, limit=limit)
         return payments
     except Exception as e:
         logger.error(f"Error getting all payments: {e}")
@@ -311,13 +368,17 @@ async def admin_delete_company(
 
 # Milestone Management
 @router.get("/milestones")
-async def get_all_milestones(admin_user: User = Depends(get_admin_user)):
-    """Get all milestones for admin"""
+async def get_all_milestones(
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=100),
+    admin_user: User = Depends(get_admin_user)
+):
+    """Get all milestones for admin (paginated: pass `next_cursor` back as `cursor`)"""
     try:
         supabase = get_supabase_admin()
         admin_service = AdminService(supabase)
         
-        milestones = await admin_service.get_all_milestones()
+        milestones = await admin_service.get_all_milestones(cursor=cursor, limit=limit)
         return milestones
     except Exception as e:
         logger.error(f"Error getting all milestones: {e}")
@@ -367,13 +428,17 @@ async def admin_delete_milestone(
 
 # Receipt Management
 @router.get("/receipts")
-async def get_all_receipts(admin_user: User = Depends(get_admin_user)):
-    """Get all receipts for admin"""
+async def get_all_receipts(
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=100),
+    admin_user: User = Depends(get_admin_user)
+):
+    """Get all receipts for admin (paginated: pass `next_cursor` back as `cursor`)"""
     try:
         supabase = get_supabase_admin()
         admin_service = AdminService(supabase)
         
-        receipts = await admin_service.get_all_receipts()
+        receipts = await admin_service.get_all_receipts(cursor=cursor, limit=limit)
         return receipts
     except Exception as e:
         logger.error(f"Error getting all receipts: {e}")
@@ -402,13 +467,17 @@ async def admin_delete_receipt(
 
 # Referral Management
 @router.get("/referrals")
-async def get_all_referrals(admin_user: User = Depends(get_admin_user)):
-    """Get all referrals for admin"""
+async def get_all_referrals(
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=100),
+    admin_user: User = Depends(get_admin_user)
+):
+    """Get all referrals for admin (paginated: pass `next_cursor` back as `cursor`)"""
     try:
         supabase = get_supabase_admin()
         admin_service = AdminService(supabase)
         
-        referrals = await admin_service.get_all_referrals()
+        referrals = await admin_service.get_all_referrals(cursor=cursor, limit=limit)
         return referrals
     except Exception as e:
         logger.error(f"Error getting all referrals: {e}")
@@ -458,13 +527,17 @@ async def admin_delete_referral(
 
 # Shoutout Management
 @router.get("/shoutouts")
-async def get_all_shoutouts(admin_user: User = Depends(get_admin_user)):
-    """Get all shoutouts for admin"""
+async def get_all_shoutouts(
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=100),
+    admin_user: User = Depends(get_admin_user)
+):
+    """Get all shoutouts for admin (paginated: pass `next_cursor` back as `cursor`)"""
     try:
         supabase = get_supabase_admin()
         admin_service = AdminService(supabase)
         
-        shoutouts = await admin_service.get_all_shoutouts()
+        shoutouts = await admin_service.get_all_shoutouts(cursor=cursor, limit=limit)
         return shoutouts
     except Exception as e:
         logger.error(f"Error getting all shoutouts: {e}")
@@ -510,3 +583,78 @@ async def admin_delete_shoutout(
     except Exception as e:
         logger.error(f"Error deleting shoutout: {e}")
         raise HTTPException(status_code=400, detail=str(e))
+
+
+# Email Outbox
+@router.get("/emails")
+async def get_outbox_emails(
+    status: Optional[EmailStatus] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=100),
+    admin_user: User = Depends(get_admin_user)
+):
+    """Get queued, sent and dead-lettered emails (paginated: pass `next_cursor` back as `cursor`)"""
+    try:
+        supabase = get_supabase_admin()
+        outbox = EmailOutboxService(supabase)
+        
+        return await outbox.get_emails(status=status, cursor=cursor, limit=limit)
+    except Exception as e:
+        logger.error(f"Error getting outbox emails: {e}")
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/emails/{email_id}")
+async def get_outbox_email(
+    email_id: int,
+    admin_user: User = Depends(get_admin_user)
+):
+    """Get the delivery status of one outbox email"""
+    supabase = get_supabase_admin()
+    outbox = EmailOutboxService(supabase)
+    
+    email = await outbox.get_email(email_id)
+    if not email:
+        raise HTTPException(status_code=404, detail="Email not found")
+    return email
+
+
+@router.post("/emails/{email_id}/retry")
+async def retry_outbox_email(
+    email_id: int,
+    admin_user: User = Depends(get_admin_user)
+):
+    """Requeue a dead-lettered email"""
+    supabase = get_supabase_admin()
+    outbox = EmailOutboxService(supabase)
+    
+    result = await outbox.requeue(email_id)
+    if not result:
+        raise HTTPException(status_code=400, detail="Only dead-lettered emails can be retried")
+    
+    return {"message": "Email requeued"}
+
+
+@router.post("/reconciliation", status_code=status.HTTP_202_ACCEPTED)
+async def start_reconciliation(
+    dry_run: bool = False,
+    admin_user: User = Depends(get_admin_user)
+):
+    """Recompute campaign totals from completed payments and correct drift (runs in the background)"""
+    supabase = get_supabase_admin()
+    ledger_service = LedgerService(supabase)
+    
+    job = ledger_service.start_reconciliation(admin_user.id, dry_run=dry_run)
+    return job.to_dict()
+
+
+@router.get("/reconciliation/{job_id}")
+async def get_reconciliation(
+    job_id: str,
+    admin_user: User = Depends(get_admin_user)
+):
+    """Get progress, or the discrepancy report once finished, of a reconciliation run"""
+    job = get_job(job_id, kind=RECONCILIATION_JOB)
+    if not job:
+        raise HTTPException(status_code=404, detail="Reconciliation job not found")
+    return job.to_dict()
@@ -3,15 +3,17 @@ from pydantic import BaseModel, EmailStr, constr
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 from typing import Optional
+from datetime import datetime
 import logging
 
 from app.core.database import get_supabase, get_supabase_admin
-from app.core.security import verify_password, get_password_hash, create_access_token, verify_token
+from app.core.security import verify_password_async, get_password_hash_async, create_access_token, verify_token
 from app.core.config import settings
 from app.core.auth import get_current_user
 from app.models.user import User, UserCreate, UserLogin, UserResponse, UserProfile, UserRole
-from app.services.user_service import UserService
-from app.core.exceptions import AuthenticationException, ValidationException
+from app.services.user_service import UserService, invalidate_user_cache
+from app.services.email_templates import render_email
+from app.core.exceptions import AuthenticationException, ValidationException, ServiceBusyException
 from app.core.error_handler import handle_validation_error, handle_attribute_error, create_safe_user_response
 
 router = APIRouter()
@@ -91,7 +93,6 @@ async def register(user_data: UserCreate):
         try:
             from app.services.otp_service import OTPService
             from app.services.email_service import EmailService
-            from app.services.email_templates import get_otp_verification_email_html, get_otp_verification_email_text
             
             otp_service = OTPService(supabase)
             email_service = EmailService()
@@ -101,8 +102,7 @@ async def register(user_data: UserCreate):
             
             # Send OTP email
             user_name = f"{user.first_name} {user.last_name}"
-            html_content = get_otp_verification_email_html(user_name, otp_data["otp_code"])
-            text_content = get_otp_verification_email_text(user_name, otp_data["otp_code"])
+            html_content, text_content = render_email("otp_verification", user_name=user_name, otp_code=otp_data["otp_code"])
             
             email_sent = await email_service.send_email(
                 user.email,
@@ -131,6 +131,8 @@ async def register(user_data: UserCreate):
             is_verified=user.is_verified,
             created_at=user.created_at
         )
+    except ServiceBusyException:
+        raise
     except Exception as e:
         logger.error(f"Registration error: {e}")
         raise HTTPException(status_code=400, detail=str(e))
@@ -147,7 +149,7 @@ async def login(login_data: UserLogin):
         # If admin credentials are configured, allow admin-only login via saved creds
         if settings.ADMIN_EMAIL and settings.ADMIN_PASSWORD_HASH and login_data.email.lower() == settings.ADMIN_EMAIL.lower():
             # Verify password against stored admin hash
-            if not verify_password(login_data.password, settings.ADMIN_PASSWORD_HASH):
+            if not await verify_password_async(login_data.password, settings.ADMIN_PASSWORD_HASH):
                 raise AuthenticationException("Invalid email or password")
             # Build a minimal admin user response (ID -1 indicates config admin)
             access_token = create_access_token(data={"sub": "-1"})
@@ -172,7 +174,7 @@ async def login(login_data: UserLogin):
             raise AuthenticationException("Invalid email or password")
         
         # Verify password
-        if not user_internal.password_hash or not verify_password(login_data.password, user_internal.password_hash):
+        if not user_internal.password_hash or not await verify_password_async(login_data.password, user_internal.password_hash):
             raise AuthenticationException("Invalid email or password")
         
         # Check if user is verified
@@ -189,47 +191,13 @@ async def login(login_data: UserLogin):
             user_name = f"{user.first_name} {user.last_name}"
             
             # Create login notification email
-            html_content = f"""
-            <html>
-            <body style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto; padding: 20px;">
-                <div style="background-color: #f8f9fa; padding: 20px; border-radius: 10px;">
-                    <h2 style="color: #4F46E5;">🔐 Login Notification</h2>
-                    <p>Hello {user_name},</p>
-                    <p>You have successfully logged into your Fundraising Platform account.</p>
-                    <p><strong>Login Details:</strong></p>
-                    <ul>
-                        <li>Email: {user.email}</li>
-                        <li>Role: {user.role.title()}</li>
-                        <li>Time: {__import__('datetime').datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')} UTC</li>
-                    </ul>
-                    <p>If this wasn't you, please contact support immediately.</p>
-                    <hr style="margin: 30px 0; border: none; border-top: 1px solid #dee2e6;">
-                    <p style="color: #6c757d; font-size: 14px;">
-                        Best regards,<br>
-                        The Fundraising Platform Team
-                    </p>
-                </div>
-            </body>
-            </html>
-            """
-            
-            text_content = f"""
-            Login Notification
-            
-            Hello {user_name},
-            
-            You have successfully logged into your Fundraising Platform account.
-            
-            Login Details:
-            - Email: {user.email}
-            - Role: {user.role.title()}
-            - Time: {__import__('datetime').datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')} UTC
-            
-            If this wasn't you, please contact support immediately.
-            
-            Best regards,
-            The Fundraising Platform Team
-            """
+            html_content, text_content = render_email(
+                "login_notification",
+                user_name=user_name,
+                user_email=user.email,
+                role=user.role,
+                login_time=datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
+            )
             
             await email_service.send_email(
                 user.email,
@@ -250,6 +218,8 @@ async def login(login_data: UserLogin):
             "token_type": "bearer",
             "user": create_safe_user_response(user)
         }
+    except ServiceBusyException:
+        raise
     except Exception as e:
         logger.error(f"Login error: {e}")
         raise HTTPException(status_code=401, detail=str(e))
@@ -322,56 +292,18 @@ async def reset_password(payload: ResetPasswordRequest):
                 email_service = EmailService()
                 
                 # Get user info for the email
-                user_result = supabase.table("users").select("*").eq("reset_token", payload.token).execute()
+                user_result = await supabase.table("users").select("*").eq("reset_token", payload.token).execute()
                 if user_result.data:
                     user_data = user_result.data[0]
                     user_name = f"{user_data['first_name']} {user_data['last_name']}"
                     user_email = user_data['email']
                     
-                    html_content = f"""
-                    <html>
-                    <body style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto; padding: 20px;">
-                        <div style="background-color: #f8f9fa; padding: 20px; border-radius: 10px;">
-                            <h2 style="color: #4F46E5;">✅ Password Reset Successful</h2>
-                            <p>Hello {user_name},</p>
-                            <p>Your password has been successfully reset for your Fundraising Platform account.</p>
-                            <p><strong>Security Details:</strong></p>
-                            <ul>
-                                <li>Email: {user_email}</li>
-                                <li>Reset Time: {__import__('datetime').datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')} UTC</li>
-                                <li>Status: Password successfully changed</li>
-                            </ul>
-                            <p>If you didn't make this change, please contact support immediately.</p>
-                            <p>You can now log in with your new password.</p>
-                            <hr style="margin: 30px 0; border: none; border-top: 1px solid #dee2e6;">
-                            <p style="color: #6c757d; font-size: 14px;">
-                                Best regards,<br>
-                                The Fundraising Platform Team
-                            </p>
-                        </div>
-                    </body>
-                    </html>
-                    """
-                    
-                    text_content = f"""
-                    Password Reset Successful
-                    
-                    Hello {user_name},
-                    
-                    Your password has been successfully reset for your Fundraising Platform account.
-                    
-                    Security Details:
-                    - Email: {user_email}
-                    - Reset Time: {__import__('datetime').datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')} UTC
-                    - Status: Password successfully changed
-                    
-                    If you didn't make this change, please contact support immediately.
-                    
-                    You can now log in with your new password.
-                    
-                    Best regards,
-                    The Fundraising Platform Team
-                    """
+                    html_content, text_content = render_email(
+                        "password_reset_confirmation",
+                        user_name=user_name,
+                        user_email=user_email,
+                        reset_time=datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
+                    )
                     
                     await email_service.send_email(
                         user_email,
@@ -411,7 +343,6 @@ async def forgot_password_otp(payload: OTPRequest):
         supabase = get_supabase()
         from app.services.otp_service import OTPService
         from app.services.email_service import EmailService
-        from app.services.email_templates import get_otp_verification_email_html, get_otp_verification_email_text
 
         otp_service = OTPService(supabase)
         email_service = EmailService()
@@ -428,8 +359,7 @@ async def forgot_password_otp(payload: OTPRequest):
 
         # Send email with OTP
         user_name = f"{user.first_name} {user.last_name}".strip() or "User"
-        html_content = get_otp_verification_email_html(user_name, otp_data["otp_code"])  # reuse template
-        text_content = get_otp_verification_email_text(user_name, otp_data["otp_code"])  # reuse template
+        html_content, text_content = render_email("otp_verification", user_name=user_name, otp_code=otp_data["otp_code"])
 
         await email_service.send_email(
             payload.email,
@@ -464,11 +394,11 @@ async def reset_password_otp(payload: OTPResetRequest):
             return {"message": "Password reset successfully"}
 
         # Update password
-        from app.core.security import get_password_hash
-        supabase.table("users").update({
-            "password_hash": get_password_hash(payload.new_password),
+        await supabase.table("users").update({
+            "password_hash": await get_password_hash_async(payload.new_password),
             "updated_at": __import__('datetime').datetime.utcnow().isoformat()
         }).eq("id", user_internal.id).execute()
+        invalidate_user_cache(user_internal.id)
 
         return {"message": "Password reset successfully"}
     except HTTPException:
@@ -501,10 +431,11 @@ async def verify_otp(payload: VerifyOTPRequest):
         if payload.purpose == "email_verification":
             user = await user_service.get_user_internal_by_email(payload.email)
             if user:
-                supabase.table("users").update({
+                await supabase.table("users").update({
                     "is_verified": True,
                     "updated_at": __import__('datetime').datetime.utcnow().isoformat()
                 }).eq("id", user.id).execute()
+                invalidate_user_cache(user.id)
 
         return {"message": "OTP verified"}
     except HTTPException:
@@ -529,7 +460,6 @@ async def resend_verification(payload: ResendVerificationRequest):
         supabase = get_supabase_admin()
         from app.services.otp_service import OTPService
         from app.services.email_service import EmailService
-        from app.services.email_templates import get_otp_verification_email_html, get_otp_verification_email_text
         from app.services.user_service import UserService
 
         user_service = UserService(supabase)
@@ -543,8 +473,7 @@ async def resend_verification(payload: ResendVerificationRequest):
 
         email_service = EmailService()
         user_name = f"{user.first_name} {user.last_name}".strip() or "User"
-        html_content = get_otp_verification_email_html(user_name, otp["otp_code"]) 
-        text_content = get_otp_verification_email_text(user_name, otp["otp_code"]) 
+        html_content, text_content = render_email("otp_verification", user_name=user_name, otp_code=otp["otp_code"])
 
         await email_service.send_email(
             payload.email,
@@ -1,6 +1,7 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File, Form, Response
 from typing import List, Optional
 from datetime import datetime, timedelta
+import asyncio
 import logging
 
 from app.core.database import get_supabase, get_supabase_admin
@@ -9,10 +10,14 @@ from app.models.user import UserCreate, UserRole
 import secrets
 from app.core.auth import get_current_user
 from app.models.user import User
-from app.models.campaign import Campaign, CampaignCreate, CampaignUpdate, CampaignResponse, CampaignStatus
+from app.models.campaign import Campaign, CampaignCreate, CampaignUpdate, CampaignResponse, CampaignStatus, CampaignUpdateNotice
 from app.services.campaign_service import CampaignService
 from app.services.image_service import image_service
-from app.core.exceptions import NotFoundException, ValidationException, CampaignException
+from app.services.email_templates import render_email
+from app.services.campaign_update_service import CampaignUpdateService, CAMPAIGN_UPDATE_JOB, verify_unsubscribe_token
+from app.core.jobs import get_job
+from app.core.exceptions import NotFoundException, ValidationException, CampaignException, ServiceBusyException
+from app.core.pagination import NEXT_CURSOR_HEADER
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -67,64 +72,15 @@ async def create_campaign(
             email_service = EmailService()
             user_name = f"{current_user.first_name} {current_user.last_name}"
             
-            html_content = f"""
-            <html>
-            <body style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto; padding: 20px;">
-                <div style="background-color: #f8f9fa; padding: 20px; border-radius: 10px;">
-                    <h2 style="color: #4F46E5;">🎉 Campaign Created Successfully!</h2>
-                    <p>Hello {user_name},</p>
-                    <p>Congratulations! Your fundraising campaign has been created successfully.</p>
-                    <p><strong>Campaign Details:</strong></p>
-                    <ul>
-                        <li>Title: {campaign.title}</li>
-                        <li>Goal: ${campaign.goal_amount}</li>
-                        <li>Duration: {campaign.duration_months} months</li>
-                        <li>Status: {campaign.status.title()}</li>
-                        <li>Created: {campaign.created_at.strftime('%Y-%m-%d %H:%M:%S')} UTC</li>
-                    </ul>
-                    <p><strong>Next Steps:</strong></p>
-                    <ol>
-                        <li>Share your campaign with friends and family</li>
-                        <li>Use social media to spread the word</li>
-                        <li>Update your campaign regularly</li>
-                        <li>Thank your supporters</li>
-                    </ol>
-                    <p>Good luck with your fundraising journey!</p>
-                    <hr style="margin: 30px 0; border: none; border-top: 1px solid #dee2e6;">
-                    <p style="color: #6c757d; font-size: 14px;">
-                        Best regards,<br>
-                        The Fundraising Platform Team
-                    </p>
-                </div>
-            </body>
-            </html>
-            """
-            
-            text_content = f"""
-            Campaign Created Successfully!
-            
-            Hello {user_name},
-            
-            Congratulations! Your fundraising campaign has been created successfully.
-            
-            Campaign Details:
-            - Title: {campaign.title}
-            - Goal: ${campaign.goal_amount}
-            - Duration: {campaign.duration_months} months
-            - Status: {campaign.status.title()}
-            - Created: {campaign.created_at.strftime('%Y-%m-%d %H:%M:%S')} UTC
-            
-            Next Steps:
-            1. Share your campaign with friends and family
-            2. Use social media to spread the word
-            3. Update your campaign regularly
-            4. Thank your supporters
-            
-            Good luck with your fundraising journey!
-            
-            Best regards,
-            The Fundraising Platform Team
-            """
+            html_content, text_content = render_email(
+                "campaign_created",
+                user_name=user_name,
+                campaign_title=campaign.title,
+                goal_amount=campaign.goal_amount,
+                duration_months=campaign.duration_months,
+                status=campaign.status,
+                created_at=campaign.created_at.strftime('%Y-%m-%d %H:%M:%S')
+            )
             
             await email_service.send_email(
                 current_user.email,
@@ -193,6 +149,8 @@ async def create_campaign_with_image(
                 )
                 final_image_url = image_info["url"]
                 logger.info(f"Image uploaded for campaign: {final_image_url}")
+            except ServiceBusyException:
+                raise
             except Exception as e:
                 logger.error(f"Failed to upload image: {e}")
                 raise HTTPException(status_code=400, detail=f"Failed to upload image: {str(e)}")
@@ -266,6 +224,8 @@ async def create_campaign_with_image(
             days_remaining=await campaign_service.calculate_days_remaining(campaign),
             donor_count=await campaign_service.get_donor_count(campaign.id)
         )
+    except ServiceBusyException:
+        raise
     except Exception as e:
         logger.error(f"Error creating campaign with image: {e}")
         raise HTTPException(status_code=400, detail=str(e))
@@ -273,24 +233,33 @@ async def create_campaign_with_image(
 
 @router.get("/", response_model=List[CampaignResponse])
 async def get_campaigns(
+    response: Response,
     status: Optional[CampaignStatus] = None,
     category: Optional[str] = None,
     featured: Optional[bool] = None,
-    limit: int = Query(20, le=100),
-    offset: int = Query(0, ge=0)
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None
 ):
-    """Get all campaigns with optional filters"""
+    """Get campaigns with optional filters, newest first.
+    
+    Pass the `X-Next-Cursor` response header back as `cursor` to fetch the next page.
+    """
     try:
         supabase = get_supabase()
         campaign_service = CampaignService(supabase)
         
-        campaigns = await campaign_service.get_campaigns(
+        page = await campaign_service.get_campaigns(
             status=status,
             category=category,
             featured=featured,
             limit=limit,
-            offset=offset
+            cursor=cursor
         )
+        campaigns = page["items"]
+        if page["next_cursor"]:
+            response.headers[NEXT_CURSOR_HEADER] = page["next_cursor"]
+        
+        donor_counts = await campaign_service.get_donor_counts([campaign.id for campaign in campaigns])
         
         campaign_responses = []
         for campaign in campaigns:
@@ -315,7 +284,7 @@ async def get_campaigns(
                 updated_at=campaign.updated_at,
                 progress_percentage=float(campaign.current_amount / campaign.goal_amount * 100),
                 days_remaining=await campaign_service.calculate_days_remaining(campaign),
-                donor_count=await campaign_service.get_donor_count(campaign.id)
+                donor_count=donor_counts.get(campaign.id, 0)
             ))
         
         return campaign_responses
@@ -331,7 +300,11 @@ async def get_campaign(campaign_id: int):
         supabase = get_supabase()
         campaign_service = CampaignService(supabase)
         
-        campaign = await campaign_service.get_campaign_by_id(campaign_id)
+        # Campaign and donor count are independent lookups; fetch them concurrently
+        campaign, donor_count = await asyncio.gather(
+            campaign_service.get_campaign_by_id(campaign_id),
+            campaign_service.get_donor_count(campaign_id)
+        )
         if not campaign:
             raise NotFoundException("Campaign not found")
         
@@ -356,7 +329,7 @@ async def get_campaign(campaign_id: int):
             updated_at=campaign.updated_at,
             progress_percentage=float(campaign.current_amount / campaign.goal_amount * 100),
             days_remaining=await campaign_service.calculate_days_remaining(campaign),
-            donor_count=await campaign_service.get_donor_count(campaign.id)
+            donor_count=donor_count
         )
     except Exception as e:
         logger.error(f"Error getting campaign: {e}")
@@ -467,6 +440,62 @@ async def start_campaign(
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@router.post("/{campaign_id}/updates", status_code=status.HTTP_202_ACCEPTED)
+async def send_campaign_update(
+    campaign_id: int,
+    notice: CampaignUpdateNotice,
+    current_user: User = Depends(get_current_user)
+):
+    """Email an update to every donor of a campaign (runs in the background)"""
+    try:
+        supabase = get_supabase_admin()
+        campaign_service = CampaignService(supabase)
+        
+        # Check if user owns the campaign or is admin
+        campaign = await campaign_service.get_campaign_by_id(campaign_id)
+        if not campaign:
+            raise NotFoundException("Campaign not found")
+        
+        if campaign.user_id != current_user.id and current_user.role != "admin":
+            raise HTTPException(status_code=403, detail="Not authorized to send updates for this campaign")
+        
+        update_service = CampaignUpdateService(supabase)
+        job = update_service.start_fan_out(campaign, notice.message, current_user.id, notice.subject)
+        return job.to_dict()
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error starting campaign update: {e}")
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/{campaign_id}/updates/{job_id}")
+async def get_campaign_update_progress(
+    campaign_id: int,
+    job_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    """Get progress and throughput of a campaign update send"""
+    job = get_job(job_id, kind=CAMPAIGN_UPDATE_JOB)
+    if not job or (job.owner_id != current_user.id and current_user.role != "admin"):
+        raise HTTPException(status_code=404, detail="Update job not found")
+    return job.to_dict()
+
+
+@router.get("/updates/unsubscribe")
+async def unsubscribe_from_updates(email: str, token: str):
+    """Stop campaign update emails to an address (one-click link in every update)"""
+    if not verify_unsubscribe_token(email, token):
+        raise HTTPException(status_code=400, detail="Invalid unsubscribe link")
+    
+    supabase = get_supabase_admin()
+    update_service = CampaignUpdateService(supabase)
+    if not await update_service.unsubscribe(email):
+        raise HTTPException(status_code=400, detail="Failed to unsubscribe")
+    
+    return {"message": "You will no longer receive campaign update emails"}
+
+
 @router.get("/user/{user_id}", response_model=List[CampaignResponse])
 async def get_user_campaigns(
     user_id: int,
@@ -483,6 +512,8 @@ async def get_user_campaigns(
         
         campaigns = await campaign_service.get_user_campaigns(user_id)
         
+        donor_counts = await campaign_service.get_donor_counts([campaign.id for campaign in campaigns])
+        
         campaign_responses = []
         for campaign in campaigns:
             campaign_responses.append(CampaignResponse(
@@ -506,7 +537,7 @@ async def get_user_campaigns(
                 updated_at=campaign.updated_at,
                 progress_percentage=float(campaign.current_amount / campaign.goal_amount * 100),
                 days_remaining=await campaign_service.calculate_days_remaining(campaign),
-                donor_count=await campaign_service.get_donor_count(campaign.id)
+                donor_count=donor_counts.get(campaign.id, 0)
             ))
         
         return campaign_responses
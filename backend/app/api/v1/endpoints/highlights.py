@@ -7,7 +7,7 @@ from app.core.auth import get_current_user
 from app.models.user import User
 from app.services.student_highlight_service import StudentHighlightService
 from app.services.image_service import image_service
-from app.core.exceptions import NotFoundException, ValidationException
+from app.core.exceptions import NotFoundException, ValidationException, ServiceBusyException
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -110,6 +110,8 @@ async def create_student_highlight(
                 )
                 final_image_url = image_info["url"]
                 logger.info(f"Image uploaded for highlight: {final_image_url}")
+            except ServiceBusyException:
+                raise
             except Exception as e:
                 logger.error(f"Failed to upload image: {e}")
                 raise HTTPException(status_code=400, detail=f"Failed to upload image: {str(e)}")
@@ -126,6 +128,8 @@ async def create_student_highlight(
             raise ValidationException("Failed to create student highlight")
         
         return {"message": "Student highlight created successfully"}
+    except ServiceBusyException:
+        raise
     except Exception as e:
         logger.error(f"Error creating student highlight: {e}")
         raise HTTPException(status_code=400, detail=str(e))
@@ -7,8 +7,9 @@ from app.core.database import get_supabase
 from app.core.auth import get_current_user
 from app.models.user import User
 from app.services.otp_service import OTPService
+from app.services.user_service import invalidate_user_cache
 from app.services.email_service import EmailService
-from app.services.email_templates import get_otp_verification_email_html, get_otp_verification_email_text
+from app.services.email_templates import render_email
 from app.core.exceptions import ValidationException
 
 router = APIRouter()
@@ -50,7 +51,7 @@ async def send_otp(request: OTPRequest):
         otp_service = OTPService(supabase)
         
         # Check if user exists and is not verified
-        user_result = supabase.table("users").select("*").eq("email", request.email.lower()).execute()
+        user_result = await supabase.table("users").select("*").eq("email", request.email.lower()).execute()
         
         if not user_result.data:
             raise ValidationException("User not found")
@@ -68,8 +69,7 @@ async def send_otp(request: OTPRequest):
             email_service = EmailService()
             user_name = f"{user_data['first_name']} {user_data['last_name']}"
             
-            html_content = get_otp_verification_email_html(user_name, otp_data["otp_code"])
-            text_content = get_otp_verification_email_text(user_name, otp_data["otp_code"])
+            html_content, text_content = render_email("otp_verification", user_name=user_name, otp_code=otp_data["otp_code"])
             
             email_sent = await email_service.send_email(
                 request.email,
@@ -112,10 +112,12 @@ async def verify_otp(request: OTPVerificationRequest):
         
         if is_valid:
             # Update user verification status
-            supabase.table("users").update({
+            result = await supabase.table("users").update({
                 "is_verified": True,
                 "updated_at": __import__('datetime').datetime.utcnow().isoformat()
             }).eq("email", request.email.lower()).execute()
+            for row in result.data:
+                invalidate_user_cache(row["id"])
             
             logger.info(f"Email verified successfully for {request.email}")
             
@@ -148,7 +150,7 @@ async def resend_otp(request: OTPResendRequest):
         otp_service = OTPService(supabase)
         
         # Check if user exists and is not verified
-        user_result = supabase.table("users").select("*").eq("email", request.email.lower()).execute()
+        user_result = await supabase.table("users").select("*").eq("email", request.email.lower()).execute()
         
         if not user_result.data:
             raise ValidationException("User not found")
@@ -166,8 +168,7 @@ async def resend_otp(request: OTPResendRequest):
             email_service = EmailService()
             user_name = f"{user_data['first_name']} {user_data['last_name']}"
             
-            html_content = get_otp_verification_email_html(user_name, otp_data["otp_code"])
-            text_content = get_otp_verification_email_text(user_name, otp_data["otp_code"])
+            html_content, text_content = render_email("otp_verification", user_name=user_name, otp_code=otp_data["otp_code"])
             
             email_sent = await email_service.send_email(
                 request.email,
@@ -204,7 +205,7 @@ async def get_otp_status(email: str):
         otp_service = OTPService(supabase)
         
         # Check if user exists
-        user_result = supabase.table("users").select("is_verified").eq("email", email.lower()).execute()
+        user_result = await supabase.table("users").select("is_verified").eq("email", email.lower()).execute()
         
         if not user_result.data:
             raise ValidationException("User not found")
@@ -1,13 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response, Header
+from fastapi.responses import StreamingResponse
 from typing import List, Optional
 import logging
 
-from app.core.database import get_supabase
+from app.core.config import settings
+from app.core.database import get_supabase, get_supabase_admin
 from app.core.auth import get_current_user, get_current_user_optional
 from app.models.user import User
 from app.models.payment import Payment, PaymentCreate, PaymentResponse, PaymentStatus, PaymentMethod
-from app.services.payment_service import PaymentService
+from app.services.payment_service import PaymentService, PAYMENT_PROCESSING_JOB
+from app.services.email_templates import render_email
+from app.services.payment_webhooks import SUPPORTED_GATEWAYS, parse_webhook, verify_webhook
+from app.services.webhook_service import WebhookService, record_rejected_webhook
 from app.core.exceptions import NotFoundException, ValidationException, PaymentException
+from app.core.idempotency import IDEMPOTENCY_KEY_HEADER, fingerprint_request, run_idempotent
+from app.core.jobs import Job, get_job, stream_job_events
+from app.core.pagination import NEXT_CURSOR_HEADER
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -16,9 +24,23 @@ logger = logging.getLogger(__name__)
 @router.post("/", response_model=PaymentResponse)
 async def create_payment(
     payment_data: PaymentCreate,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, alias=IDEMPOTENCY_KEY_HEADER),
     current_user: Optional[User] = Depends(get_current_user)
 ):
-    """Create a new payment/donation"""
+    """Create a new payment/donation (retries with the same `Idempotency-Key` replay the first result)"""
+    user_id = current_user.id if current_user else None
+    return await run_idempotent(
+        idempotency_key,
+        f"create_payment:{user_id}",
+        fingerprint_request(payment_data.model_dump_json()),
+        lambda: _create_payment(payment_data, current_user),
+        response
+    )
+
+
+async def _create_payment(payment_data: PaymentCreate, current_user: Optional[User]) -> PaymentResponse:
+    """Create a payment and send the donor a confirmation email"""
     try:
         supabase = get_supabase()
         payment_service = PaymentService(supabase)
@@ -36,13 +58,13 @@ async def create_payment(
             email_service = EmailService()
             
             # Get campaign details for the email
-            campaign_result = supabase.table("campaigns").select("title, user_id").eq("id", payment.campaign_id).execute()
+            campaign_result = await supabase.table("campaigns").select("title, user_id").eq("id", payment.campaign_id).execute()
             if campaign_result.data:
                 campaign_title = campaign_result.data[0]["title"]
                 campaign_owner_id = campaign_result.data[0]["user_id"]
                 
                 # Get campaign owner details
-                owner_result = supabase.table("users").select("first_name, last_name").eq("id", campaign_owner_id).execute()
+                owner_result = await supabase.table("users").select("first_name, last_name").eq("id", campaign_owner_id).execute()
                 if owner_result.data:
                     owner_name = f"{owner_result.data[0]['first_name']} {owner_result.data[0]['last_name']}"
                 else:
@@ -50,57 +72,15 @@ async def create_payment(
                 
                 donor_name = payment.donor_name or "Anonymous Donor"
                 
-                html_content = f"""
-                <html>
-                <body style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto; padding: 20px;">
-                    <div style="background-color: #f8f9fa; padding: 20px; border-radius: 10px;">
-                        <h2 style="color: #4F46E5;">💝 Thank You for Your Donation!</h2>
-                        <p>Hello {donor_name},</p>
-                        <p>Thank you for your generous donation to support <strong>{campaign_title}</strong>!</p>
-                        <p><strong>Donation Details:</strong></p>
-                        <ul>
-                            <li>Amount: ${payment.amount}</li>
-                            <li>Campaign: {campaign_title}</li>
-                            <li>Campaign Owner: {owner_name}</li>
-                            <li>Payment Method: {payment.method.replace('_', ' ').title()}</li>
-                            <li>Date: {payment.created_at.strftime('%Y-%m-%d %H:%M:%S')} UTC</li>
-                        </ul>
-                        <p>Your support makes a real difference in helping students achieve their goals.</p>
-                        <p>A receipt has been generated and is available for your records.</p>
-                        <p>Thank you for supporting student fundraisers!</p>
-                        <hr style="margin: 30px 0; border: none; border-top: 1px solid #dee2e6;">
-                        <p style="color: #6c757d; font-size: 14px;">
-                            Best regards,<br>
-                            The Fundraising Platform Team
-                        </p>
-                    </div>
-                </body>
-                </html>
-                """
-                
-                text_content = f"""
-                Thank You for Your Donation!
-                
-                Hello {donor_name},
-                
-                Thank you for your generous donation to support {campaign_title}!
-                
-                Donation Details:
-                - Amount: ${payment.amount}
-                - Campaign: {campaign_title}
-                - Campaign Owner: {owner_name}
-                - Payment Method: {payment.method.replace('_', ' ').title()}
-                - Date: {payment.created_at.strftime('%Y-%m-%d %H:%M:%S')} UTC
-                
-                Your support makes a real difference in helping students achieve their goals.
-                
-                A receipt has been generated and is available for your records.
-                
-                Thank you for supporting student fundraisers!
-                
-                Best regards,
-                The Fundraising Platform Team
-                """
+                html_content, text_content = render_email(
+                    "donation_confirmation",
+                    donor_name=donor_name,
+                    amount=payment.amount,
+                    campaign_title=campaign_title,
+                    owner_name=owner_name,
+                    payment_method=payment.method,
+                    donated_at=payment.created_at.strftime('%Y-%m-%d %H:%M:%S')
+                )
                 
                 await email_service.send_email(
                     payment.donor_email,
@@ -132,17 +112,51 @@ async def create_payment(
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@router.post("/webhooks/{gateway}")
+async def receive_payment_webhook(gateway: str, request: Request):
+    """Receive a gateway event: verify, store and acknowledge; the webhook worker applies it"""
+    if gateway not in SUPPORTED_GATEWAYS:
+        raise HTTPException(status_code=404, detail="Unknown payment gateway")
+    
+    body = await request.body()
+    notification_url = f"{settings.BACKEND_URL}{request.url.path}"
+    if not await verify_webhook(gateway, request.headers, body, notification_url):
+        record_rejected_webhook()
+        raise HTTPException(status_code=400, detail="Invalid webhook signature")
+    
+    try:
+        event = parse_webhook(gateway, body)
+    except ValueError as e:
+        record_rejected_webhook()
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    try:
+        stored = await WebhookService(get_supabase_admin()).ingest(event)
+    except Exception as e:
+        # A non-2xx answer makes the gateway deliver the event again later
+        logger.error(f"Error storing {gateway} webhook {event.event_id}: {e}")
+        raise HTTPException(status_code=503, detail="Could not store webhook event")
+    
+    return {"received": True, "duplicate": not stored}
+
+
 @router.get("/campaign/{campaign_id}", response_model=List[PaymentResponse])
 async def get_campaign_payments(
     campaign_id: int,
+    response: Response,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
     current_user: Optional[User] = Depends(get_current_user_optional)
 ):
-    """Get payments for a specific campaign"""
+    """Get payments for a specific campaign, newest first (next page cursor in `X-Next-Cursor`)"""
     try:
         supabase = get_supabase()
         payment_service = PaymentService(supabase)
         
-        payments = await payment_service.get_campaign_payments(campaign_id)
+        page = await payment_service.get_campaign_payments(campaign_id, cursor=cursor, limit=limit)
+        payments = page["items"]
+        if page["next_cursor"]:
+            response.headers[NEXT_CURSOR_HEADER] = page["next_cursor"]
         
         payment_responses = []
         for payment in payments:
@@ -200,12 +214,28 @@ async def get_payment(
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@router.post("/{payment_id}/process")
+@router.post("/{payment_id}/process", status_code=status.HTTP_202_ACCEPTED)
 async def process_payment(
     payment_id: int,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, alias=IDEMPOTENCY_KEY_HEADER),
     current_user: User = Depends(get_current_user)
 ):
-    """Process a payment (admin only)"""
+    """Queue a payment for processing (admin only); poll the returned job for the outcome.
+
+    Retries with the same `Idempotency-Key` get the original job back.
+    """
+    return await run_idempotent(
+        idempotency_key,
+        f"process_payment:{current_user.id}",
+        fingerprint_request(payment_id),
+        lambda: _queue_payment_processing(payment_id, current_user),
+        response
+    )
+
+
+async def _queue_payment_processing(payment_id: int, current_user: User) -> dict:
+    """Validate a payment and start its processing job"""
     try:
         if current_user.role != "admin":
             raise HTTPException(status_code=403, detail="Not authorized")
@@ -213,16 +243,59 @@ async def process_payment(
         supabase = get_supabase()
         payment_service = PaymentService(supabase)
         
-        result = await payment_service.process_payment(payment_id)
-        if not result:
-            raise PaymentException("Failed to process payment")
+        payment = await payment_service.get_payment_by_id(payment_id)
+        if not payment:
+            raise NotFoundException("Payment not found")
         
-        return {"message": "Payment processed successfully"}
+        if payment.status != PaymentStatus.PENDING:
+            raise PaymentException(f"Payment is already {payment.status.value}")
+        
+        job = payment_service.start_processing(payment_id, current_user.id)
+        return job.to_dict()
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error processing payment: {e}")
         raise HTTPException(status_code=400, detail=str(e))
 
 
+def _get_processing_job(payment_id: int, job_id: str, current_user: User) -> Job:
+    """Find a payment processing job the current user may see"""
+    job = get_job(job_id, kind=PAYMENT_PROCESSING_JOB)
+    if (
+        not job
+        or job.progress.get("payment_id") != payment_id
+        or (job.owner_id != current_user.id and current_user.role != "admin")
+    ):
+        raise HTTPException(status_code=404, detail="Processing job not found")
+    return job
+
+
+@router.get("/{payment_id}/process/{job_id}")
+async def get_processing_status(
+    payment_id: int,
+    job_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    """Get the status of a payment processing job"""
+    return _get_processing_job(payment_id, job_id, current_user).to_dict()
+
+
+@router.get("/{payment_id}/process/{job_id}/events")
+async def stream_processing_status(
+    payment_id: int,
+    job_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    """Stream a payment processing job's status changes as Server-Sent Events"""
+    job = _get_processing_job(payment_id, job_id, current_user)
+    return StreamingResponse(
+        stream_job_events(job),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.post("/{payment_id}/refund")
 async def refund_payment(
     payment_id: int,
@@ -259,9 +332,12 @@ async def refund_payment(
 @router.get("/user/{user_id}", response_model=List[PaymentResponse])
 async def get_user_payments(
     user_id: int,
+    response: Response,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
     current_user: User = Depends(get_current_user)
 ):
-    """Get payments made by a user"""
+    """Get payments made by a user, newest first (next page cursor in `X-Next-Cursor`)"""
     try:
         # Check if user is requesting their own payments or is admin
         if user_id != current_user.id and current_user.role != "admin":
@@ -270,7 +346,10 @@ async def get_user_payments(
         supabase = get_supabase()
         payment_service = PaymentService(supabase)
         
-        payments = await payment_service.get_user_payments(user_id)
+        page = await payment_service.get_user_payments(user_id, cursor=cursor, limit=limit)
+        payments = page["items"]
+        if page["next_cursor"]:
+            response.headers[NEXT_CURSOR_HEADER] = page["next_cursor"]
         
         payment_responses = []
         for payment in payments:
@@ -1,4 +1,5 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Header, Response
+from fastapi.responses import FileResponse
 from typing import List, Optional
 import logging
 
@@ -6,8 +7,10 @@ from app.core.database import get_supabase
 from app.core.auth import get_current_user
 from app.models.user import User
 from app.models.receipt import Receipt, ReceiptResponse
-from app.services.receipt_service import ReceiptService
+from app.services.receipt_service import ReceiptService, RECEIPT_MEDIA_TYPES
+from app.services.payment_service import PaymentService
 from app.core.exceptions import NotFoundException
+from app.core.file_serving import etag_matches
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -71,3 +74,43 @@ async def get_user_receipts(
     except Exception as e:
         logger.error(f"Error getting user receipts: {e}")
         raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/payment/{payment_id}/download")
+async def download_payment_receipt(
+    payment_id: int,
+    format: str = Query("pdf", pattern="^(pdf|html)$"),
+    if_none_match: Optional[str] = Header(None),
+    current_user: User = Depends(get_current_user)
+):
+    """Download a payment's rendered receipt as PDF or HTML (supports If-None-Match)"""
+    try:
+        supabase = get_supabase()
+        
+        # Only the donor or an admin can download the receipt
+        payment = await PaymentService(supabase).get_payment_by_id(payment_id)
+        if not payment:
+            raise NotFoundException("Receipt not found")
+        if payment.donor_id != current_user.id and current_user.role != "admin":
+            raise HTTPException(status_code=403, detail="Not authorized to view this receipt")
+        
+        receipt_service = ReceiptService(supabase)
+        receipt = await receipt_service.get_payment_receipt(payment_id)
+        if not receipt:
+            raise NotFoundException("Receipt not found")
+        
+        digest, path = await receipt_service.get_artifact(receipt, format)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error downloading payment receipt: {e}")
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    # Artifacts are named by content hash, so the hash is a strong validator
+    etag = f'"{digest}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    headers["Content-Disposition"] = f'inline; filename="receipt-{payment_id}.{format}"'
+    return FileResponse(path, media_type=RECEIPT_MEDIA_TYPES[format], headers=headers)
@@ -28,7 +28,7 @@ async def create_referral(
             raise HTTPException(status_code=403, detail="Only student users can create referrals")
 
         # Ensure the campaign belongs to the current student
-        campaign_result = supabase.table("campaigns").select("user_id").eq("id", referral_data.campaign_id).single().execute()
+        campaign_result = await supabase.table("campaigns").select("user_id").eq("id", referral_data.campaign_id).single().execute()
         if not campaign_result.data:
             raise NotFoundException("Campaign not found")
         if campaign_result.data["user_id"] != current_user.id:
@@ -64,7 +64,7 @@ async def get_campaign_referrals(
         referral_service = ReferralService(supabase)
         
         # Check if user is authorized to view referrals (campaign owner or admin)
-        campaign_result = supabase.table("campaigns").select("user_id").eq("id", campaign_id).single().execute()
+        campaign_result = await supabase.table("campaigns").select("user_id").eq("id", campaign_id).single().execute()
         if not campaign_result.data:
             raise NotFoundException("Campaign not found")
         
@@ -105,7 +105,7 @@ async def get_referral_stats(
         referral_service = ReferralService(supabase)
         
         # Check if user is authorized to view referral stats (campaign owner or admin)
-        campaign_result = supabase.table("campaigns").select("user_id").eq("id", campaign_id).single().execute()
+        campaign_result = await supabase.table("campaigns").select("user_id").eq("id", campaign_id).single().execute()
         if not campaign_result.data:
             raise NotFoundException("Campaign not found")
         
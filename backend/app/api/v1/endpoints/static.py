@@ -3,11 +3,13 @@ Static file serving endpoints for uploaded images
 """
 
 from fastapi import APIRouter, HTTPException, Request
-from fastapi.responses import FileResponse
 from fastapi.staticfiles import StaticFiles
-import os
 import logging
 
+from app.core.file_serving import serve_file
+from app.services.image_processing import thumbnail_name
+from app.services.image_service import image_service
+
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
@@ -16,42 +18,37 @@ router = APIRouter()
 router.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
 
 @router.get("/images/{category}/{filename}")
-async def get_image(category: str, filename: str):
-    """Get an uploaded image"""
+async def get_image(category: str, filename: str, request: Request):
+    """Get an uploaded image (cacheable; supports conditional and Range requests)"""
     try:
-        file_path = f"uploads/images/{category}/{filename}"
-        
-        if not os.path.exists(file_path):
+        file_path = image_service.get_image_path(category, filename)
+        response = serve_file(request, file_path) if file_path else None
+        if response is None:
             raise HTTPException(status_code=404, detail="Image not found")
-        
-        return FileResponse(
-            file_path,
-            media_type="image/jpeg",
-            filename=filename
-        )
+        return response
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error serving image: {e}")
         raise HTTPException(status_code=500, detail="Failed to serve image")
 
 @router.get("/images/{category}/{filename}/thumbnails/{size}")
-async def get_thumbnail(category: str, filename: str, size: str):
+async def get_thumbnail(category: str, filename: str, size: str, request: Request):
     """Get a thumbnail of an image"""
     try:
         # Parse size (e.g., "300x300")
-        width, height = map(int, size.split('x'))
-        
-        base_name = os.path.splitext(filename)[0]
-        thumb_filename = f"{base_name}_{width}x{height}.jpg"
-        file_path = f"uploads/images/{category}/{thumb_filename}"
-        
-        if not os.path.exists(file_path):
+        try:
+            width, height = map(int, size.split('x'))
+        except ValueError:
             raise HTTPException(status_code=404, detail="Thumbnail not found")
         
-        return FileResponse(
-            file_path,
-            media_type="image/jpeg",
-            filename=thumb_filename
-        )
+        file_path = image_service.get_image_path(category, thumbnail_name(filename, (width, height)))
+        response = serve_file(request, file_path) if file_path else None
+        if response is None:
+            raise HTTPException(status_code=404, detail="Thumbnail not found")
+        return response
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error serving thumbnail: {e}")
         raise HTTPException(status_code=500, detail="Failed to serve thumbnail")
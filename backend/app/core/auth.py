@@ -7,7 +7,7 @@ from app.core.security import verify_token
 from app.core.config import settings
 from app.core.database import get_supabase
 from app.models.user import User
-from app.services.user_service import UserService
+from app.services.user_service import UserService, user_cache
 
 logger = logging.getLogger(__name__)
 
@@ -46,9 +46,13 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
                 is_verified=True
             )
         
-        supabase = get_supabase()
-        user_service = UserService(supabase)
-        user = await user_service.get_user_by_id(int(user_id))
+        user = user_cache.get(int(user_id))
+        if user is None:
+            supabase = get_supabase()
+            user_service = UserService(supabase)
+            user = await user_service.get_user_by_id(int(user_id))
+            if user:
+                user_cache.set(int(user_id), user)
         
         if not user:
             raise HTTPException(
@@ -13,11 +13,17 @@ class Settings(BaseSettings):
     SUPABASE_URL: Optional[str] = None
     SUPABASE_KEY: Optional[str] = None
     SUPABASE_SERVICE_ROLE_KEY: Optional[str] = None
+    DB_POOL_MAX_CONNECTIONS: int = 50
+    DB_POOL_MAX_KEEPALIVE: int = 20
+    DB_POOL_KEEPALIVE_EXPIRY: float = 30.0  # seconds
+    DB_TIMEOUT_SECONDS: float = 30.0
     
     # JWT Configuration
     SECRET_KEY: Optional[str] = None
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_QUEUE: int = 64  # bcrypt jobs allowed to wait before shedding load
     
     # Admin account (predefined credentials)
     ADMIN_EMAIL: Optional[str] = None
@@ -30,6 +36,27 @@ class Settings(BaseSettings):
     PAYPAL_CLIENT_SECRET: Optional[str] = None
     SQUARE_APPLICATION_ID: Optional[str] = None
     SQUARE_ACCESS_TOKEN: Optional[str] = None
+    STRIPE_API_BASE: str = "https://api.stripe.com"
+    PAYPAL_API_BASE: str = "https://api.sandbox.paypal.com"
+    SQUARE_API_BASE: str = "https://connect.squareupsandbox.com"
+    GATEWAY_TIMEOUT_SECONDS: float = 15.0
+    GATEWAY_CONNECT_TIMEOUT_SECONDS: float = 5.0
+    GATEWAY_MAX_CONNECTIONS: int = 20  # keep-alive connections per gateway
+    PAYPAL_TOKEN_REFRESH_MARGIN_SECONDS: float = 300.0  # refresh this long before the token expires
+    PAYMENT_WORKERS: int = 8  # payments processed concurrently per process
+    
+    # Payment webhooks
+    STRIPE_WEBHOOK_SECRET: Optional[str] = None
+    PAYPAL_WEBHOOK_ID: Optional[str] = None
+    SQUARE_WEBHOOK_SIGNATURE_KEY: Optional[str] = None
+    WEBHOOK_SIGNATURE_TOLERANCE_SECONDS: int = 300
+    WEBHOOK_SEEN_EVENTS_MAX: int = 50000  # recent event ids remembered per process
+    WEBHOOK_WORKERS: int = 1
+    WEBHOOK_BATCH_SIZE: int = 200
+    WEBHOOK_BATCH_WAIT_SECONDS: float = 0.05  # let a burst gather into one batch
+    WEBHOOK_POLL_SECONDS: float = 5.0
+    WEBHOOK_LEASE_SECONDS: int = 60
+    WEBHOOK_MAX_ATTEMPTS: int = 5
     
     # Email Configuration
     SMTP_HOST: Optional[str] = None
@@ -37,6 +64,18 @@ class Settings(BaseSettings):
     SMTP_USERNAME: Optional[str] = None
     SMTP_PASSWORD: Optional[str] = None
     EMAIL_FROM: Optional[str] = None  # Add this field to handle the extra input
+    SMTP_POOL_SIZE: int = 4  # concurrent SMTP sessions per process
+    SMTP_MAX_MESSAGES_PER_CONNECTION: int = 100
+    SMTP_IDLE_TIMEOUT_SECONDS: float = 60.0
+    SMTP_TIMEOUT_SECONDS: float = 30.0
+    EMAIL_WORKERS: int = 2
+    EMAIL_OUTBOX_BATCH_SIZE: int = 20
+    EMAIL_OUTBOX_POLL_SECONDS: float = 5.0
+    EMAIL_SEND_LEASE_SECONDS: int = 300  # a claimed email is retried if not settled within this
+    EMAIL_MAX_ATTEMPTS: int = 6
+    EMAIL_RETRY_BASE_SECONDS: float = 30.0
+    EMAIL_RETRY_MAX_SECONDS: float = 3600.0
+    EMAIL_TEMPLATE_CACHE_DIR: Optional[str] = ".cache/email_templates"  # compiled template bytecode
     
     # URLs
     FRONTEND_URL: str = "http://localhost:3000"
@@ -54,6 +93,41 @@ class Settings(BaseSettings):
     MAX_CAMPAIGN_DURATION_MONTHS: int = 12
     CAMPAIGN_MONTHLY_COST: float = 10.0
     MIN_REFERRALS_REQUIRED: int = 5
+    CAMPAIGN_UPDATE_PAGE_SIZE: int = 500  # donor addresses fetched per query
+    CAMPAIGN_UPDATE_BATCH_SIZE: int = 50  # emails handed to send_bulk at once
+    CAMPAIGN_UPDATE_RATE_PER_SECOND: float = 20.0
+    RECONCILIATION_BATCH_SIZE: int = 50000  # completed payments fetched per columnar batch
+    RECONCILIATION_SETTLE_SECONDS: float = 30.0  # wait before re-checking drift, so in-flight payments land
+    CAMPAIGN_CACHE_TTL_SECONDS: float = 30.0
+    CAMPAIGN_CACHE_MAX_ENTRIES: int = 1024
+    PLATFORM_STATS_CACHE_TTL_SECONDS: float = 60.0
+    USER_CACHE_TTL_SECONDS: float = 60.0
+    USER_CACHE_MAX_ENTRIES: int = 10000
+    
+    # Background jobs
+    JOB_RETENTION_SECONDS: float = 3600.0  # how long finished job status stays readable
+    
+    # Idempotency keys
+    IDEMPOTENCY_TTL_SECONDS: float = 86400.0  # how long a key's first response is replayed
+    IDEMPOTENCY_MAX_KEYS: int = 10000
+    
+    # Pagination
+    DEFAULT_PAGE_SIZE: int = 20
+    MAX_PAGE_SIZE: int = 100
+    EXPORT_BATCH_SIZE: int = 1000
+    
+    # Receipts
+    RECEIPT_STORAGE_DIR: str = "storage/receipts"  # rendered artifacts, named by content hash
+    RECEIPT_RENDER_WORKERS: int = 2
+    
+    # Image processing
+    IMAGE_WORKERS: int = 0  # worker processes for decoding/resizing; 0 = one per CPU core
+    IMAGE_MAX_QUEUE: int = 32  # images allowed to wait for a worker before shedding load
+    
+    # Static file serving
+    STATIC_FILE_MAX_AGE_SECONDS: int = 31536000  # uploads never change, so browsers may keep them a year
+    STATIC_FILE_INDEX_TTL_SECONDS: float = 300.0  # how long a file's stat result stays cached
+    STATIC_FILE_INDEX_MAX_ENTRIES: int = 10000
     
     # File Upload
     MAX_FILE_SIZE: int = 10 * 1024 * 1024  # 10MB
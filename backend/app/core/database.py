@@ -1,43 +1,198 @@
-from supabase import create_client, Client
+from typing import Optional, Dict, Any
+import asyncio
+import time
+
+import httpx
+from postgrest import AsyncPostgrestClient
+from postgrest.constants import DEFAULT_POSTGREST_CLIENT_HEADERS
 from app.core.config import settings
 from fastapi import HTTPException
 import logging
 
 logger = logging.getLogger(__name__)
 
-# Global Supabase client
-supabase: Client = None
+
+class _ReleasingStream(httpx.AsyncByteStream):
+    """Response stream that hands its pool slot back once the body is closed."""
+
+    def __init__(self, stream: httpx.AsyncByteStream, release):
+        self._stream = stream
+        self._release = release
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            self._release()
+
+
+class MeteredTransport(httpx.AsyncHTTPTransport):
+    """HTTP transport that tracks connection pool usage and wait time."""
+
+    def __init__(self, limits: httpx.Limits, **kwargs):
+        super().__init__(limits=limits, **kwargs)
+        self.max_connections = limits.max_connections
+        self._slots = asyncio.Semaphore(limits.max_connections)
+        self.in_use = 0
+        self.waiting = 0
+        self.requests = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        started = time.perf_counter()
+        self.waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.waiting -= 1
+        wait = time.perf_counter() - started
+        self.requests += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+        self.in_use += 1
+
+        released = False
+
+        def release():
+            nonlocal released
+            if not released:
+                released = True
+                self.in_use -= 1
+                self._slots.release()
+
+        try:
+            response = await super().handle_async_request(request)
+        except BaseException:
+            release()
+            raise
+
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=response.headers,
+            stream=_ReleasingStream(response.stream, release),
+            extensions=response.extensions,
+        )
+
+    def metrics(self) -> Dict[str, Any]:
+        """Snapshot of pool usage"""
+        connections = self._pool.connections
+        return {
+            "max_connections": self.max_connections,
+            "open_connections": len(connections),
+            "in_use": self.in_use,
+            "idle": sum(1 for connection in connections if connection.is_idle()),
+            "waiting": self.waiting,
+            "requests": self.requests,
+            "avg_wait_ms": round(self.total_wait / self.requests * 1000, 3) if self.requests else 0.0,
+            "max_wait_ms": round(self.max_wait * 1000, 3),
+        }
+
+
+class PooledPostgrestClient(AsyncPostgrestClient):
+    """Async PostgREST client backed by a keep-alive httpx connection pool.
+
+    Exposes the same ``table(...)``/``rpc(...)`` query builder as the Supabase
+    client, but ``execute()`` is awaitable so queries never block the event loop.
+    """
+
+    def create_session(self, base_url, headers, timeout) -> httpx.AsyncClient:
+        self.transport = MeteredTransport(
+            limits=httpx.Limits(
+                max_connections=settings.DB_POOL_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.DB_POOL_MAX_KEEPALIVE,
+                keepalive_expiry=settings.DB_POOL_KEEPALIVE_EXPIRY,
+            ),
+        )
+        return httpx.AsyncClient(
+            base_url=base_url,
+            headers=headers,
+            timeout=timeout,
+            transport=self.transport,
+        )
+
+    def pool_metrics(self) -> Dict[str, Any]:
+        """Get connection pool metrics for this client"""
+        return self.transport.metrics()
+
+
+def create_async_client(api_key: str) -> PooledPostgrestClient:
+    """Create a pooled async client for the Supabase REST API using the given key."""
+    headers = {
+        **DEFAULT_POSTGREST_CLIENT_HEADERS,
+        "apikey": api_key,
+        "Authorization": f"Bearer {api_key}",
+    }
+    return PooledPostgrestClient(
+        f"{settings.SUPABASE_URL.rstrip('/')}/rest/v1",
+        headers=headers,
+        timeout=settings.DB_TIMEOUT_SECONDS,
+    )
+
+
+# Global Supabase clients (anon key and service role), created once per process
+supabase: Optional[PooledPostgrestClient] = None
+supabase_admin: Optional[PooledPostgrestClient] = None
 
 
 async def init_db():
     """Initialize database connection"""
-    global supabase
+    global supabase, supabase_admin
     try:
         if not settings.SUPABASE_URL or not settings.SUPABASE_KEY:
             logger.warning("Supabase credentials not provided. Database connection will not be available.")
             return
-        
-        supabase = create_client(settings.SUPABASE_URL, settings.SUPABASE_KEY)
+
+        supabase = create_async_client(settings.SUPABASE_KEY)
+        if settings.SUPABASE_SERVICE_ROLE_KEY:
+            supabase_admin = create_async_client(settings.SUPABASE_SERVICE_ROLE_KEY)
         logger.info("Database connection established successfully")
     except Exception as e:
         logger.error(f"Failed to connect to database: {e}")
         raise
 
 
-def get_supabase() -> Client:
+async def close_db():
+    """Close pooled database connections"""
+    global supabase, supabase_admin
+    for client in (supabase, supabase_admin):
+        if client is not None:
+            await client.aclose()
+    supabase = None
+    supabase_admin = None
+    logger.info("Database connections closed")
+
+
+def get_supabase() -> PooledPostgrestClient:
     """Get Supabase client instance"""
     if supabase is None:
         raise HTTPException(status_code=500, detail="Database not initialized")
     return supabase
 
 
-def get_supabase_admin() -> Client:
+def get_supabase_admin() -> PooledPostgrestClient:
     """Get Supabase admin client for service operations (bypasses RLS)."""
+    global supabase_admin
+    if supabase_admin is not None:
+        return supabase_admin
     if not settings.SUPABASE_URL:
         logger.error("SUPABASE_URL is not set")
         raise HTTPException(status_code=500, detail="SUPABASE_URL is not configured")
     if not settings.SUPABASE_SERVICE_ROLE_KEY:
         logger.error("SUPABASE_SERVICE_ROLE_KEY is not set (cannot bypass RLS)")
         raise HTTPException(status_code=500, detail="SUPABASE_SERVICE_ROLE_KEY is not configured")
-    client = create_client(settings.SUPABASE_URL, settings.SUPABASE_SERVICE_ROLE_KEY)
-    return client
+    supabase_admin = create_async_client(settings.SUPABASE_SERVICE_ROLE_KEY)
+    return supabase_admin
+
+
+def get_pool_metrics() -> Dict[str, Any]:
+    """Get connection pool metrics for the shared clients"""
+    return {
+        name: client.pool_metrics()
+        for name, client in (("anon", supabase), ("admin", supabase_admin))
+        if client is not None
+    }
@@ -18,6 +18,13 @@ class ValidationException(CustomHTTPException):
         super().__init__(status_code=422, detail=detail, error_code="VALIDATION_ERROR")
 
 
+class InvalidCursorException(ValidationException):
+    """A malformed pagination cursor; a ValidationException so services re-raise it"""
+
+    def __init__(self, detail: str = "Invalid pagination cursor"):
+        CustomHTTPException.__init__(self, status_code=400, detail=detail, error_code="INVALID_CURSOR")
+
+
 class AuthenticationException(CustomHTTPException):
     def __init__(self, detail: str = "Authentication failed"):
         super().__init__(status_code=401, detail=detail, error_code="AUTH_ERROR")
@@ -43,6 +50,12 @@ class CampaignException(CustomHTTPException):
         super().__init__(status_code=400, detail=detail, error_code="CAMPAIGN_ERROR")
 
 
+class ServiceBusyException(CustomHTTPException):
+    def __init__(self, detail: str = "Service is busy, please retry shortly"):
+        super().__init__(status_code=503, detail=detail, error_code="SERVICE_BUSY")
+        self.headers = {"Retry-After": "1"}
+
+
 def setup_exception_handlers(app: FastAPI):
     """Setup global exception handlers"""
     
@@ -54,7 +67,8 @@ def setup_exception_handlers(app: FastAPI):
                 "error": exc.detail,
                 "error_code": exc.error_code,
                 "status_code": exc.status_code
-            }
+            },
+            headers=getattr(exc, "headers", None)
         )
     
     @app.exception_handler(RequestValidationError)
@@ -0,0 +1,220 @@
+"""
+Conditional, cacheable and ranged responses for files that never change.
+
+Uploaded images are written once and never modified (content-addressed
+receipts share the ETag helper), so their stat results can be kept in memory: a request for a known file
+costs no filesystem calls until the body is actually sent, and a revalidation
+(If-None-Match / If-Modified-Since) is answered with a 304 without touching
+the disk at all.
+"""
+
+from email.utils import formatdate, parsedate_to_datetime
+from typing import NamedTuple, Optional, Tuple
+import mimetypes
+import os
+import re
+import stat
+
+import anyio
+from fastapi import HTTPException, Request, Response, status
+from starlette.types import Receive, Scope, Send
+
+from app.core.cache import create_cache
+from app.core.config import settings
+
+IMMUTABLE_CACHE_CONTROL = f"public, max-age={settings.STATIC_FILE_MAX_AGE_SECONDS}, immutable"
+CONTENT_HASH_NAME = re.compile(r"^[0-9a-f]{64}$")
+
+# Not in every platform's mime.types (notably python:3.9-slim)
+mimetypes.add_type("image/webp", ".webp")
+
+_file_index = create_cache(
+    "static_files", settings.STATIC_FILE_INDEX_MAX_ENTRIES, settings.STATIC_FILE_INDEX_TTL_SECONDS
+)
+
+
+class FileMeta(NamedTuple):
+    size: int
+    mtime: float
+    etag: str
+    last_modified: str
+    media_type: str
+
+
+class _RangeNotSatisfiable(Exception):
+    pass
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header against a strong ETag"""
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+
+def get_file_meta(path: str) -> Optional[FileMeta]:
+    """Size, validators and media type of a regular file; None if it does not exist"""
+    meta = _file_index.get(path)
+    if meta is None:
+        try:
+            stat_result = os.stat(path)
+        except OSError:
+            return None
+        if not stat.S_ISREG(stat_result.st_mode):
+            return None
+
+        # Content-addressed files are named by their hash, which makes the
+        # best validator; anything else is identified by size and mtime
+        stem = os.path.splitext(os.path.basename(path))[0]
+        if CONTENT_HASH_NAME.match(stem):
+            etag = f'"{stem}"'
+        else:
+            etag = f'"{stat_result.st_size:x}-{stat_result.st_mtime_ns:x}"'
+
+        meta = FileMeta(
+            size=stat_result.st_size,
+            mtime=stat_result.st_mtime,
+            etag=etag,
+            last_modified=formatdate(stat_result.st_mtime, usegmt=True),
+            media_type=mimetypes.guess_type(path)[0] or "application/octet-stream"
+        )
+        _file_index.set(path, meta)
+    return meta
+
+
+def forget_file(path: str):
+    """Drop a deleted file from the stat index"""
+    _file_index.invalidate(path)
+
+
+def _not_modified(request: Request, meta: FileMeta) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # If-None-Match takes precedence over If-Modified-Since
+        return etag_matches(if_none_match, meta.etag)
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return int(meta.mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def _byte_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """First and last byte of a single "bytes=" range, or None to send the whole file.
+
+    Malformed and multi-range headers are ignored, as RFC 9110 allows.
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, separator, last = spec.strip().partition("-")
+    if not separator or not (first.isdigit() or first == "") or not (last.isdigit() or last == ""):
+        return None
+
+    if first == "":
+        # Suffix range: the last N bytes
+        if last == "" or int(last) == 0 or size == 0:
+            raise _RangeNotSatisfiable()
+        return max(0, size - int(last)), size - 1
+
+    start = int(first)
+    end = int(last) if last else size - 1
+    if last and end < start:
+        return None
+    if start >= size:
+        raise _RangeNotSatisfiable()
+    return start, min(end, size - 1)
+
+
+class FileRangeResponse(Response):
+    """Send all or part of a file, with the server's zero-copy send when it offers one"""
+
+    chunk_size = 64 * 1024
+
+    def __init__(
+        self,
+        path: str,
+        offset: int,
+        length: int,
+        status_code: int,
+        headers: dict,
+        media_type: str,
+        method: Optional[str] = None
+    ):
+        self.path = path
+        self.offset = offset
+        self.length = length
+        self.status_code = status_code
+        self.media_type = media_type
+        self.background = None
+        self.send_header_only = method is not None and method.upper() == "HEAD"
+        self.init_headers(headers)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        # Open before sending headers so a file deleted since it was indexed
+        # still gets a clean 404
+        try:
+            file = await anyio.open_file(self.path, mode="rb")
+        except FileNotFoundError:
+            forget_file(self.path)
+            raise HTTPException(status_code=404, detail="File not found")
+
+        async with file:
+            await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+            if self.send_header_only or not self.length:
+                await send({"type": "http.response.body", "body": b"", "more_body": False})
+            elif "http.response.zerocopysend" in scope.get("extensions", {}):
+                await send({
+                    "type": "http.response.zerocopysend",
+                    "file": file.wrapped,
+                    "offset": self.offset,
+                    "count": self.length,
+                    "more_body": False
+                })
+            else:
+                await file.seek(self.offset)
+                remaining = self.length
+                while remaining:
+                    chunk = await file.read(min(self.chunk_size, remaining))
+                    remaining = remaining - len(chunk) if chunk else 0
+                    await send({"type": "http.response.body", "body": chunk, "more_body": bool(remaining)})
+
+
+def serve_file(request: Request, path: str, cache_control: str = IMMUTABLE_CACHE_CONTROL) -> Optional[Response]:
+    """Respond with a file, honouring conditional and Range requests; None if it does not exist"""
+    meta = get_file_meta(path)
+    if meta is None:
+        return None
+
+    headers = {
+        "ETag": meta.etag,
+        "Last-Modified": meta.last_modified,
+        "Cache-Control": cache_control,
+        "Accept-Ranges": "bytes",
+    }
+    if _not_modified(request, meta):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    start, end = 0, meta.size - 1
+    status_code = status.HTTP_200_OK
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and (if_range is None or if_range in (meta.etag, meta.last_modified)):
+        try:
+            byte_range = _byte_range(range_header, meta.size)
+        except _RangeNotSatisfiable:
+            return Response(
+                status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+                headers={**headers, "Content-Range": f"bytes */{meta.size}"}
+            )
+        if byte_range is not None:
+            start, end = byte_range
+            status_code = status.HTTP_206_PARTIAL_CONTENT
+            headers["Content-Range"] = f"bytes {start}-{end}/{meta.size}"
+
+    length = max(0, end - start + 1)
+    headers["Content-Length"] = str(length)
+    return FileRangeResponse(path, start, length, status_code, headers, meta.media_type, request.method)
@@ -0,0 +1,92 @@
+"""
+Idempotency-Key support for endpoints that must not run twice.
+
+The first request with a key runs normally and its result is kept for
+IDEMPOTENCY_TTL_SECONDS; retries with the same key get that result back
+instead of running again. A retry that arrives while the first request is
+still in flight waits for it rather than starting a second execution. Keys
+are scoped per user and endpoint and live in this worker's memory.
+"""
+
+import asyncio
+import hashlib
+from typing import Any, Awaitable, Callable, Optional
+
+from fastapi import Response
+
+from app.core.cache import create_cache
+from app.core.config import settings
+from app.core.exceptions import ValidationException
+
+IDEMPOTENCY_KEY_HEADER = "Idempotency-Key"
+IDEMPOTENT_REPLAYED_HEADER = "Idempotent-Replayed"
+MAX_KEY_LENGTH = 255
+
+_calls = create_cache("idempotency", settings.IDEMPOTENCY_MAX_KEYS, settings.IDEMPOTENCY_TTL_SECONDS)
+
+
+class _IdempotentCall:
+    def __init__(self, fingerprint: str):
+        self.fingerprint = fingerprint
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+
+
+def fingerprint_request(*parts: Any) -> str:
+    """Hash the parts of a request that must match for a key to be replayed"""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(str(part).encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+async def run_idempotent(
+    key: Optional[str],
+    scope: str,
+    fingerprint: str,
+    work: Callable[[], Awaitable[Any]],
+    response: Response
+) -> Any:
+    """Run work once per idempotency key, replaying its result for retries.
+
+    Without a key the work simply runs. Failures are not stored, so a retry
+    after an error runs again; duplicates already waiting get the same error.
+    """
+    if not key:
+        return await work()
+    if len(key) > MAX_KEY_LENGTH:
+        raise ValidationException(f"{IDEMPOTENCY_KEY_HEADER} must be at most {MAX_KEY_LENGTH} characters")
+
+    cache_key = (scope, key)
+    while True:
+        call = _calls.get(cache_key)
+        if call is None:
+            break
+        if call.fingerprint != fingerprint:
+            raise ValidationException(f"{IDEMPOTENCY_KEY_HEADER} was already used for a different request")
+        try:
+            result = await asyncio.shield(call.future)
+        except asyncio.CancelledError:
+            # The original request was abandoned; take over if it was dropped
+            if call.future.cancelled():
+                continue
+            raise
+        response.headers[IDEMPOTENT_REPLAYED_HEADER] = "true"
+        return result
+
+    call = _IdempotentCall(fingerprint)
+    _calls.set(cache_key, call)
+    try:
+        result = await work()
+    except asyncio.CancelledError:
+        _calls.invalidate(cache_key)
+        call.future.cancel()
+        raise
+    except Exception as e:
+        _calls.invalidate(cache_key)
+        call.future.set_exception(e)
+        # Mark the exception retrieved when no duplicate is waiting on it
+        call.future.exception()
+        raise
+    call.future.set_result(result)
+    return result
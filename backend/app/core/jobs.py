@@ -0,0 +1,173 @@
+"""
+In-process background jobs with pollable progress.
+
+A job wraps a coroutine that receives the Job itself so it can publish
+progress counters while it runs. Jobs live in this worker's memory; finished
+ones are kept for JOB_RETENTION_SECONDS so their final state can be read.
+"""
+
+import asyncio
+import json
+import logging
+import time
+import uuid
+from datetime import datetime
+from enum import Enum
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class Job:
+    """A unit of background work and its progress"""
+
+    def __init__(self, kind: str, owner_id: Optional[int] = None):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.owner_id = owner_id
+        self.status = JobStatus.QUEUED
+        self.progress: Dict[str, Any] = {}
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.created_at = datetime.utcnow()
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self._finished_monotonic: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+        self._done = asyncio.Event()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (JobStatus.COMPLETED, JobStatus.FAILED)
+
+    async def wait(self, timeout: Optional[float] = None) -> bool:
+        """Wait for the job to finish; returns False on timeout"""
+        try:
+            await asyncio.wait_for(self._done.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Public view of the job for status endpoints"""
+        end = self.finished_at or datetime.utcnow()
+        elapsed = (end - self.started_at).total_seconds() if self.started_at else 0.0
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "status": self.status.value,
+            "progress": dict(self.progress),
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "elapsed_seconds": round(elapsed, 3),
+        }
+
+
+_jobs: Dict[str, Job] = {}
+
+
+def _prune_jobs():
+    """Forget finished jobs older than the retention window"""
+    cutoff = time.monotonic() - settings.JOB_RETENTION_SECONDS
+    expired = [
+        job_id for job_id, job in _jobs.items()
+        if job._finished_monotonic is not None and job._finished_monotonic < cutoff
+    ]
+    for job_id in expired:
+        del _jobs[job_id]
+
+
+async def _run(job: Job, work: Callable[[Job], Awaitable[Any]], limiter: Optional[asyncio.Semaphore]):
+    """Run a job's coroutine, recording its outcome"""
+    try:
+        if limiter is not None:
+            await limiter.acquire()
+        try:
+            job.status = JobStatus.RUNNING
+            job.started_at = datetime.utcnow()
+            job.result = await work(job)
+            job.status = JobStatus.COMPLETED
+        finally:
+            if limiter is not None:
+                limiter.release()
+    except asyncio.CancelledError:
+        job.status = JobStatus.FAILED
+        job.error = "Cancelled"
+        raise
+    except Exception as e:
+        logger.error(f"Job {job.id} ({job.kind}) failed: {e}")
+        job.status = JobStatus.FAILED
+        job.error = str(e)
+    finally:
+        job.finished_at = datetime.utcnow()
+        job._finished_monotonic = time.monotonic()
+        job._done.set()
+
+
+def start_job(
+    kind: str,
+    work: Callable[[Job], Awaitable[Any]],
+    owner_id: Optional[int] = None,
+    limiter: Optional[asyncio.Semaphore] = None
+) -> Job:
+    """Schedule work on the running event loop and return its Job.
+
+    Pass a shared semaphore as ``limiter`` to cap how many jobs of a kind run
+    at once; the rest wait in the queued state.
+    """
+    _prune_jobs()
+    job = Job(kind, owner_id)
+    _jobs[job.id] = job
+    job._task = asyncio.create_task(_run(job, work, limiter))
+    return job
+
+
+def get_job(job_id: str, kind: Optional[str] = None) -> Optional[Job]:
+    """Look up a job by id, optionally requiring a kind"""
+    job = _jobs.get(job_id)
+    if job is None or (kind is not None and job.kind != kind):
+        return None
+    return job
+
+
+def get_job_metrics() -> Dict[str, Any]:
+    """Count jobs by kind and status"""
+    counts: Dict[str, Dict[str, int]] = {}
+    for job in _jobs.values():
+        by_status = counts.setdefault(job.kind, {})
+        by_status[job.status.value] = by_status.get(job.status.value, 0) + 1
+    return counts
+
+
+async def stream_job_events(job: Job, poll_seconds: float = 0.5) -> AsyncIterator[str]:
+    """Yield Server-Sent Events for a job's state changes until it finishes"""
+    last = None
+    while True:
+        snapshot = job.to_dict()
+        state = (snapshot["status"], snapshot["progress"])
+        if state != last:
+            last = state
+            yield f"event: {snapshot['status']}\ndata: {json.dumps(snapshot, default=str)}\n\n"
+        if job.finished:
+            return
+        await job.wait(poll_seconds)
+
+
+async def cancel_jobs():
+    """Cancel unfinished jobs on application shutdown"""
+    tasks = [job._task for job in _jobs.values() if job._task is not None and not job.finished]
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
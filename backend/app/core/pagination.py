@@ -0,0 +1,102 @@
+"""
+Keyset (cursor) pagination helpers for PostgREST queries.
+
+Pages are ordered newest first on ``(sort_column, id)`` and the cursor encodes
+the last row of the previous page, so each page costs the same no matter how
+deep into the table it is.
+"""
+
+import base64
+import json
+import re
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple, Union
+
+from app.core.config import settings
+from app.core.exceptions import InvalidCursorException
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# Timestamps as PostgREST returns them; Python 3.9's fromisoformat() does not
+# accept "Z" or fractions shorter than six digits, so those are normalised first
+ISO_TIMESTAMP = re.compile(
+    r"^(\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2})(?:\.(\d{1,6}))?(Z|[+-]\d{2}:\d{2})?$"
+)
+
+
+def clamp_page_size(limit: Optional[int]) -> int:
+    """Apply the default and hard cap to a requested page size"""
+    if not limit or limit < 1:
+        return settings.DEFAULT_PAGE_SIZE
+    return min(limit, settings.MAX_PAGE_SIZE)
+
+
+def encode_cursor(sort_value: Union[str, datetime], row_id: int) -> str:
+    """Encode the position of a row as an opaque cursor"""
+    if isinstance(sort_value, datetime):
+        sort_value = sort_value.isoformat()
+    raw = json.dumps([sort_value, row_id], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _parse_timestamp(value: Any) -> datetime:
+    """Parse an ISO-8601 timestamp, rejecting anything else"""
+    match = ISO_TIMESTAMP.match(value) if isinstance(value, str) else None
+    if not match:
+        raise ValueError(f"Not an ISO-8601 timestamp: {value!r}")
+    base, fraction, offset = match.groups()
+    normalised = base + (f".{fraction.ljust(6, '0')}" if fraction else "")
+    normalised += "+00:00" if offset == "Z" else (offset or "")
+    return datetime.fromisoformat(normalised)
+
+
+def decode_cursor(cursor: str) -> Tuple[str, int]:
+    """Decode a cursor produced by encode_cursor.
+
+    Cursors come from the client and end up inside a PostgREST filter, so the
+    sort value must be a timestamp and the id an integer; anything else is a 400.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        if type(row_id) is not int:
+            raise ValueError(f"Not an integer id: {row_id!r}")
+        return _parse_timestamp(sort_value).isoformat(), row_id
+    except Exception:
+        raise InvalidCursorException()
+
+
+def apply_keyset(query, cursor: Optional[str], sort_column: str = "created_at"):
+    """Order a query newest first and start it after the cursor position"""
+    if cursor:
+        sort_value, row_id = decode_cursor(cursor)
+        # postgrest-py 0.13 has no or_() helper, so add the logic tree param directly
+        query.params = query.params.add(
+            "or",
+            f'({sort_column}.lt."{sort_value}",and({sort_column}.eq."{sort_value}",id.lt.{row_id}))',
+        )
+    query.params = query.params.add("order", f"{sort_column}.desc,id.desc")
+    return query
+
+
+async def fetch_page(
+    query,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    sort_column: str = "created_at"
+) -> Dict[str, Any]:
+    """Execute a keyset-paginated query.
+
+    Returns ``{"items": [...], "next_cursor": str | None}``; one extra row is
+    fetched to tell whether another page exists.
+    """
+    limit = clamp_page_size(limit)
+    result = await apply_keyset(query, cursor, sort_column).limit(limit + 1).execute()
+    rows = result.data or []
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1][sort_column], rows[-1]["id"])
+
+    return {"items": rows, "next_cursor": next_cursor}
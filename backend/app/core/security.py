@@ -1,15 +1,31 @@
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional, Union
+from typing import Any, Callable, Dict, Optional, Union
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import HTTPException, status
 from app.core.config import settings
+from app.core.exceptions import ServiceBusyException
+import asyncio
 import secrets
 import string
+import time
 
 # Password hashing
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# bcrypt is deliberately slow, so it runs on its own small pool instead of the
+# event loop (or the default executor shared with everything else)
+_hash_executor: Optional[ThreadPoolExecutor] = None
+_hash_stats: Dict[str, float] = {
+    "in_flight": 0,
+    "completed": 0,
+    "rejected": 0,
+    "total_wait": 0.0,
+    "total_run": 0.0,
+    "max_latency": 0.0,
+}
+
 
 def _truncate_bcrypt(password: str, max_bytes: int = 72) -> str:
     """Truncate a password to bcrypt's 72-byte limit safely in UTF-8.
@@ -36,6 +52,78 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(safe)
 
 
+def _get_hash_executor() -> ThreadPoolExecutor:
+    """Get the bcrypt worker pool, creating it on first use"""
+    global _hash_executor
+    if _hash_executor is None:
+        _hash_executor = ThreadPoolExecutor(
+            max_workers=settings.PASSWORD_HASH_WORKERS,
+            thread_name_prefix="bcrypt"
+        )
+    return _hash_executor
+
+
+async def _run_password_job(func: Callable[..., Any], *args) -> Any:
+    """Run a bcrypt call on the hash pool, shedding load once the queue is full"""
+    capacity = settings.PASSWORD_HASH_WORKERS + settings.PASSWORD_HASH_MAX_QUEUE
+    if _hash_stats["in_flight"] >= capacity:
+        _hash_stats["rejected"] += 1
+        raise ServiceBusyException("Too many authentication requests, please retry shortly")
+
+    def timed():
+        started = time.perf_counter()
+        return started, func(*args), time.perf_counter()
+
+    _hash_stats["in_flight"] += 1
+    queued = time.perf_counter()
+    try:
+        loop = asyncio.get_running_loop()
+        started, result, finished = await loop.run_in_executor(_get_hash_executor(), timed)
+    finally:
+        _hash_stats["in_flight"] -= 1
+
+    _hash_stats["completed"] += 1
+    _hash_stats["total_wait"] += started - queued
+    _hash_stats["total_run"] += finished - started
+    _hash_stats["max_latency"] = max(_hash_stats["max_latency"], finished - queued)
+    return result
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password on the bcrypt pool without blocking the event loop."""
+    return await _run_password_job(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password on the bcrypt pool without blocking the event loop."""
+    return await _run_password_job(get_password_hash, password)
+
+
+def get_password_hash_metrics() -> Dict[str, Any]:
+    """Get queue depth and latency numbers for the bcrypt pool"""
+    completed = _hash_stats["completed"]
+    in_flight = int(_hash_stats["in_flight"])
+    return {
+        "workers": settings.PASSWORD_HASH_WORKERS,
+        "max_queue": settings.PASSWORD_HASH_MAX_QUEUE,
+        "in_flight": in_flight,
+        "queued": max(0, in_flight - settings.PASSWORD_HASH_WORKERS),
+        "completed": int(completed),
+        "rejected": int(_hash_stats["rejected"]),
+        "avg_wait_ms": round(_hash_stats["total_wait"] / completed * 1000, 2) if completed else 0.0,
+        "avg_run_ms": round(_hash_stats["total_run"] / completed * 1000, 2) if completed else 0.0,
+        "max_latency_ms": round(_hash_stats["max_latency"] * 1000, 2),
+    }
+
+
+def shutdown_password_executor():
+    """Stop the bcrypt pool on application shutdown"""
+    global _hash_executor
+    if _hash_executor is not None:
+        _hash_executor.shutdown(wait=False)
+        _hash_executor = None
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create JWT access token"""
     to_encode = data.copy()
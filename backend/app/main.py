@@ -1,26 +1,46 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from fastapi.security import HTTPBearer
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
 import uvicorn
 from contextlib import asynccontextmanager
 import os
 
 from app.core.config import settings
-from app.core.database import init_db
+from app.core.database import init_db, close_db
 from app.api.v1.api import api_router
 from app.core.exceptions import setup_exception_handlers
+from app.core.file_serving import serve_file
+from app.core.idempotency import IDEMPOTENT_REPLAYED_HEADER
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.core.security import shutdown_password_executor
+from app.core.jobs import cancel_jobs
+from app.services.email_outbox_service import start_email_workers, stop_email_workers
+from app.services.email_service import close_smtp_pool
+from app.services.email_templates import load_email_templates
+from app.services.image_service import image_service, shutdown_image_executor
+from app.services.payment_gateways import close_gateway_clients
+from app.services.webhook_service import start_webhook_workers, stop_webhook_workers
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
     await init_db()
+    load_email_templates()
+    start_email_workers()
+    start_webhook_workers()
     yield
     # Shutdown
-    pass
+    await cancel_jobs()
+    await stop_webhook_workers()
+    await stop_email_workers()
+    close_smtp_pool()
+    await close_gateway_clients()
+    await close_db()
+    shutdown_password_executor()
+    shutdown_image_executor()
 
 
 app = FastAPI(
@@ -43,6 +63,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, IDEMPOTENT_REPLAYED_HEADER],
 )
 
 # Setup exception handlers
@@ -60,18 +81,19 @@ os.makedirs("uploads", exist_ok=True)
 os.makedirs("uploads/images", exist_ok=True)
 os.makedirs("uploads/images/campaigns", exist_ok=True)
 
-logger.info(f"Mounting static files from: {os.path.abspath('uploads')}")
-app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
-
-# Direct image serving endpoint as fallback
+# Direct image serving endpoint; registered before the mount below so that
+# images get cache validators, 304s and Range support
 @app.get("/uploads/images/{category}/{filename}")
-async def serve_image(category: str, filename: str):
+async def serve_image(category: str, filename: str, request: Request):
     """Direct image serving endpoint"""
-    file_path = f"uploads/images/{category}/{filename}"
-    if os.path.exists(file_path):
-        return FileResponse(file_path)
-    else:
+    file_path = image_service.get_image_path(category, filename)
+    response = serve_file(request, file_path) if file_path else None
+    if response is None:
         raise HTTPException(status_code=404, detail="Image not found")
+    return response
+
+logger.info(f"Mounting static files from: {os.path.abspath('uploads')}")
+app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
 
 # Health check endpoint
 @app.get("/health")
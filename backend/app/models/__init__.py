@@ -6,6 +6,7 @@ from .shoutout import Shoutout, ShoutoutCreate
 from .milestone import Milestone, MilestoneCreate
 from .receipt import Receipt, ReceiptCreate
 from .company import Company, CompanyCreate, CompanyPartnership, PartnershipCreate
+from .email_outbox import OutboxEmail, EmailStatus
 
 __all__ = [
     "User", "UserCreate", "UserUpdate", "UserProfile",
@@ -15,5 +16,6 @@ __all__ = [
     "Shoutout", "ShoutoutCreate",
     "Milestone", "MilestoneCreate",
     "Receipt", "ReceiptCreate",
-    "Company", "CompanyCreate", "CompanyPartnership", "PartnershipCreate"
+    "Company", "CompanyCreate", "CompanyPartnership", "PartnershipCreate",
+    "OutboxEmail", "EmailStatus"
 ]
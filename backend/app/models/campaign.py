@@ -124,6 +124,25 @@ class CampaignUpdate(BaseModel):
         return v
 
 
+class CampaignUpdateNotice(BaseModel):
+    message: str
+    subject: Optional[str] = None
+
+    @validator('message')
+    def validate_message(cls, v):
+        if not v or len(v.strip()) < 10:
+            raise ValueError('Update message must be at least 10 characters long')
+        if len(v) > 10000:
+            raise ValueError('Update message cannot exceed 10,000 characters')
+        return v.strip()
+
+    @validator('subject')
+    def validate_subject(cls, v):
+        if v and len(v) > 200:
+            raise ValueError('Subject cannot exceed 200 characters')
+        return v.strip() if v else v
+
+
 class CampaignResponse(BaseModel):
     id: int
     user_id: int
@@ -35,6 +35,7 @@ class Payment(BaseModel):
     is_anonymous: bool = False
     message: Optional[str] = None
     created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
     processed_at: Optional[datetime] = None
 
     @validator('amount')
@@ -1,13 +1,33 @@
-from typing import Optional, List
+from typing import Optional, List, Dict, Any
 from datetime import datetime, timedelta
 import logging
 from decimal import Decimal
 
 from app.models.campaign import Campaign, CampaignCreate, CampaignUpdate, CampaignStatus, CampaignDuration
 from app.core.exceptions import NotFoundException, ValidationException, CampaignException
+from app.core.cache import create_cache
+from app.core.config import settings
+from app.core.pagination import fetch_page
 
 logger = logging.getLogger(__name__)
 
+# Read-through caches for public campaign pages, shared by all requests in this worker
+campaign_cache = create_cache("campaigns", settings.CAMPAIGN_CACHE_MAX_ENTRIES, settings.CAMPAIGN_CACHE_TTL_SECONDS)
+campaign_list_cache = create_cache("campaign_lists", settings.CAMPAIGN_CACHE_MAX_ENTRIES, settings.CAMPAIGN_CACHE_TTL_SECONDS)
+
+
+def invalidate_campaign_cache(campaign_id: Optional[int] = None):
+    """Drop cached data for a campaign after it changes.
+
+    Any campaign write can move it in or out of a filtered list, so all
+    cached listings are dropped as well.
+    """
+    if campaign_id is not None:
+        campaign_cache.invalidate(campaign_id)
+    else:
+        campaign_cache.clear()
+    campaign_list_cache.clear()
+
 
 class CampaignService:
     def __init__(self, supabase):
@@ -43,12 +63,13 @@ class CampaignService:
             }
             
             # Insert campaign into database
-            result = self.supabase.table("campaigns").insert(campaign_dict).execute()
+            result = await self.supabase.table("campaigns").insert(campaign_dict).execute()
             
             if not result.data:
                 raise ValidationException("Failed to create campaign")
             
             campaign_data_dict = result.data[0]
+            invalidate_campaign_cache(campaign_data_dict["id"])
             return Campaign(**campaign_data_dict)
             
         except Exception as e:
@@ -57,13 +78,19 @@ class CampaignService:
 
     async def get_campaign_by_id(self, campaign_id: int) -> Optional[Campaign]:
         """Get campaign by ID"""
+        cached = campaign_cache.get(campaign_id)
+        if cached is not None:
+            return cached
+        
         try:
-            result = self.supabase.table("campaigns").select("*").eq("id", campaign_id).execute()
+            result = await self.supabase.table("campaigns").select("*").eq("id", campaign_id).execute()
             
             if not result.data:
                 return None
             
-            return Campaign(**result.data[0])
+            campaign = Campaign(**result.data[0])
+            campaign_cache.set(campaign_id, campaign)
+            return campaign
         except Exception as e:
             logger.error(f"Error getting campaign by ID: {e}")
             return None
@@ -74,36 +101,43 @@ class CampaignService:
         category: Optional[str] = None,
         featured: Optional[bool] = None,
         limit: int = 20,
-        offset: int = 0
-    ) -> List[Campaign]:
-        """Get campaigns with filters"""
+        cursor: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Get a page of campaigns with filters, newest first.
+
+        Returns ``{"items": [Campaign, ...], "next_cursor": str | None}``.
+        """
+        cache_key = (status, category, featured, limit, cursor)
+        cached = campaign_list_cache.get(cache_key)
+        if cached is not None:
+            items, next_cursor = cached
+            return {"items": list(items), "next_cursor": next_cursor}
+        
+        query = self.supabase.table("campaigns").select("*")
+        
+        if status:
+            query = query.eq("status", status.value)
+        if category:
+            query = query.eq("category", category)
+        if featured is not None:
+            query = query.eq("is_featured", featured)
+        
         try:
-            query = self.supabase.table("campaigns").select("*")
-            
-            if status:
-                query = query.eq("status", status.value)
-            if category:
-                query = query.eq("category", category)
-            if featured is not None:
-                query = query.eq("is_featured", featured)
-            
-            query = query.order("created_at", desc=True).range(offset, offset + limit - 1)
-            result = query.execute()
-            
-            campaigns = []
-            if result.data:
-                for campaign_data in result.data:
-                    campaigns.append(Campaign(**campaign_data))
-            
-            return campaigns
+            page = await fetch_page(query, cursor, limit)
+        except ValidationException:
+            raise
         except Exception as e:
             logger.error(f"Error getting campaigns: {e}")
-            return []
+            return {"items": [], "next_cursor": None}
+        
+        campaigns = [Campaign(**campaign_data) for campaign_data in page["items"]]
+        campaign_list_cache.set(cache_key, (tuple(campaigns), page["next_cursor"]))
+        return {"items": campaigns, "next_cursor": page["next_cursor"]}
 
     async def get_user_campaigns(self, user_id: int) -> List[Campaign]:
         """Get campaigns for a specific user"""
         try:
-            result = self.supabase.table("campaigns").select("*").eq("user_id", user_id).order("created_at", desc=True).execute()
+            result = await self.supabase.table("campaigns").select("*").eq("user_id", user_id).order("created_at", desc=True).execute()
             
             campaigns = []
             if result.data:
@@ -139,7 +173,8 @@ class CampaignService:
             
             update_dict["updated_at"] = datetime.utcnow().isoformat()
             
-            result = self.supabase.table("campaigns").update(update_dict).eq("id", campaign_id).execute()
+            result = await self.supabase.table("campaigns").update(update_dict).eq("id", campaign_id).execute()
+            invalidate_campaign_cache(campaign_id)
             
             if not result.data:
                 return None
@@ -152,7 +187,8 @@ class CampaignService:
     async def delete_campaign(self, campaign_id: int) -> bool:
         """Delete campaign"""
         try:
-            result = self.supabase.table("campaigns").delete().eq("id", campaign_id).execute()
+            result = await self.supabase.table("campaigns").delete().eq("id", campaign_id).execute()
+            invalidate_campaign_cache(campaign_id)
             return len(result.data) > 0
         except Exception as e:
             logger.error(f"Error deleting campaign: {e}")
@@ -170,11 +206,12 @@ class CampaignService:
                 raise CampaignException("Campaign is not in draft status")
             
             # Update campaign status to active
-            result = self.supabase.table("campaigns").update({
+            result = await self.supabase.table("campaigns").update({
                 "status": CampaignStatus.ACTIVE.value,
                 "start_date": datetime.utcnow().isoformat(),
                 "updated_at": datetime.utcnow().isoformat()
             }).eq("id", campaign_id).execute()
+            invalidate_campaign_cache(campaign_id)
             
             return len(result.data) > 0
         except Exception as e:
@@ -185,7 +222,7 @@ class CampaignService:
         """Check if user has met referral requirements"""
         try:
             # Get user's referral count
-            result = self.supabase.table("users").select("referral_count").eq("id", user_id).execute()
+            result = await self.supabase.table("users").select("referral_count").eq("id", user_id).execute()
             
             if not result.data:
                 return False
@@ -215,32 +252,30 @@ class CampaignService:
 
     async def get_donor_count(self, campaign_id: int) -> int:
         """Get number of donors for a campaign"""
+        donor_counts = await self.get_donor_counts([campaign_id])
+        return donor_counts.get(campaign_id, 0)
+
+    async def get_donor_counts(self, campaign_ids: List[int]) -> Dict[int, int]:
+        """Get number of donors for several campaigns in one grouped query"""
+        if not campaign_ids:
+            return {}
         try:
-            result = self.supabase.table("campaign_payments").select("id", count="exact").eq("campaign_id", campaign_id).execute()
-            return result.count if result.count else 0
+            result = await self.supabase.rpc("get_campaign_donor_counts", {"campaign_ids": list(campaign_ids)}).execute()
+            return {row["campaign_id"]: row["donor_count"] for row in result.data or []}
         except Exception as e:
-            logger.error(f"Error getting donor count: {e}")
-            return 0
+            logger.error(f"Error getting donor counts: {e}")
+            return {}
 
     async def update_campaign_amount(self, campaign_id: int, amount: Decimal) -> bool:
-        """Update campaign current amount"""
+        """Atomically add amount to campaign current amount"""
         try:
-            # Get current amount
-            result = self.supabase.table("campaigns").select("current_amount").eq("id", campaign_id).execute()
-            
-            if not result.data:
-                return False
-            
-            current_amount = Decimal(str(result.data[0]["current_amount"]))
-            new_amount = current_amount + amount
-            
-            # Update amount
-            self.supabase.table("campaigns").update({
-                "current_amount": float(new_amount),
-                "updated_at": datetime.utcnow().isoformat()
-            }).eq("id", campaign_id).execute()
+            result = await self.supabase.rpc("increment_campaign_amount", {
+                "campaign_id": campaign_id,
+                "delta": float(amount)
+            }).execute()
+            invalidate_campaign_cache(campaign_id)
             
-            return True
+            return bool(result.data)
         except Exception as e:
             logger.error(f"Error updating campaign amount: {e}")
             return False
@@ -0,0 +1,172 @@
+from typing import Any, AsyncIterator, Dict, List, Optional
+from urllib.parse import urlencode
+import asyncio
+import hashlib
+import hmac
+import html
+import logging
+import time
+
+from app.core.config import settings
+from app.core.jobs import Job, start_job
+from app.models.campaign import Campaign
+from app.services.email_outbox_service import EmailOutboxService
+from app.services.email_service import EmailService, OutgoingEmail
+from app.services.email_templates import render_email
+
+logger = logging.getLogger(__name__)
+
+CAMPAIGN_UPDATE_JOB = "campaign_update"
+ANONYMOUS_GREETING = "Supporter"
+
+# Templates are rendered once per greeting and the per-recipient unsubscribe
+# link is swapped in afterwards
+UNSUBSCRIBE_PLACEHOLDER = "__UNSUBSCRIBE_URL__"
+
+
+def unsubscribe_token(email: str) -> str:
+    """Sign an address so unsubscribe links cannot be forged for other people"""
+    digest = hmac.new(settings.SECRET_KEY.encode("utf-8"), email.lower().encode("utf-8"), hashlib.sha256)
+    return digest.hexdigest()[:32]
+
+
+def verify_unsubscribe_token(email: str, token: str) -> bool:
+    """Check a token produced by unsubscribe_token"""
+    return hmac.compare_digest(unsubscribe_token(email), token or "")
+
+
+def unsubscribe_url(email: str) -> str:
+    """Build the one-click unsubscribe link for a recipient"""
+    query = urlencode({"email": email, "token": unsubscribe_token(email)})
+    return f"{settings.BACKEND_URL}/api/v1/campaigns/updates/unsubscribe?{query}"
+
+
+class RateLimiter:
+    """Token bucket allowing `rate` sends per second with bursts up to `capacity`"""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = max(capacity or rate, 1)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    async def acquire(self, count: int):
+        """Wait until `count` sends are allowed"""
+        while count > 0:
+            # The bucket never holds more than capacity, so larger requests
+            # are taken in steps rather than waiting for tokens that never come
+            step = min(count, self.capacity)
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= step:
+                self.tokens -= step
+                count -= step
+                continue
+            await asyncio.sleep((step - self.tokens) / self.rate)
+
+
+class CampaignUpdateService:
+    """Fans a campaign update out to every donor of the campaign"""
+
+    def __init__(self, supabase):
+        self.supabase = supabase
+
+    async def iter_recipient_pages(self, campaign_id: int) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Yield pages of distinct, subscribed donor addresses in address order"""
+        after_email = None
+        page_size = settings.CAMPAIGN_UPDATE_PAGE_SIZE
+        while True:
+            result = await self.supabase.rpc("get_campaign_update_recipients", {
+                "campaign_id": campaign_id,
+                "after_email": after_email,
+                "page_size": page_size
+            }).execute()
+            rows = result.data or []
+            if rows:
+                yield rows
+            if len(rows) < page_size:
+                return
+            after_email = rows[-1]["email"]
+
+    async def unsubscribe(self, email: str) -> bool:
+        """Opt an address out of campaign update mailings"""
+        try:
+            await self.supabase.table("email_unsubscribes").upsert({"email": email.lower()}).execute()
+            return True
+        except Exception as e:
+            logger.error(f"Error unsubscribing {email}: {e}")
+            return False
+
+    def _build_page(self, campaign: Campaign, subject: str, message: str, rows: List[Dict[str, Any]]) -> List[OutgoingEmail]:
+        """Render one email per greeting in the page and address it to each recipient"""
+        rendered: Dict[str, tuple] = {}
+        emails = []
+        for row in rows:
+            # Anonymous donors get a generic greeting rather than the name they gave
+            greeting = ANONYMOUS_GREETING if row.get("is_anonymous") or not row.get("donor_name") else row["donor_name"]
+            if greeting not in rendered:
+                rendered[greeting] = render_email(
+                    "campaign_update",
+                    supporter_name=greeting,
+                    campaign_title=campaign.title,
+                    update_message=message,
+                    unsubscribe_url=UNSUBSCRIBE_PLACEHOLDER
+                )
+            html_content, text_content = rendered[greeting]
+            link = unsubscribe_url(row["email"])
+            emails.append(OutgoingEmail(
+                to_email=row["email"],
+                subject=subject,
+                html_content=html_content.replace(UNSUBSCRIBE_PLACEHOLDER, html.escape(link)),
+                text_content=text_content.replace(UNSUBSCRIBE_PLACEHOLDER, link)
+            ))
+        return emails
+
+    async def _fan_out(self, job: Job, campaign: Campaign, subject: str, message: str) -> Dict[str, Any]:
+        """Stream recipients page by page and send them through the rate limiter"""
+        email_service = EmailService()
+        outbox = EmailOutboxService(self.supabase)
+        batch_size = settings.CAMPAIGN_UPDATE_BATCH_SIZE
+        limiter = RateLimiter(settings.CAMPAIGN_UPDATE_RATE_PER_SECOND, capacity=batch_size)
+        seen = set()
+        progress = job.progress
+        progress.update({"recipients": 0, "sent": 0, "queued_for_retry": 0, "failed": 0, "pages": 0, "emails_per_second": 0.0})
+        started = time.monotonic()
+
+        async for rows in self.iter_recipient_pages(campaign.id):
+            progress["pages"] += 1
+            rows = [row for row in rows if row["email"] not in seen]
+            seen.update(row["email"] for row in rows)
+            progress["recipients"] += len(rows)
+            emails = self._build_page(campaign, subject, message, rows)
+
+            for start in range(0, len(emails), batch_size):
+                batch = emails[start:start + batch_size]
+                await limiter.acquire(len(batch))
+                errors = await email_service.send_bulk(batch)
+                for email, error in zip(batch, errors):
+                    if error is None:
+                        progress["sent"] += 1
+                        continue
+                    # Hand transient failures to the outbox so they get backoff and retries
+                    try:
+                        await outbox.enqueue(email.to_email, email.subject, email.html_content, email.text_content)
+                        progress["queued_for_retry"] += 1
+                    except Exception as e:
+                        logger.error(f"Campaign update to {email.to_email} lost: {error}; outbox: {e}")
+                        progress["failed"] += 1
+                elapsed = time.monotonic() - started
+                progress["emails_per_second"] = round(progress["sent"] / elapsed, 2) if elapsed else 0.0
+
+        logger.info(f"Campaign {campaign.id} update sent to {progress['sent']} of {progress['recipients']} donors")
+        return {"recipients": progress["recipients"], "sent": progress["sent"]}
+
+    def start_fan_out(self, campaign: Campaign, message: str, owner_id: int, subject: Optional[str] = None) -> Job:
+        """Start sending an update to every donor in the background"""
+        subject = subject or f"Update from {campaign.title}"
+        return start_job(
+            CAMPAIGN_UPDATE_JOB,
+            lambda job: self._fan_out(job, campaign, subject, message),
+            owner_id=owner_id
+        )
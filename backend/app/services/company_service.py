@@ -28,7 +28,7 @@ class CompanyService:
             }
             
             # Insert company into database
-            result = self.supabase.table("companies").insert(company_dict).execute()
+            result = await self.supabase.table("companies").insert(company_dict).execute()
             
             if not result.data:
                 raise ValidationException("Failed to create company")
@@ -43,7 +43,7 @@ class CompanyService:
     async def get_companies(self) -> List[Company]:
         """Get all companies"""
         try:
-            result = self.supabase.table("companies").select("*").order("created_at", desc=True).execute()
+            result = await self.supabase.table("companies").select("*").order("created_at", desc=True).execute()
             
             companies = []
             if result.data:
@@ -73,7 +73,7 @@ class CompanyService:
             }
             
             # Insert partnership into database
-            result = self.supabase.table("company_partnerships").insert(partnership_dict).execute()
+            result = await self.supabase.table("company_partnerships").insert(partnership_dict).execute()
             
             if not result.data:
                 raise ValidationException("Failed to create partnership")
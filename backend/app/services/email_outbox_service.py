@@ -0,0 +1,228 @@
+from typing import Any, Dict, List, Optional
+from datetime import datetime, timedelta
+import asyncio
+import logging
+import random
+
+from app.core.config import settings
+from app.core.pagination import fetch_page
+from app.models.email_outbox import OutboxEmail, EmailStatus
+
+logger = logging.getLogger(__name__)
+
+# Background workers that drain the outbox, plus a wake-up signal so freshly
+# queued mail goes out without waiting for the next poll
+_worker_tasks: List[asyncio.Task] = []
+_wakeup: Optional[asyncio.Event] = None
+_worker_stats: Dict[str, int] = {"sent": 0, "retried": 0, "dead": 0, "lease_lost": 0}
+
+
+def retry_delay(attempts: int) -> float:
+    """Exponential backoff with jitter for the given attempt number"""
+    delay = min(settings.EMAIL_RETRY_MAX_SECONDS, settings.EMAIL_RETRY_BASE_SECONDS * (2 ** max(0, attempts - 1)))
+    return delay * random.uniform(0.5, 1.0)
+
+
+class EmailOutboxService:
+    """Durable queue of outgoing email backed by the email_outbox table"""
+
+    def __init__(self, supabase):
+        self.supabase = supabase
+
+    async def enqueue(
+        self,
+        to_email: str,
+        subject: str,
+        html_content: str,
+        text_content: Optional[str] = None
+    ) -> int:
+        """Store an email for background delivery and return its outbox id"""
+        result = await self.supabase.table("email_outbox").insert({
+            "to_email": to_email,
+            "subject": subject,
+            "html_content": html_content,
+            "text_content": text_content,
+            "status": EmailStatus.PENDING.value,
+            "next_attempt_at": datetime.utcnow().isoformat()
+        }).execute()
+        notify_email_workers()
+        return result.data[0]["id"]
+
+    async def claim_batch(self, limit: int) -> List[OutboxEmail]:
+        """Lease up to limit due emails to the calling worker"""
+        result = await self.supabase.rpc("claim_email_outbox", {
+            "batch_size": limit,
+            "lease_seconds": settings.EMAIL_SEND_LEASE_SECONDS
+        }).execute()
+        return [OutboxEmail(**row) for row in result.data or []]
+
+    def _leased(self, query, email: OutboxEmail):
+        """Restrict an update to the lease this worker holds.
+
+        Every claim bumps attempts, so a worker whose lease expired and was
+        re-claimed no longer matches and cannot overwrite the new holder's result.
+        """
+        return query.eq("id", email.id).eq("status", EmailStatus.SENDING.value).eq("attempts", email.attempts)
+
+    async def mark_sent(self, email: OutboxEmail) -> bool:
+        """Record a successful delivery; False if the lease was lost meanwhile"""
+        result = await self._leased(self.supabase.table("email_outbox").update({
+            "status": EmailStatus.SENT.value,
+            "sent_at": datetime.utcnow().isoformat(),
+            "last_error": None
+        }), email).execute()
+        return bool(result.data)
+
+    async def mark_failed(self, email: OutboxEmail, error: str) -> Optional[EmailStatus]:
+        """Schedule a retry with backoff, or dead-letter once attempts run out.
+
+        Returns None if the lease was lost meanwhile.
+        """
+        if email.attempts >= settings.EMAIL_MAX_ATTEMPTS:
+            status = EmailStatus.DEAD
+            next_attempt_at = datetime.utcnow()
+        else:
+            status = EmailStatus.PENDING
+            next_attempt_at = datetime.utcnow() + timedelta(seconds=retry_delay(email.attempts))
+
+        result = await self._leased(self.supabase.table("email_outbox").update({
+            "status": status.value,
+            "next_attempt_at": next_attempt_at.isoformat(),
+            "last_error": error[:1000]
+        }), email).execute()
+        return status if result.data else None
+
+    async def get_email(self, email_id: int) -> Optional[OutboxEmail]:
+        """Get one outbox entry with its delivery status"""
+        try:
+            result = await self.supabase.table("email_outbox").select("*").eq("id", email_id).execute()
+            if not result.data:
+                return None
+            return OutboxEmail(**result.data[0])
+        except Exception as e:
+            logger.error(f"Error getting outbox email {email_id}: {e}")
+            return None
+
+    async def get_emails(
+        self,
+        status: Optional[EmailStatus] = None,
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Get a page of outbox entries, newest first"""
+        query = self.supabase.table("email_outbox").select(
+            "id,to_email,subject,status,attempts,next_attempt_at,last_error,created_at,sent_at"
+        )
+        if status:
+            query = query.eq("status", status.value)
+        return await fetch_page(query, cursor, limit)
+
+    async def requeue(self, email_id: int) -> bool:
+        """Put a dead-lettered email back in the queue with a fresh attempt budget"""
+        try:
+            result = await self.supabase.table("email_outbox").update({
+                "status": EmailStatus.PENDING.value,
+                "attempts": 0,
+                "next_attempt_at": datetime.utcnow().isoformat()
+            }).eq("id", email_id).eq("status", EmailStatus.DEAD.value).execute()
+            notify_email_workers()
+            return bool(result.data)
+        except Exception as e:
+            logger.error(f"Error requeueing outbox email {email_id}: {e}")
+            return False
+
+
+def notify_email_workers():
+    """Wake idle workers so new mail is picked up immediately"""
+    if _wakeup is not None:
+        _wakeup.set()
+
+
+async def _settle(outbox: EmailOutboxService, email: OutboxEmail, error: Optional[Exception]):
+    """Record the outcome of one delivery attempt"""
+    if error is None:
+        if await outbox.mark_sent(email):
+            _worker_stats["sent"] += 1
+            return
+        status = None
+    else:
+        status = await outbox.mark_failed(email, str(error))
+
+    if status is None:
+        # The lease ran out mid-send and another worker re-claimed the email,
+        # so it may be delivered twice; that worker's outcome stands
+        _worker_stats["lease_lost"] += 1
+        logger.warning(
+            f"Email {email.id} to {email.to_email} outlived its lease on attempt {email.attempts} "
+            f"({'sent' if error is None else error}); it may be delivered twice"
+        )
+    elif status == EmailStatus.DEAD:
+        _worker_stats["dead"] += 1
+        logger.error(f"Email {email.id} to {email.to_email} dead-lettered after {email.attempts} attempts: {error}")
+    else:
+        _worker_stats["retried"] += 1
+        logger.warning(f"Email {email.id} to {email.to_email} failed on attempt {email.attempts}, will retry: {error}")
+
+
+async def _deliver_batch(outbox: EmailOutboxService, email_service, batch: List[OutboxEmail]):
+    """Send a leased batch over the SMTP pool and record every outcome"""
+    errors = await email_service.send_bulk(batch)
+    await asyncio.gather(*(_settle(outbox, email, error) for email, error in zip(batch, errors)))
+
+
+async def _worker_loop(worker_id: int):
+    """Drain due outbox entries until cancelled"""
+    from app.core.database import get_supabase_admin
+    from app.services.email_service import EmailService
+
+    try:
+        outbox = EmailOutboxService(get_supabase_admin())
+    except Exception as e:
+        logger.error(f"Email worker {worker_id} not started, database unavailable: {e}")
+        return
+    email_service = EmailService()
+
+    while True:
+        try:
+            batch = await outbox.claim_batch(settings.EMAIL_OUTBOX_BATCH_SIZE)
+            if batch:
+                await _deliver_batch(outbox, email_service, batch)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Email worker {worker_id} error: {e}")
+            batch = []
+
+        if not batch:
+            try:
+                await asyncio.wait_for(_wakeup.wait(), timeout=settings.EMAIL_OUTBOX_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            _wakeup.clear()
+
+
+def start_email_workers():
+    """Start the background email workers on the running event loop"""
+    global _wakeup
+    if _worker_tasks:
+        return
+    _wakeup = asyncio.Event()
+    for worker_id in range(settings.EMAIL_WORKERS):
+        _worker_tasks.append(asyncio.create_task(_worker_loop(worker_id)))
+    logger.info(f"Started {settings.EMAIL_WORKERS} email outbox workers")
+
+
+async def stop_email_workers():
+    """Cancel the background email workers; leased mail is retried after its lease expires"""
+    for task in _worker_tasks:
+        task.cancel()
+    await asyncio.gather(*_worker_tasks, return_exceptions=True)
+    _worker_tasks.clear()
+
+
+def get_email_worker_metrics() -> Dict[str, Any]:
+    """Get delivery counters for this process's email workers"""
+    return {
+        "workers": len(_worker_tasks),
+        **_worker_stats
+    }
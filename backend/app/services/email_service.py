@@ -1,15 +1,214 @@
+import asyncio
 import smtplib
 import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, NamedTuple
 from datetime import datetime
 
 from app.core.config import settings
+from app.core.database import get_supabase_admin
+from app.services.email_outbox_service import EmailOutboxService
+from app.services.email_templates import render_email
 
 logger = logging.getLogger(__name__)
 
 
+class OutgoingEmail(NamedTuple):
+    to_email: str
+    subject: str
+    html_content: str
+    text_content: Optional[str] = None
+
+
+class _PooledConnection:
+    def __init__(self, server: smtplib.SMTP):
+        self.server = server
+        self.sent = 0
+        self.last_used = time.monotonic()
+
+
+class SMTPConnectionPool:
+    """Keeps authenticated SMTP sessions open and sends many messages per session.
+
+    Sends run on a dedicated thread pool whose size is also the maximum number
+    of concurrent SMTP connections, so callers queue instead of opening more.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        username: str,
+        password: str,
+        size: int,
+        max_messages_per_connection: int,
+        idle_timeout: float,
+        timeout: float
+    ):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.size = size
+        self.max_messages_per_connection = max_messages_per_connection
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=size, thread_name_prefix="smtp")
+        self._idle: List[_PooledConnection] = []
+        self._lock = threading.Lock()
+        self._open = 0
+        self._connects = 0
+        self._reconnects = 0
+        self._sent = 0
+        self._failed = 0
+
+    def _connect(self) -> _PooledConnection:
+        """Open, secure and authenticate a new SMTP session"""
+        server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            server.starttls()
+            server.login(self.username, self.password)
+        except Exception:
+            server.close()
+            raise
+        with self._lock:
+            self._open += 1
+            self._connects += 1
+        return _PooledConnection(server)
+
+    def _discard(self, connection: _PooledConnection, polite: bool = False):
+        """Close a session, with QUIT if it is still healthy"""
+        try:
+            if polite:
+                connection.server.quit()
+            else:
+                connection.server.close()
+        except Exception:
+            pass
+        with self._lock:
+            self._open -= 1
+
+    def _acquire(self) -> Optional[_PooledConnection]:
+        """Take the most recently used idle session that has not gone stale"""
+        while True:
+            with self._lock:
+                if not self._idle:
+                    return None
+                connection = self._idle.pop()
+            if time.monotonic() - connection.last_used < self.idle_timeout:
+                return connection
+            self._discard(connection, polite=True)
+
+    def _release(self, connection: _PooledConnection):
+        """Return a session to the pool, retiring it once it has sent its quota"""
+        connection.last_used = time.monotonic()
+        if connection.sent >= self.max_messages_per_connection:
+            self._discard(connection, polite=True)
+            return
+        with self._lock:
+            self._idle.append(connection)
+
+    def _send_sync(self, msg: MIMEMultipart):
+        """Send on a pooled session, reconnecting once if a reused session has dropped"""
+        connection = self._acquire()
+        reused = connection is not None
+        while True:
+            if connection is None:
+                connection = self._connect()
+            try:
+                connection.server.send_message(msg)
+            except (smtplib.SMTPResponseException, smtplib.SMTPRecipientsRefused):
+                # The server rejected this message but the session is still usable
+                try:
+                    connection.server.rset()
+                    self._release(connection)
+                except Exception:
+                    self._discard(connection)
+                with self._lock:
+                    self._failed += 1
+                raise
+            except Exception:
+                self._discard(connection)
+                if reused:
+                    # Idle sessions get dropped by the server; retry once on a fresh one
+                    reused = False
+                    connection = None
+                    with self._lock:
+                        self._reconnects += 1
+                    continue
+                with self._lock:
+                    self._failed += 1
+                raise
+            connection.sent += 1
+            with self._lock:
+                self._sent += 1
+            self._release(connection)
+            return
+
+    async def send(self, msg: MIMEMultipart):
+        """Send a message without blocking the event loop"""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._executor, self._send_sync, msg)
+
+    def close(self):
+        """Close every idle session and stop the send threads"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for connection in idle:
+            self._discard(connection, polite=True)
+        self._executor.shutdown(wait=False)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Get connection and delivery counters"""
+        with self._lock:
+            return {
+                "size": self.size,
+                "open_connections": self._open,
+                "idle_connections": len(self._idle),
+                "connects": self._connects,
+                "reconnects": self._reconnects,
+                "sent": self._sent,
+                "failed": self._failed,
+            }
+
+
+_smtp_pool: Optional[SMTPConnectionPool] = None
+
+
+def get_smtp_pool() -> SMTPConnectionPool:
+    """Get the shared SMTP pool, creating it on first use"""
+    global _smtp_pool
+    if _smtp_pool is None:
+        _smtp_pool = SMTPConnectionPool(
+            host=settings.SMTP_HOST,
+            port=settings.SMTP_PORT,
+            username=settings.SMTP_USERNAME,
+            password=settings.SMTP_PASSWORD,
+            size=settings.SMTP_POOL_SIZE,
+            max_messages_per_connection=settings.SMTP_MAX_MESSAGES_PER_CONNECTION,
+            idle_timeout=settings.SMTP_IDLE_TIMEOUT_SECONDS,
+            timeout=settings.SMTP_TIMEOUT_SECONDS
+        )
+    return _smtp_pool
+
+
+def close_smtp_pool():
+    """Close the shared SMTP pool on application shutdown"""
+    global _smtp_pool
+    if _smtp_pool is not None:
+        _smtp_pool.close()
+        _smtp_pool = None
+
+
+def get_smtp_pool_metrics() -> Dict[str, Any]:
+    """Get SMTP pool counters, or an empty dict before the first send"""
+    return _smtp_pool.metrics() if _smtp_pool is not None else {}
+
+
 class EmailService:
     """Service for sending emails"""
     
@@ -26,65 +225,74 @@ class EmailService:
         html_content: str,
         text_content: Optional[str] = None
     ) -> bool:
-        """Send email to recipient"""
-        try:
-            # Check if email is configured
-            if not all([self.smtp_host, self.smtp_username, self.smtp_password]):
-                logger.warning(f"Email not configured, logging email instead: {subject} to {to_email}")
-                self._log_email_content(to_email, subject, html_content, text_content)
-                return True  # Return True for development
-            
-            # Validate email address
-            if not self._is_valid_email(to_email):
-                logger.error(f"Invalid email address: {to_email}")
-                return False
-            
-            # Create message
-            msg = MIMEMultipart('alternative')
-            msg['Subject'] = subject
-            msg['From'] = self.smtp_username
-            msg['To'] = to_email
-            
-            # Add text content if provided
-            if text_content:
-                text_part = MIMEText(text_content, 'plain')
-                msg.attach(text_part)
-            
-            # Add HTML content
-            html_part = MIMEText(html_content, 'html')
-            msg.attach(html_part)
-            
-            # Send email with retry logic
-            max_retries = 3
-            for attempt in range(max_retries):
-                try:
-                    with smtplib.SMTP(self.smtp_host, self.smtp_port, timeout=30) as server:
-                        server.starttls()
-                        server.login(self.smtp_username, self.smtp_password)
-                        server.send_message(msg)
-                    
-                    logger.info(f"Email sent successfully to {to_email}")
-                    return True
-                    
-                except smtplib.SMTPException as e:
-                    logger.warning(f"SMTP error on attempt {attempt + 1}: {e}")
-                    if attempt == max_retries - 1:
-                        raise
-                    continue
-                except Exception as e:
-                    logger.error(f"Unexpected error on attempt {attempt + 1}: {e}")
-                    if attempt == max_retries - 1:
-                        raise
-                    continue
-            
+        """Queue an email in the outbox for background delivery"""
+        # Validate email address
+        if not self._is_valid_email(to_email):
+            logger.error(f"Invalid email address: {to_email}")
             return False
-            
+        
+        try:
+            outbox = EmailOutboxService(get_supabase_admin())
+            email_id = await outbox.enqueue(to_email, subject, html_content, text_content)
+            logger.info(f"Email {email_id} to {to_email} queued")
+            return True
+        except Exception as e:
+            # Without an outbox the message would be lost, so fall back to sending it now
+            logger.error(f"Failed to queue email to {to_email}, sending inline: {e}")
+        
+        try:
+            await self.deliver(to_email, subject, html_content, text_content)
+            return True
         except Exception as e:
             logger.error(f"Failed to send email to {to_email}: {e}")
             # Log email content for debugging
             self._log_email_content(to_email, subject, html_content, text_content)
             return False
 
+    async def deliver(
+        self,
+        to_email: str,
+        subject: str,
+        html_content: str,
+        text_content: Optional[str] = None
+    ):
+        """Send one email over a pooled SMTP session right now. Raises on
+        failure; retries are the outbox worker's job."""
+        # Check if email is configured
+        if not all([self.smtp_host, self.smtp_username, self.smtp_password]):
+            logger.warning(f"Email not configured, logging email instead: {subject} to {to_email}")
+            self._log_email_content(to_email, subject, html_content, text_content)
+            return
+        
+        # Create message
+        msg = MIMEMultipart('alternative')
+        msg['Subject'] = subject
+        msg['From'] = self.smtp_username
+        msg['To'] = to_email
+        
+        # Add text content if provided
+        if text_content:
+            text_part = MIMEText(text_content, 'plain')
+            msg.attach(text_part)
+        
+        # Add HTML content
+        html_part = MIMEText(html_content, 'html')
+        msg.attach(html_part)
+        
+        await get_smtp_pool().send(msg)
+
+    async def send_bulk(self, messages: List[OutgoingEmail]) -> List[Optional[Exception]]:
+        """Send a batch across pooled sessions (at most SMTP_POOL_SIZE at once).
+
+        Accepts anything with to_email/subject/html_content/text_content
+        attributes. Returns None for each delivered message, else its error.
+        """
+        results = await asyncio.gather(*(
+            self.deliver(m.to_email, m.subject, m.html_content, m.text_content)
+            for m in messages
+        ), return_exceptions=True)
+        return [result if isinstance(result, Exception) else None for result in results]
+
     def _is_valid_email(self, email: str) -> bool:
         """Validate email address format"""
         import re
@@ -105,83 +313,19 @@ class EmailService:
     async def send_welcome_email(self, user_email: str, user_name: str) -> bool:
         """Send welcome email to new user"""
         subject = "Welcome to Fundraising Platform!"
-        
-        html_content = f"""
-        <html>
-        <body>
-            <h2>Welcome to Fundraising Platform, {user_name}!</h2>
-            <p>Thank you for joining our community of student fundraisers.</p>
-            <p>You can now:</p>
-            <ul>
-                <li>Create your first campaign</li>
-                <li>Refer 5 friends to meet the requirement</li>
-                <li>Start raising funds for your goals</li>
-            </ul>
-            <p>Get started by creating your campaign today!</p>
-            <p>Best regards,<br>The Fundraising Platform Team</p>
-        </body>
-        </html>
-        """
-        
-        return await self.send_email(user_email, subject, html_content)
+        html_content, text_content = render_email("welcome", user_name=user_name)
+        return await self.send_email(user_email, subject, html_content, text_content)
 
     async def send_password_reset_email(self, user_email: str, user_name: str, reset_token: str) -> bool:
         """Send password reset email with user name"""
         subject = "Reset your password - Fundraising Platform"
-        
-        html_content = f"""
-        <html>
-        <body style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto; padding: 20px;">
-            <div style="background-color: #f8f9fa; padding: 20px; border-radius: 10px;">
-                <h2 style="color: #4F46E5;">Password Reset Request</h2>
-                <p>Hello {user_name},</p>
-                <p>You requested to reset your password for your Fundraising Platform account.</p>
-                <p>Click the button below to reset your password:</p>
-                <div style="text-align: center; margin: 30px 0;">
-                    <a href="{settings.FRONTEND_URL}/reset-password?token={reset_token}" 
-                       style="background-color: #4F46E5; color: white; padding: 15px 30px; text-decoration: none; border-radius: 8px; display: inline-block; font-weight: bold;">
-                       Reset My Password
-                    </a>
-                </div>
-                <p><strong>Important:</strong></p>
-                <ul>
-                    <li>This link will expire in 1 hour</li>
-                    <li>If you didn't request this, please ignore this email</li>
-                    <li>Your password will remain unchanged until you click the link above</li>
-                </ul>
-                <p>If the button doesn't work, copy and paste this link into your browser:</p>
-                <p style="word-break: break-all; background-color: #e9ecef; padding: 10px; border-radius: 5px;">
-                    {settings.FRONTEND_URL}/reset-password?token={reset_token}
-                </p>
-                <hr style="margin: 30px 0; border: none; border-top: 1px solid #dee2e6;">
-                <p style="color: #6c757d; font-size: 14px;">
-                    Best regards,<br>
-                    The Fundraising Platform Team<br>
-                    <a href="{settings.FRONTEND_URL}">{settings.FRONTEND_URL}</a>
-                </p>
-            </div>
-        </body>
-        </html>
-        """
-        
-        text_content = f"""
-        Password Reset Request
-        
-        Hello {user_name},
-        
-        You requested to reset your password for your Fundraising Platform account.
-        
-        To reset your password, click this link:
-        {settings.FRONTEND_URL}/reset-password?token={reset_token}
-        
-        This link will expire in 1 hour.
-        
-        If you didn't request this, please ignore this email.
-        
-        Best regards,
-        The Fundraising Platform Team
-        """
-        
+        html_content, text_content = render_email("password_reset", user_name=user_name, reset_token=reset_token)
+        return await self.send_email(user_email, subject, html_content, text_content)
+
+    async def send_password_reset(self, user_email: str, reset_token: str) -> bool:
+        """Send password reset email"""
+        subject = "Reset your password"
+        html_content, text_content = render_email("password_reset", user_name=None, reset_token=reset_token)
         return await self.send_email(user_email, subject, html_content, text_content)
 
     async def send_partnership_request(
@@ -193,71 +337,13 @@ class EmailService:
     ) -> bool:
         """Send partnership request notification to fundraising team"""
         subject = f"New Partnership Request from {company_name}"
-        
-        # Prepare message section for HTML
-        message_html = ""
-        if message:
-            message_html = f'<div style="background-color: white; padding: 15px; border-radius: 8px; margin: 20px 0;"><h3 style="margin-top: 0; color: #333;">Message</h3><p style="white-space: pre-wrap;">{message}</p></div>'
-        
-        html_content = f"""
-        <html>
-        <body style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto; padding: 20px;">
-            <div style="background-color: #f8f9fa; padding: 20px; border-radius: 10px;">
-                <h2 style="color: #4F46E5;">New Partnership Request</h2>
-                <p>A new organization has requested to partner with our fundraising platform.</p>
-                
-                <div style="background-color: white; padding: 15px; border-radius: 8px; margin: 20px 0; border-left: 4px solid #4F46E5;">
-                    <h3 style="margin-top: 0; color: #333;">Organization Details</h3>
-                    <p><strong>Company/Organization:</strong> {company_name}</p>
-                    <p><strong>Contact Person:</strong> {contact_name}</p>
-                    <p><strong>Email:</strong> {contact_email}</p>
-                </div>
-                
-                {message_html}
-                
-                <div style="background-color: #e9ecef; padding: 15px; border-radius: 8px; margin: 20px 0;">
-                    <h3 style="margin-top: 0; color: #333;">Next Steps</h3>
-                    <ul>
-                        <li>Review the partnership request</li>
-                        <li>Contact {contact_name} at {contact_email}</li>
-                        <li>Discuss partnership terms and benefits</li>
-                        <li>Add organization to partner list if approved</li>
-                    </ul>
-                </div>
-                
-                <hr style="margin: 30px 0; border: none; border-top: 1px solid #dee2e6;">
-                <p style="color: #6c757d; font-size: 14px;">
-                    This email was sent from the Fundraising Platform partnership request form.<br>
-                    <a href="{settings.FRONTEND_URL}">{settings.FRONTEND_URL}</a>
-                </p>
-            </div>
-        </body>
-        </html>
-        """
-        
-        # Prepare message section for text
-        message_text = f"Message:\n{message}\n" if message else ""
-        
-        text_content = f"""
-        New Partnership Request
-        
-        A new organization has requested to partner with our fundraising platform.
-        
-        Organization Details:
-        Company/Organization: {company_name}
-        Contact Person: {contact_name}
-        Email: {contact_email}
-        
-        {message_text}
-        Next Steps:
-        - Review the partnership request
-        - Contact {contact_name} at {contact_email}
-        - Discuss partnership terms and benefits
-        - Add organization to partner list if approved
-        
-        This email was sent from the Fundraising Platform partnership request form.
-        {settings.FRONTEND_URL}
-        """
+        html_content, text_content = render_email(
+            "partnership_request",
+            company_name=company_name,
+            contact_name=contact_name,
+            contact_email=contact_email,
+            message=message
+        )
         
         # Send to fundraising2121@gmail.com
         return await self.send_email("fundraising2121@gmail.com", subject, html_content, text_content)
@@ -271,24 +357,13 @@ class EmailService:
     ) -> bool:
         """Send referral invitation email"""
         subject = f"{inviter_name} invited you to support their campaign!"
-        
-        html_content = f"""
-        <html>
-        <body>
-            <h2>You're invited to support a campaign!</h2>
-            <p>{inviter_name} has invited you to support their campaign: <strong>{campaign_title}</strong></p>
-            <p>Click the link below to view and support their campaign:</p>
-            <p><a href="{settings.FRONTEND_URL}/campaign/referral/{referral_token}" 
-               style="background-color: #4F46E5; color: white; padding: 10px 20px; text-decoration: none; border-radius: 5px;">
-               View Campaign
-            </a></p>
-            <p>Thank you for supporting student fundraisers!</p>
-            <p>Best regards,<br>The Fundraising Platform Team</p>
-        </body>
-        </html>
-        """
-        
-        return await self.send_email(invited_email, subject, html_content)
+        html_content, text_content = render_email(
+            "referral_invite",
+            inviter_name=inviter_name,
+            campaign_title=campaign_title,
+            referral_token=referral_token
+        )
+        return await self.send_email(invited_email, subject, html_content, text_content)
 
     async def send_donation_confirmation(
         self,
@@ -299,21 +374,13 @@ class EmailService:
     ) -> bool:
         """Send donation confirmation email"""
         subject = "Thank you for your donation!"
-        
-        html_content = f"""
-        <html>
-        <body>
-            <h2>Thank you for your donation, {donor_name}!</h2>
-            <p>Your donation of <strong>${amount:.2f}</strong> to <strong>{campaign_title}</strong> has been received.</p>
-            <p>Your support makes a real difference in helping students achieve their goals.</p>
-            <p>A receipt has been generated and is available in your account.</p>
-            <p>Thank you for supporting student fundraisers!</p>
-            <p>Best regards,<br>The Fundraising Platform Team</p>
-        </body>
-        </html>
-        """
-        
-        return await self.send_email(donor_email, subject, html_content)
+        html_content, text_content = render_email(
+            "donation_confirmation",
+            donor_name=donor_name,
+            amount=amount,
+            campaign_title=campaign_title
+        )
+        return await self.send_email(donor_email, subject, html_content, text_content)
 
     async def send_campaign_update(
         self,
@@ -324,176 +391,10 @@ class EmailService:
     ) -> bool:
         """Send campaign update to supporters"""
         subject = f"Update from {campaign_title}"
-        
-        html_content = f"""
-        <html>
-        <body>
-            <h2>Campaign Update: {campaign_title}</h2>
-            <p>Dear {supporter_name},</p>
-            <p>{update_message}</p>
-            <p>Thank you for your continued support!</p>
-            <p>Best regards,<br>The Fundraising Platform Team</p>
-        </body>
-        </html>
-        """
-        
-        return await self.send_email(supporter_email, subject, html_content)
-
-    async def send_password_reset(self, user_email: str, reset_token: str) -> bool:
-        """Send password reset email"""
-        subject = "Reset your password"
-        
-        html_content = f"""
-        <html>
-        <body>
-            <h2>Password Reset Request</h2>
-            <p>You requested to reset your password. Click the link below to reset it:</p>
-            <p><a href="{settings.FRONTEND_URL}/reset-password?token={reset_token}" 
-               style="background-color: #4F46E5; color: white; padding: 10px 20px; text-decoration: none; border-radius: 5px;">
-               Reset Password
-            </a></p>
-            <p>This link will expire in 1 hour.</p>
-            <p>If you didn't request this, please ignore this email.</p>
-            <p>Best regards,<br>The Fundraising Platform Team</p>
-        </body>
-        </html>
-        """
-        
-        return await self.send_email(user_email, subject, html_content)
-
-    async def send_password_reset_email(self, user_email: str, user_name: str, reset_token: str) -> bool:
-        """Send password reset email with user name"""
-        subject = "Reset your password - Fundraising Platform"
-        
-        html_content = f"""
-        <html>
-        <body style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto; padding: 20px;">
-            <div style="background-color: #f8f9fa; padding: 20px; border-radius: 10px;">
-                <h2 style="color: #4F46E5;">Password Reset Request</h2>
-                <p>Hello {user_name},</p>
-                <p>You requested to reset your password for your Fundraising Platform account.</p>
-                <p>Click the button below to reset your password:</p>
-                <div style="text-align: center; margin: 30px 0;">
-                    <a href="{settings.FRONTEND_URL}/reset-password?token={reset_token}" 
-                       style="background-color: #4F46E5; color: white; padding: 15px 30px; text-decoration: none; border-radius: 8px; display: inline-block; font-weight: bold;">
-                       Reset My Password
-                    </a>
-                </div>
-                <p><strong>Important:</strong></p>
-                <ul>
-                    <li>This link will expire in 1 hour</li>
-                    <li>If you didn't request this, please ignore this email</li>
-                    <li>Your password will remain unchanged until you click the link above</li>
-                </ul>
-                <p>If the button doesn't work, copy and paste this link into your browser:</p>
-                <p style="word-break: break-all; background-color: #e9ecef; padding: 10px; border-radius: 5px;">
-                    {settings.FRONTEND_URL}/reset-password?token={reset_token}
-                </p>
-                <hr style="margin: 30px 0; border: none; border-top: 1px solid #dee2e6;">
-                <p style="color: #6c757d; font-size: 14px;">
-                    Best regards,<br>
-                    The Fundraising Platform Team<br>
-                    <a href="{settings.FRONTEND_URL}">{settings.FRONTEND_URL}</a>
-                </p>
-            </div>
-        </body>
-        </html>
-        """
-        
-        text_content = f"""
-        Password Reset Request
-        
-        Hello {user_name},
-        
-        You requested to reset your password for your Fundraising Platform account.
-        
-        To reset your password, click this link:
-        {settings.FRONTEND_URL}/reset-password?token={reset_token}
-        
-        This link will expire in 1 hour.
-        
-        If you didn't request this, please ignore this email.
-        
-        Best regards,
-        The Fundraising Platform Team
-        """
-        
-        return await self.send_email(user_email, subject, html_content, text_content)
-
-    async def send_partnership_request(
-        self,
-        company_name: str,
-        contact_name: str,
-        contact_email: str,
-        message: str
-    ) -> bool:
-        """Send partnership request notification to fundraising team"""
-        subject = f"New Partnership Request from {company_name}"
-        
-        # Prepare message section for HTML
-        message_html = ""
-        if message:
-            message_html = f'<div style="background-color: white; padding: 15px; border-radius: 8px; margin: 20px 0;"><h3 style="margin-top: 0; color: #333;">Message</h3><p style="white-space: pre-wrap;">{message}</p></div>'
-        
-        html_content = f"""
-        <html>
-        <body style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto; padding: 20px;">
-            <div style="background-color: #f8f9fa; padding: 20px; border-radius: 10px;">
-                <h2 style="color: #4F46E5;">New Partnership Request</h2>
-                <p>A new organization has requested to partner with our fundraising platform.</p>
-                
-                <div style="background-color: white; padding: 15px; border-radius: 8px; margin: 20px 0; border-left: 4px solid #4F46E5;">
-                    <h3 style="margin-top: 0; color: #333;">Organization Details</h3>
-                    <p><strong>Company/Organization:</strong> {company_name}</p>
-                    <p><strong>Contact Person:</strong> {contact_name}</p>
-                    <p><strong>Email:</strong> {contact_email}</p>
-                </div>
-                
-                {message_html}
-                
-                <div style="background-color: #e9ecef; padding: 15px; border-radius: 8px; margin: 20px 0;">
-                    <h3 style="margin-top: 0; color: #333;">Next Steps</h3>
-                    <ul>
-                        <li>Review the partnership request</li>
-                        <li>Contact {contact_name} at {contact_email}</li>
-                        <li>Discuss partnership terms and benefits</li>
-                        <li>Add organization to partner list if approved</li>
-                    </ul>
-                </div>
-                
-                <hr style="margin: 30px 0; border: none; border-top: 1px solid #dee2e6;">
-                <p style="color: #6c757d; font-size: 14px;">
-                    This email was sent from the Fundraising Platform partnership request form.<br>
-                    <a href="{settings.FRONTEND_URL}">{settings.FRONTEND_URL}</a>
-                </p>
-            </div>
-        </body>
-        </html>
-        """
-        
-        # Prepare message section for text
-        message_text = f"Message:\n{message}\n" if message else ""
-        
-        text_content = f"""
-        New Partnership Request
-        
-        A new organization has requested to partner with our fundraising platform.
-        
-        Organization Details:
-        Company/Organization: {company_name}
-        Contact Person: {contact_name}
-        Email: {contact_email}
-        
-        {message_text}
-        Next Steps:
-        - Review the partnership request
-        - Contact {contact_name} at {contact_email}
-        - Discuss partnership terms and benefits
-        - Add organization to partner list if approved
-        
-        This email was sent from the Fundraising Platform partnership request form.
-        {settings.FRONTEND_URL}
-        """
-        
-        # Send to fundraising2121@gmail.com
-        return await self.send_email("fundraising2121@gmail.com", subject, html_content, text_content)
+        html_content, text_content = render_email(
+            "campaign_update",
+            supporter_name=supporter_name,
+            campaign_title=campaign_title,
+            update_message=update_message
+        )
+        return await self.send_email(supporter_email, subject, html_content, text_content)
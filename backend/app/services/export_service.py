@@ -0,0 +1,109 @@
+from typing import AsyncIterator, Optional, Tuple
+from enum import Enum
+import csv
+import io
+import json
+import logging
+
+from app.core.config import settings
+from app.core.pagination import apply_keyset, encode_cursor
+
+logger = logging.getLogger(__name__)
+
+
+class ExportEntity(str, Enum):
+    PAYMENTS = "payments"
+    USERS = "users"
+    CAMPAIGNS = "campaigns"
+
+
+class ExportFormat(str, Enum):
+    CSV = "csv"
+    NDJSON = "ndjson"
+
+
+# Table and exported columns per entity. Secrets such as password hashes and
+# reset tokens are deliberately left out.
+EXPORT_SOURCES = {
+    ExportEntity.PAYMENTS: ("campaign_payments", (
+        "id", "campaign_id", "donor_id", "donor_email", "donor_name", "amount", "method",
+        "status", "transaction_id", "is_anonymous", "created_at", "processed_at"
+    )),
+    ExportEntity.USERS: ("users", (
+        "id", "email", "first_name", "last_name", "phone", "role", "status",
+        "is_verified", "referral_code", "referred_by", "referral_count", "created_at"
+    )),
+    ExportEntity.CAMPAIGNS: ("campaigns", (
+        "id", "user_id", "title", "goal_amount", "current_amount", "status", "duration_months",
+        "category", "is_featured", "start_date", "end_date", "created_at"
+    )),
+}
+
+MEDIA_TYPES = {
+    ExportFormat.CSV: "text/csv",
+    ExportFormat.NDJSON: "application/x-ndjson",
+}
+
+
+class ExportService:
+    """Streams whole tables page by page so memory stays bounded by one batch"""
+
+    def __init__(self, supabase):
+        self.supabase = supabase
+
+    async def iter_rows(self, entity: ExportEntity) -> AsyncIterator[Tuple]:
+        """Yield every row of an entity as a plain tuple, newest first"""
+        table, columns = EXPORT_SOURCES[entity]
+        id_index = columns.index("id")
+        created_index = columns.index("created_at")
+        batch_size = settings.EXPORT_BATCH_SIZE
+        cursor: Optional[str] = None
+
+        while True:
+            query = self.supabase.table(table).select(",".join(columns))
+            result = await apply_keyset(query, cursor).limit(batch_size).execute()
+            rows = result.data or []
+
+            last = None
+            for row in rows:
+                last = tuple(row.get(column) for column in columns)
+                yield last
+
+            if len(rows) < batch_size or last is None:
+                return
+            cursor = encode_cursor(last[created_index], last[id_index])
+
+    async def stream(self, entity: ExportEntity, export_format: ExportFormat) -> AsyncIterator[str]:
+        """Stream an entity as CSV or NDJSON text chunks"""
+        _, columns = EXPORT_SOURCES[entity]
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        flush_every = settings.EXPORT_BATCH_SIZE
+
+        if export_format == ExportFormat.CSV:
+            writer.writerow(columns)
+
+        pending = 0
+        try:
+            async for row in self.iter_rows(entity):
+                if export_format == ExportFormat.CSV:
+                    writer.writerow(row)
+                else:
+                    buffer.write(json.dumps(dict(zip(columns, row)), default=str))
+                    buffer.write("\n")
+                pending += 1
+
+                if pending >= flush_every:
+                    yield buffer.getvalue()
+                    buffer.seek(0)
+                    buffer.truncate()
+                    pending = 0
+        except Exception as e:
+            # Headers are already sent; re-raising makes the server abort the
+            # chunked response so the client sees a failed download rather
+            # than a truncated file that looks complete
+            logger.error(f"Error exporting {entity.value}: {e}")
+            raise
+
+        if buffer.tell():
+            yield buffer.getvalue()
@@ -0,0 +1,84 @@
+"""
+Image decoding and resizing that runs in the image worker processes.
+
+Everything here is plain Pillow work on files already on disk: arguments and
+results are small (paths, sizes and URL strings) so handing a job to another
+process costs next to nothing compared to decoding a multi-megapixel photo.
+Thumbnails are built as a pyramid: one reduced decode, one resize to the
+largest size, and each smaller size resized from the one above it.
+"""
+
+from typing import Dict, List, Tuple
+import os
+
+from PIL import Image
+
+# JPEGs are decoded at the smallest DCT scale that is still this many times
+# the largest thumbnail; the final LANCZOS pass then has real detail to use
+DRAFT_MARGIN = 1.5
+
+
+def thumbnail_name(filename: str, size: Tuple[int, int]) -> str:
+    """Stored filename of one thumbnail of an uploaded image"""
+    return f"{os.path.splitext(filename)[0]}_{size[0]}x{size[1]}.jpg"
+
+
+def fit_size(size: Tuple[int, int], box: Tuple[int, int]) -> Tuple[int, int]:
+    """Largest size with the same aspect ratio that fits in box (never upscaled)"""
+    width, height = size
+    scale = min(box[0] / width, box[1] / height, 1.0)
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def build_pyramid(img: Image.Image, sizes: List[Tuple[int, int]]) -> Dict[Tuple[int, int], Image.Image]:
+    """Resize once to the largest size, then derive each smaller size from the previous one.
+
+    ``img`` must be freshly opened: JPEGs are decoded straight at a reduced
+    scale with draft(), so the full-resolution image is never in memory.
+    """
+    original_size = img.size
+    ordered = sorted(sizes, key=lambda size: size[0] * size[1], reverse=True)
+    targets = {size: fit_size(original_size, size) for size in ordered}
+
+    largest = targets[ordered[0]]
+    img.draft(None, (int(largest[0] * DRAFT_MARGIN), int(largest[1] * DRAFT_MARGIN)))
+
+    # Palette images only resize with NEAREST, so convert those up front
+    if img.mode in ("P", "1"):
+        img = img.convert("RGB")
+
+    pyramid = {}
+    current = img
+    for size in ordered:
+        if current.size != targets[size]:
+            current = current.resize(targets[size], Image.Resampling.LANCZOS, reducing_gap=2.0)
+        if current.mode != "RGB":
+            current = current.convert("RGB")
+        pyramid[size] = current
+    return pyramid
+
+
+def render_thumbnails(
+    original_path: str,
+    category_dir: str,
+    filename: str,
+    sizes: List[Tuple[int, int]]
+) -> Dict[str, str]:
+    """Write a JPEG thumbnail per size next to the original; returns their URLs"""
+    thumbnails = {}
+    category = os.path.basename(category_dir)
+
+    with Image.open(original_path) as img:
+        pyramid = build_pyramid(img, sizes)
+
+        for size in sizes:
+            thumb_filename = thumbnail_name(filename, size)
+            thumb_path = f"{category_dir}/{thumb_filename}"
+            # Thumbnails are shared by every upload of the same image, so they
+            # only appear under their final name once fully written
+            partial_path = f"{thumb_path}.{os.getpid()}.part"
+            pyramid[size].save(partial_path, "JPEG", quality=85)
+            os.replace(partial_path, thumb_path)
+            thumbnails[f"{size[0]}x{size[1]}"] = f"/uploads/images/{category}/{thumb_filename}"
+
+    return thumbnails
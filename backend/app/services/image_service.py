@@ -4,21 +4,180 @@ Image upload and management service
 
 import os
 import uuid
-import shutil
-from typing import Optional, Dict, Any
+import asyncio
+import hashlib
+import multiprocessing
+import threading
+import time
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional, Dict, Any, Callable, Iterator, TextIO, Tuple
 from fastapi import UploadFile, HTTPException
-from PIL import Image
+import aiofiles
+import aiofiles.os
 import logging
 
+from app.core.config import settings
+from app.core.exceptions import ServiceBusyException
+from app.core.file_serving import forget_file
+from app.services.image_processing import render_thumbnails, thumbnail_name
+
+try:
+    import fcntl
+except ImportError:  # Windows: reference counts are only guarded within this process
+    fcntl = None
+
 logger = logging.getLogger(__name__)
 
+# Uploads are copied to disk this many bytes at a time
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+# Leading bytes of each accepted format, with its MIME type and stored extension
+IMAGE_SIGNATURES = [
+    (b"\xff\xd8\xff", "image/jpeg", ".jpg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png", ".png"),
+    (b"GIF87a", "image/gif", ".gif"),
+    (b"GIF89a", "image/gif", ".gif"),
+]
+
+
+def sniff_image_type(header: bytes) -> Optional[Tuple[str, str]]:
+    """MIME type and extension of an image from its first bytes, or None"""
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return "image/webp", ".webp"
+    for signature, media_type, extension in IMAGE_SIGNATURES:
+        if header.startswith(signature):
+            return media_type, extension
+    return None
+
+# Serialises reference count updates in this process; flock covers other processes
+_references_lock = threading.Lock()
+
+
+@contextmanager
+def _locked_count(path: str) -> Iterator[TextIO]:
+    """Open a reference count file with an exclusive lock held"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with _references_lock:
+        while True:
+            handle = open(path, "a+")
+            if fcntl is not None:
+                fcntl.flock(handle, fcntl.LOCK_EX)
+            if os.fstat(handle.fileno()).st_nlink:
+                break
+            # Removed by another process while we waited; lock the new file instead
+            handle.close()
+        try:
+            yield handle
+        finally:
+            handle.close()
+
+
+def _read_count(handle: TextIO) -> int:
+    handle.seek(0)
+    text = handle.read().strip()
+    return int(text) if text else 0
+
+
+def _write_count(handle: TextIO, count: int):
+    handle.seek(0)
+    handle.truncate()
+    handle.write(str(count))
+    handle.flush()
+
+# Decoding and resizing photos is CPU-bound, so it runs in worker processes
+# rather than on the event loop (or a thread that would still hold the GIL)
+_image_executor: Optional[ProcessPoolExecutor] = None
+_image_stats: Dict[str, float] = {
+    "in_flight": 0,
+    "completed": 0,
+    "failed": 0,
+    "rejected": 0,
+    "total_latency": 0.0,
+    "max_latency": 0.0,
+}
+
+
+def _image_worker_count() -> int:
+    return settings.IMAGE_WORKERS or os.cpu_count() or 1
+
+
+def _get_image_executor() -> ProcessPoolExecutor:
+    """Get the image worker pool, creating it on first use"""
+    global _image_executor
+    if _image_executor is None:
+        # Forking a process that already runs an event loop and thread pools
+        # is unsafe, so workers come from a clean forkserver (or spawn)
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+        _image_executor = ProcessPoolExecutor(max_workers=_image_worker_count(), mp_context=context)
+    return _image_executor
+
+
+async def run_image_job(func: Callable[..., Any], *args) -> Any:
+    """Run an image function in the worker pool, shedding load once the queue is full"""
+    capacity = _image_worker_count() + settings.IMAGE_MAX_QUEUE
+    if _image_stats["in_flight"] >= capacity:
+        _image_stats["rejected"] += 1
+        raise ServiceBusyException("Too many images are being processed, please retry shortly")
+
+    _image_stats["in_flight"] += 1
+    queued = time.perf_counter()
+    try:
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(_get_image_executor(), func, *args)
+    except BrokenProcessPool:
+        # A worker died (e.g. killed for memory); start a fresh pool next time
+        _image_stats["failed"] += 1
+        shutdown_image_executor()
+        raise
+    except Exception:
+        _image_stats["failed"] += 1
+        raise
+    finally:
+        _image_stats["in_flight"] -= 1
+
+    latency = time.perf_counter() - queued
+    _image_stats["completed"] += 1
+    _image_stats["total_latency"] += latency
+    _image_stats["max_latency"] = max(_image_stats["max_latency"], latency)
+    return result
+
+
+def get_image_pipeline_metrics() -> Dict[str, Any]:
+    """Get queue depth and latency numbers for the image worker pool"""
+    workers = _image_worker_count()
+    completed = _image_stats["completed"]
+    in_flight = int(_image_stats["in_flight"])
+    return {
+        "workers": workers,
+        "max_queue": settings.IMAGE_MAX_QUEUE,
+        "in_flight": in_flight,
+        "queued": max(0, in_flight - workers),
+        "completed": int(completed),
+        "failed": int(_image_stats["failed"]),
+        "rejected": int(_image_stats["rejected"]),
+        "avg_latency_ms": round(_image_stats["total_latency"] / completed * 1000, 2) if completed else 0.0,
+        "max_latency_ms": round(_image_stats["max_latency"] * 1000, 2),
+    }
+
+
+def shutdown_image_executor():
+    """Stop the image worker pool on application shutdown"""
+    global _image_executor
+    if _image_executor is not None:
+        _image_executor.shutdown(wait=False)
+        _image_executor = None
+
+
 class ImageService:
     """Service for handling image uploads and processing"""
     
     def __init__(self):
         self.upload_dir = "uploads/images"
-        self.allowed_extensions = {".jpg", ".jpeg", ".png", ".gif", ".webp"}
-        self.max_file_size = 5 * 1024 * 1024  # 5MB
+        self.refs_dir = "storage/image_refs"  # reference count per stored image
+        self.max_file_size = settings.MAX_FILE_SIZE
         self.thumbnail_sizes = [(150, 150), (300, 300), (600, 600)]
         
         # Create upload directory if it doesn't exist
@@ -43,32 +202,33 @@ class ImageService:
             Dict containing file info and URLs
         """
         try:
-            # Validate file
-            if not await self._validate_file(file):
-                raise HTTPException(status_code=400, detail="Invalid file format or size")
-            
-            # Generate unique filename
-            file_extension = os.path.splitext(file.filename)[1].lower()
-            unique_filename = f"{uuid.uuid4()}{file_extension}"
-            
             # Create category directory
             category_dir = f"{self.upload_dir}/{category}"
             os.makedirs(category_dir, exist_ok=True)
             
-            # Save original file
+            # Stream the upload to disk, checking its type and size on the way;
+            # identical content is stored once under its hash
+            unique_filename, file_size, content_type, deduplicated = await self._save_upload(file, category_dir)
             file_path = f"{category_dir}/{unique_filename}"
-            with open(file_path, "wb") as buffer:
-                shutil.copyfileobj(file.file, buffer)
             
-            # Generate thumbnails
-            thumbnails = await self._generate_thumbnails(file_path, category_dir, unique_filename)
+            # Reuse the thumbnails of a stored duplicate; a saturated worker pool
+            # rejects the whole upload
+            thumbnails = self._stored_thumbnails(category_dir, unique_filename) if deduplicated else None
+            if thumbnails is None:
+                try:
+                    thumbnails = await self._generate_thumbnails(file_path, category_dir, unique_filename)
+                except ServiceBusyException:
+                    await self._run_sync(self._release_reference, file_path)
+                    raise
             
             # Create file info
             file_info = {
                 "original_filename": file.filename,
                 "stored_filename": unique_filename,
                 "file_path": file_path,
-                "file_size": os.path.getsize(file_path),
+                "file_size": file_size,
+                "content_type": content_type,
+                "deduplicated": deduplicated,
                 "category": category,
                 "user_id": user_id,
                 "url": f"/uploads/images/{category}/{unique_filename}",
@@ -78,78 +238,129 @@ class ImageService:
             logger.info(f"Image uploaded successfully: {file_info['url']}")
             return file_info
             
+        except HTTPException:
+            raise
         except Exception as e:
             logger.error(f"Error uploading image: {e}")
             raise HTTPException(status_code=500, detail=f"Failed to upload image: {str(e)}")
     
-    async def _validate_file(self, file: UploadFile) -> bool:
-        """Validate uploaded file"""
+    async def _save_upload(self, file: UploadFile, category_dir: str) -> Tuple[str, int, str, bool]:
+        """Copy an upload to disk chunk by chunk and store it under its content hash.
+        
+        The format comes from the file's first bytes, not its name, and the
+        copy stops as soon as the size limit is passed. Nothing is left
+        behind on disk for a rejected upload. Returns the stored filename,
+        size, MIME type and whether the same image was already stored.
+        """
+        chunk = await file.read(UPLOAD_CHUNK_SIZE)
+        sniffed = sniff_image_type(chunk)
+        if sniffed is None or sniffed[0] not in settings.ALLOWED_FILE_TYPES:
+            logger.warning(f"Rejected upload {file.filename!r}: not a supported image")
+            raise HTTPException(status_code=400, detail="Invalid file format")
+        content_type, extension = sniffed
+        
+        partial_path = f"{category_dir}/.{uuid.uuid4()}.part"
+        digest = hashlib.sha256()
+        file_size = 0
         try:
-            # Check file size
-            file.file.seek(0, 2)  # Seek to end
-            file_size = file.file.tell()
-            file.file.seek(0)  # Reset to beginning
+            async with aiofiles.open(partial_path, "wb") as buffer:
+                while chunk:
+                    file_size += len(chunk)
+                    if file_size > self.max_file_size:
+                        logger.warning(f"Rejected upload {file.filename!r}: larger than {self.max_file_size} bytes")
+                        raise HTTPException(status_code=413, detail="File too large")
+                    digest.update(chunk)
+                    await buffer.write(chunk)
+                    chunk = await file.read(UPLOAD_CHUNK_SIZE)
             
-            if file_size > self.max_file_size:
-                logger.warning(f"File too large: {file_size} bytes")
+            filename = f"{digest.hexdigest()}{extension}"
+            deduplicated = await self._run_sync(self._add_reference, partial_path, f"{category_dir}/{filename}")
+        except BaseException:
+            try:
+                await aiofiles.os.remove(partial_path)
+            except OSError:
+                pass
+            raise
+        
+        return filename, file_size, content_type, deduplicated
+    
+    async def _run_sync(self, func: Callable[..., Any], *args) -> Any:
+        """Run blocking reference count bookkeeping off the event loop"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, func, *args)
+    
+    def _reference_path(self, file_path: str) -> str:
+        return os.path.join(self.refs_dir, os.path.relpath(file_path, self.upload_dir))
+    
+    def _add_reference(self, partial_path: str, file_path: str) -> bool:
+        """Count one more reference to file_path, moving the upload into place
+        unless that content is already stored; returns True for a duplicate"""
+        with _locked_count(self._reference_path(file_path)) as refs:
+            count = _read_count(refs)
+            duplicate = os.path.exists(file_path)
+            if duplicate:
+                os.remove(partial_path)
+                # A stored file without a count has owners we don't know about
+                count = max(count, 1)
+            else:
+                os.replace(partial_path, file_path)
+                count = 0
+            _write_count(refs, count + 1)
+        return duplicate
+    
+    def _release_reference(self, file_path: str) -> bool:
+        """Drop one reference to file_path; the last one removes the image,
+        its thumbnails and the count. Returns True if the files were removed"""
+        ref_path = self._reference_path(file_path)
+        with _locked_count(ref_path) as refs:
+            count = _read_count(refs)
+            if count > 1:
+                _write_count(refs, count - 1)
                 return False
             
-            # Check file extension
-            if file.filename:
-                file_extension = os.path.splitext(file.filename)[1].lower()
-                if file_extension not in self.allowed_extensions:
-                    logger.warning(f"Invalid file extension: {file_extension}")
-                    return False
-            
+            directory, filename = os.path.split(file_path)
+            thumb_paths = [os.path.join(directory, thumbnail_name(filename, size)) for size in self.thumbnail_sizes]
+            for path in [file_path] + thumb_paths:
+                if os.path.exists(path):
+                    os.remove(path)
+            os.remove(ref_path)
             return True
-            
-        except Exception as e:
-            logger.error(f"Error validating file: {e}")
-            return False
     
-    async def _generate_thumbnails(self, original_path: str, category_dir: str, filename: str) -> Dict[str, str]:
-        """Generate thumbnails of different sizes"""
+    def _stored_thumbnails(self, category_dir: str, filename: str) -> Optional[Dict[str, str]]:
+        """URLs of an image's thumbnails if every size is already on disk"""
+        category = os.path.basename(category_dir)
         thumbnails = {}
-        
+        for size in self.thumbnail_sizes:
+            thumb_filename = thumbnail_name(filename, size)
+            if not os.path.exists(f"{category_dir}/{thumb_filename}"):
+                return None
+            thumbnails[f"{size[0]}x{size[1]}"] = f"/uploads/images/{category}/{thumb_filename}"
+        return thumbnails
+    
+    async def _generate_thumbnails(self, original_path: str, category_dir: str, filename: str) -> Dict[str, str]:
+        """Generate thumbnails of different sizes in the image worker pool"""
         try:
-            with Image.open(original_path) as img:
-                # Convert to RGB if necessary
-                if img.mode in ("RGBA", "P"):
-                    img = img.convert("RGB")
-                
-                base_name = os.path.splitext(filename)[0]
-                
-                for size in self.thumbnail_sizes:
-                    # Create thumbnail
-                    thumbnail = img.copy()
-                    thumbnail.thumbnail(size, Image.Resampling.LANCZOS)
-                    
-                    # Save thumbnail
-                    thumb_filename = f"{base_name}_{size[0]}x{size[1]}.jpg"
-                    thumb_path = f"{category_dir}/{thumb_filename}"
-                    thumbnail.save(thumb_path, "JPEG", quality=85)
-                    
-                    thumbnails[f"{size[0]}x{size[1]}"] = f"/uploads/images/{os.path.basename(category_dir)}/{thumb_filename}"
-                    
+            return await run_image_job(render_thumbnails, original_path, category_dir, filename, self.thumbnail_sizes)
+        except ServiceBusyException:
+            raise
         except Exception as e:
             logger.error(f"Error generating thumbnails: {e}")
-        
-        return thumbnails
+            return {}
     
     async def delete_image(self, file_path: str) -> bool:
-        """Delete an image and its thumbnails"""
+        """Release one reference to an image; the files go with the last reference"""
         try:
             if os.path.exists(file_path):
-                os.remove(file_path)
-                
-                # Delete thumbnails
-                base_path = os.path.splitext(file_path)[0]
-                for size in self.thumbnail_sizes:
-                    thumb_path = f"{base_path}_{size[0]}x{size[1]}.jpg"
-                    if os.path.exists(thumb_path):
-                        os.remove(thumb_path)
+                removed = await self._run_sync(self._release_reference, file_path)
                 
-                logger.info(f"Image deleted: {file_path}")
+                if removed:
+                    directory, filename = os.path.split(file_path)
+                    forget_file(file_path)
+                    for size in self.thumbnail_sizes:
+                        forget_file(os.path.join(directory, thumbnail_name(filename, size)))
+                    logger.info(f"Image deleted: {file_path}")
+                else:
+                    logger.info(f"Image reference released, still in use: {file_path}")
                 return True
             return False
             
@@ -157,6 +368,12 @@ class ImageService:
             logger.error(f"Error deleting image: {e}")
             return False
     
+    def get_image_path(self, category: str, filename: str) -> Optional[str]:
+        """Path of a stored image or thumbnail; None for names that could escape the upload directory"""
+        if any(part.startswith(".") or "/" in part or "\\" in part for part in (category, filename)):
+            return None
+        return f"{self.upload_dir}/{category}/{filename}"
+    
     def get_image_url(self, file_path: str) -> str:
         """Get the public URL for an image"""
         # Convert file path to URL
@@ -0,0 +1,227 @@
+"""
+Campaign total reconciliation against completed payments.
+
+Completed payments are the source of truth for what a campaign has raised.
+The reconciliation job streams them from the database as columnar batches
+(parallel arrays of campaign ids and amounts in integer cents), sums them per
+campaign with NumPy, compares the result to campaigns.current_amount and fixes
+every drifted campaign in a single batched update that also writes
+'correction' entries to the append-only donation ledger.
+
+Payments are marked completed before their amount is added to the campaign,
+so drift found in the scan may just be a payment between those two steps.
+Drifted campaigns are re-read after RECONCILIATION_SETTLE_SECONDS and only
+corrected if neither their total nor their payments moved in the meantime.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import asyncio
+import logging
+import time
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.jobs import Job, start_job
+from app.services.campaign_service import invalidate_campaign_cache
+
+logger = logging.getLogger(__name__)
+
+RECONCILIATION_JOB = "ledger_reconciliation"
+REPORTED_DISCREPANCIES = 100
+
+
+def group_sum(campaign_ids: np.ndarray, amount_cents: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Sum amounts per campaign; returns sorted unique ids and their int64 totals"""
+    if campaign_ids.size == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    order = np.argsort(campaign_ids, kind="stable")
+    sorted_ids = campaign_ids[order]
+    starts = np.flatnonzero(np.r_[True, sorted_ids[1:] != sorted_ids[:-1]])
+    return sorted_ids[starts], np.add.reduceat(amount_cents[order], starts)
+
+
+class CampaignTotals:
+    """Streaming per-campaign sums: each batch is reduced as it arrives"""
+
+    def __init__(self):
+        self._ids: List[np.ndarray] = []
+        self._sums: List[np.ndarray] = []
+        self.rows = 0
+
+    def add_batch(self, campaign_ids: Iterable[int], amount_cents: Iterable[int]):
+        ids = np.asarray(campaign_ids, dtype=np.int64)
+        cents = np.asarray(amount_cents, dtype=np.int64)
+        batch_ids, batch_sums = group_sum(ids, cents)
+        self._ids.append(batch_ids)
+        self._sums.append(batch_sums)
+        self.rows += ids.size
+
+    def result(self) -> Tuple[np.ndarray, np.ndarray]:
+        if not self._ids:
+            return group_sum(np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64))
+        return group_sum(np.concatenate(self._ids), np.concatenate(self._sums))
+
+
+def find_discrepancies(
+    campaign_ids: np.ndarray,
+    recorded_cents: np.ndarray,
+    total_ids: np.ndarray,
+    total_cents: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Compare recorded totals to computed ones; campaigns without payments expect 0.
+
+    ``total_ids`` must be sorted (as returned by group_sum). Returns the ids,
+    recorded and expected cents of every campaign that differs.
+    """
+    expected = np.zeros(campaign_ids.size, dtype=np.int64)
+    if total_ids.size:
+        positions = np.searchsorted(total_ids, campaign_ids)
+        positions = np.minimum(positions, total_ids.size - 1)
+        found = total_ids[positions] == campaign_ids
+        expected[found] = total_cents[positions[found]]
+    drifted = recorded_cents != expected
+    return campaign_ids[drifted], recorded_cents[drifted], expected[drifted]
+
+
+def build_report(
+    ids: np.ndarray,
+    recorded: np.ndarray,
+    expected: np.ndarray,
+    campaigns_checked: int,
+    payments_scanned: int
+) -> Dict[str, Any]:
+    """Summarise discrepancies, listing the largest ones first"""
+    difference = expected - recorded
+    largest = np.argsort(-np.abs(difference), kind="stable")[:REPORTED_DISCREPANCIES]
+    return {
+        "campaigns_checked": campaigns_checked,
+        "payments_scanned": payments_scanned,
+        "drifted_campaigns": int(ids.size),
+        "net_drift": round(int(difference.sum()) / 100, 2),
+        "absolute_drift": round(int(np.abs(difference).sum()) / 100, 2),
+        "discrepancies": [
+            {
+                "campaign_id": int(ids[i]),
+                "recorded_amount": round(int(recorded[i]) / 100, 2),
+                "expected_amount": round(int(expected[i]) / 100, 2),
+                "difference": round(int(difference[i]) / 100, 2),
+            }
+            for i in largest
+        ],
+    }
+
+
+class LedgerService:
+    def __init__(self, supabase):
+        self.supabase = supabase
+
+    async def get_campaign_amounts(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Every campaign's recorded total in cents"""
+        result = await self.supabase.rpc("get_campaign_amount_columns", {}).execute()
+        row = result.data[0] if result.data else {}
+        return (
+            np.asarray(row.get("campaign_ids") or [], dtype=np.int64),
+            np.asarray(row.get("amount_cents") or [], dtype=np.int64),
+        )
+
+    async def sum_completed_payments(self, job: Optional[Job] = None) -> CampaignTotals:
+        """Stream completed payments in columnar batches and sum them per campaign"""
+        totals = CampaignTotals()
+        after_id = 0
+        while True:
+            result = await self.supabase.rpc("get_completed_payment_columns", {
+                "after_id": after_id,
+                "batch_size": settings.RECONCILIATION_BATCH_SIZE
+            }).execute()
+            row = result.data[0] if result.data else {}
+            if not row.get("last_id"):
+                return totals
+
+            totals.add_batch(row["campaign_ids"], row["amount_cents"])
+            after_id = row["last_id"]
+            if job is not None:
+                job.progress["payments_scanned"] = totals.rows
+
+    async def recheck_drift(
+        self,
+        ids: np.ndarray,
+        recorded: np.ndarray,
+        expected: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Re-read drifted campaigns; keep those whose recorded and expected totals are unchanged"""
+        if not ids.size:
+            return ids, recorded, expected
+        result = await self.supabase.rpc("get_campaign_drift_columns", {"drifted_ids": ids.tolist()}).execute()
+        row = result.data[0] if result.data else {}
+        again_ids = np.asarray(row.get("campaign_ids") or [], dtype=np.int64)
+        again_recorded = np.asarray(row.get("recorded_cents") or [], dtype=np.int64)
+        again_expected = np.asarray(row.get("expected_cents") or [], dtype=np.int64)
+
+        _, first, second = np.intersect1d(ids, again_ids, assume_unique=True, return_indices=True)
+        unchanged = (recorded[first] == again_recorded[second]) & (expected[first] == again_expected[second])
+        keep = first[unchanged]
+        return ids[keep], recorded[keep], expected[keep]
+
+    async def apply_corrections(self, ids: np.ndarray, recorded: np.ndarray, expected: np.ndarray) -> List[int]:
+        """Fix drifted totals in one statement; returns the ids actually corrected"""
+        if not ids.size:
+            return []
+        result = await self.supabase.rpc("apply_campaign_corrections", {
+            "campaign_ids": ids.tolist(),
+            "observed_cents": recorded.tolist(),
+            "expected_cents": expected.tolist()
+        }).execute()
+        corrected = [row["campaign_id"] for row in result.data or []]
+        for campaign_id in corrected:
+            invalidate_campaign_cache(campaign_id)
+        return corrected
+
+    async def reconcile(self, job: Optional[Job] = None, dry_run: bool = False) -> Dict[str, Any]:
+        """Compare every campaign total to its completed payments and fix drift"""
+        started = time.perf_counter()
+
+        # Read the recorded totals first: a total that moves while payments are
+        # being summed no longer matches what we observed and is skipped
+        campaign_ids, recorded_cents = await self.get_campaign_amounts()
+        totals = await self.sum_completed_payments(job)
+        fetched = time.perf_counter()
+
+        total_ids, total_cents = totals.result()
+        ids, recorded, expected = find_discrepancies(campaign_ids, recorded_cents, total_ids, total_cents)
+        report = build_report(ids, recorded, expected, int(campaign_ids.size), totals.rows)
+        aggregated = time.perf_counter()
+
+        corrected = []
+        if not dry_run and ids.size:
+            # A payment completed but not yet added to its campaign looks like
+            # drift; by now its increment has landed and the totals have moved
+            await asyncio.sleep(settings.RECONCILIATION_SETTLE_SECONDS)
+            corrected = await self.apply_corrections(*await self.recheck_drift(ids, recorded, expected))
+        finished = time.perf_counter()
+
+        report.update({
+            "dry_run": dry_run,
+            "corrected_campaigns": len(corrected),
+            "skipped_campaigns": 0 if dry_run else int(ids.size) - len(corrected),
+            "timings": {
+                "fetch_seconds": round(fetched - started, 3),
+                "aggregate_seconds": round(aggregated - fetched, 3),
+                "update_seconds": round(finished - aggregated, 3),
+                "total_seconds": round(finished - started, 3),
+            },
+        })
+        if ids.size:
+            logger.warning(
+                f"Reconciliation found {ids.size} drifted campaigns "
+                f"(net {report['net_drift']}), corrected {len(corrected)}"
+            )
+        return report
+
+    def start_reconciliation(self, owner_id: int, dry_run: bool = False) -> Job:
+        """Run reconciliation in the background"""
+        return start_job(
+            RECONCILIATION_JOB,
+            lambda job: self.reconcile(job, dry_run),
+            owner_id=owner_id
+        )
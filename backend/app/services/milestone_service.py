@@ -26,7 +26,7 @@ class MilestoneService:
             }
             
             # Insert milestone into database
-            result = self.supabase.table("milestones").insert(milestone_dict).execute()
+            result = await self.supabase.table("milestones").insert(milestone_dict).execute()
             
             if not result.data:
                 raise ValidationException("Failed to create milestone")
@@ -41,7 +41,7 @@ class MilestoneService:
     async def get_campaign_milestones(self, campaign_id: int) -> List[Milestone]:
         """Get milestones for a specific campaign"""
         try:
-            result = self.supabase.table("milestones").select("*").eq("campaign_id", campaign_id).order("threshold_amount", desc=False).execute()
+            result = await self.supabase.table("milestones").select("*").eq("campaign_id", campaign_id).order("threshold_amount", desc=False).execute()
             
             milestones = []
             if result.data:
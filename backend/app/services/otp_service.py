@@ -40,7 +40,7 @@ class OTPService:
                 "created_at": datetime.utcnow().isoformat()
             }
             
-            result = self.supabase.table("otp_verifications").insert(otp_data).execute()
+            result = await self.supabase.table("otp_verifications").insert(otp_data).execute()
             
             if result.data:
                 logger.info(f"OTP created for {email} with purpose {purpose}")
@@ -61,7 +61,7 @@ class OTPService:
         """Verify an OTP for the given email"""
         try:
             # Get OTP from database
-            result = self.supabase.table("otp_verifications").select("*").eq("email", email.lower()).eq("purpose", purpose).eq("is_used", False).order("created_at", desc=True).limit(1).execute()
+            result = await self.supabase.table("otp_verifications").select("*").eq("email", email.lower()).eq("purpose", purpose).eq("is_used", False).order("created_at", desc=True).limit(1).execute()
             
             if not result.data:
                 logger.warning(f"No valid OTP found for {email}")
@@ -101,7 +101,7 @@ class OTPService:
     async def _mark_otp_used(self, otp_id: int):
         """Mark OTP as used"""
         try:
-            self.supabase.table("otp_verifications").update({
+            await self.supabase.table("otp_verifications").update({
                 "is_used": True,
                 "verified_at": datetime.utcnow().isoformat()
             }).eq("id", otp_id).execute()
@@ -111,7 +111,7 @@ class OTPService:
     async def _mark_otp_expired(self, otp_id: int):
         """Mark OTP as expired"""
         try:
-            self.supabase.table("otp_verifications").update({
+            await self.supabase.table("otp_verifications").update({
                 "is_used": True,
                 "expired_at": datetime.utcnow().isoformat()
             }).eq("id", otp_id).execute()
@@ -122,10 +122,10 @@ class OTPService:
         """Increment OTP attempts"""
         try:
             # Get current attempts
-            result = self.supabase.table("otp_verifications").select("attempts").eq("id", otp_id).execute()
+            result = await self.supabase.table("otp_verifications").select("attempts").eq("id", otp_id).execute()
             if result.data:
                 current_attempts = result.data[0]["attempts"]
-                self.supabase.table("otp_verifications").update({
+                await self.supabase.table("otp_verifications").update({
                     "attempts": current_attempts + 1
                 }).eq("id", otp_id).execute()
         except Exception as e:
@@ -135,7 +135,7 @@ class OTPService:
         """Resend OTP for the given email"""
         try:
             # Mark existing OTPs as expired
-            self.supabase.table("otp_verifications").update({
+            await self.supabase.table("otp_verifications").update({
                 "is_used": True,
                 "expired_at": datetime.utcnow().isoformat()
             }).eq("email", email.lower()).eq("purpose", purpose).eq("is_used", False).execute()
@@ -151,7 +151,7 @@ class OTPService:
         """Clean up expired OTPs from database"""
         try:
             current_time = datetime.utcnow().isoformat()
-            result = self.supabase.table("otp_verifications").update({
+            result = await self.supabase.table("otp_verifications").update({
                 "is_used": True,
                 "expired_at": current_time
             }).lt("expires_at", current_time).eq("is_used", False).execute()
@@ -165,7 +165,7 @@ class OTPService:
     async def get_otp_status(self, email: str, purpose: str = "email_verification") -> Dict[str, Any]:
         """Get OTP status for the given email"""
         try:
-            result = self.supabase.table("otp_verifications").select("*").eq("email", email.lower()).eq("purpose", purpose).eq("is_used", False).order("created_at", desc=True).limit(1).execute()
+            result = await self.supabase.table("otp_verifications").select("*").eq("email", email.lower()).eq("purpose", purpose).eq("is_used", False).order("created_at", desc=True).limit(1).execute()
             
             if not result.data:
                 return {
@@ -1,13 +1,73 @@
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
+import asyncio
 import logging
-import stripe
-import requests
+import time
+import httpx
 from decimal import Decimal
 
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+SQUARE_VERSION = "2023-10-18"
+
+# One keep-alive client per gateway, created on first use inside the running loop
+_clients: Dict[str, httpx.AsyncClient] = {}
+
+# Cached PayPal OAuth token as (access_token, monotonic expiry)
+_paypal_token: Optional[Tuple[str, float]] = None
+_paypal_token_lock: Optional[asyncio.Lock] = None
+_paypal_token_fetches = 0
+
+
+def _gateway_base_urls() -> Dict[str, str]:
+    return {
+        "stripe": settings.STRIPE_API_BASE,
+        "paypal": settings.PAYPAL_API_BASE,
+        "square": settings.SQUARE_API_BASE,
+    }
+
+
+def get_gateway_client(gateway: str) -> httpx.AsyncClient:
+    """Get the shared HTTP client for a gateway"""
+    client = _clients.get(gateway)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            base_url=_gateway_base_urls()[gateway],
+            timeout=httpx.Timeout(
+                settings.GATEWAY_TIMEOUT_SECONDS,
+                connect=settings.GATEWAY_CONNECT_TIMEOUT_SECONDS
+            ),
+            limits=httpx.Limits(
+                max_connections=settings.GATEWAY_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.GATEWAY_MAX_CONNECTIONS
+            )
+        )
+        _clients[gateway] = client
+    return client
+
+
+async def close_gateway_clients():
+    """Close every gateway client and forget the cached PayPal token"""
+    global _paypal_token
+    clients = list(_clients.values())
+    _clients.clear()
+    _paypal_token = None
+    for client in clients:
+        await client.aclose()
+
+
+def get_gateway_metrics() -> Dict[str, Any]:
+    """Report open gateway clients and PayPal token cache state"""
+    token_ttl = None
+    if _paypal_token is not None:
+        token_ttl = round(max(_paypal_token[1] - time.monotonic(), 0.0), 1)
+    return {
+        "open_clients": sorted(gateway for gateway, client in _clients.items() if not client.is_closed),
+        "paypal_token_fetches": _paypal_token_fetches,
+        "paypal_token_ttl_seconds": token_ttl,
+    }
+
 
 class PaymentGatewayService:
     """Service for handling payment gateway integrations"""
@@ -18,10 +78,66 @@ class PaymentGatewayService:
         self.paypal_client_secret = settings.PAYPAL_CLIENT_SECRET
         self.square_app_id = settings.SQUARE_APPLICATION_ID
         self.square_access_token = settings.SQUARE_ACCESS_TOKEN
+
+    def _stripe_headers(self) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {self.stripe_secret_key}"}
+
+    def _square_headers(self) -> Dict[str, str]:
+        return {
+            "Authorization": f"Bearer {self.square_access_token}",
+            "Square-Version": SQUARE_VERSION
+        }
+
+    async def _get_paypal_token(self, rejected_token: Optional[str] = None) -> str:
+        """Get a PayPal access token, fetching a new one only near expiry or after a rejection"""
+        global _paypal_token, _paypal_token_lock, _paypal_token_fetches
+        
+        def cached() -> Optional[str]:
+            token = _paypal_token
+            if token and token[1] > time.monotonic() and token[0] != rejected_token:
+                return token[0]
+            return None
+        
+        access_token = cached()
+        if access_token:
+            return access_token
+        
+        if _paypal_token_lock is None:
+            _paypal_token_lock = asyncio.Lock()
         
-        # Initialize Stripe
-        if self.stripe_secret_key:
-            stripe.api_key = self.stripe_secret_key
+        async with _paypal_token_lock:
+            # Another request may have refreshed it while we waited
+            access_token = cached()
+            if access_token:
+                return access_token
+            
+            response = await get_gateway_client("paypal").post(
+                "/v1/oauth2/token",
+                auth=(self.paypal_client_id, self.paypal_client_secret),
+                data={"grant_type": "client_credentials"},
+                headers={"Accept": "application/json"}
+            )
+            _paypal_token_fetches += 1
+            
+            if response.status_code != 200:
+                raise Exception("Failed to get PayPal access token")
+            
+            body = response.json()
+            lifetime = float(body.get("expires_in", 0)) - settings.PAYPAL_TOKEN_REFRESH_MARGIN_SECONDS
+            _paypal_token = (body["access_token"], time.monotonic() + max(lifetime, 0.0))
+            return body["access_token"]
+
+    async def _paypal_request(self, method: str, path: str, **kwargs) -> httpx.Response:
+        """Call the PayPal API, refreshing the token once if PayPal rejects it"""
+        client = get_gateway_client("paypal")
+        access_token = await self._get_paypal_token()
+        response = await client.request(method, path, headers={"Authorization": f"Bearer {access_token}"}, **kwargs)
+        
+        if response.status_code == 401:
+            access_token = await self._get_paypal_token(rejected_token=access_token)
+            response = await client.request(method, path, headers={"Authorization": f"Bearer {access_token}"}, **kwargs)
+        
+        return response
 
     async def process_stripe_payment(self, amount: Decimal, currency: str = "usd", **kwargs) -> Dict[str, Any]:
         """Process payment through Stripe"""
@@ -29,18 +145,30 @@ class PaymentGatewayService:
             if not self.stripe_secret_key:
                 raise Exception("Stripe not configured")
             
-            # Create payment intent
-            intent = stripe.PaymentIntent.create(
-                amount=int(amount * 100),  # Convert to cents
-                currency=currency,
-                metadata=kwargs.get('metadata', {})
+            # Create payment intent (Stripe takes form-encoded bodies)
+            form = {
+                "amount": int(amount * 100),  # Convert to cents
+                "currency": currency
+            }
+            for key, value in kwargs.get('metadata', {}).items():
+                form[f"metadata[{key}]"] = value
+            
+            response = await get_gateway_client("stripe").post(
+                "/v1/payment_intents",
+                headers=self._stripe_headers(),
+                data=form
             )
             
+            if response.status_code != 200:
+                raise Exception("Failed to create Stripe payment intent")
+            
+            intent = response.json()
+            
             return {
                 "success": True,
-                "transaction_id": intent.id,
-                "client_secret": intent.client_secret,
-                "status": intent.status
+                "transaction_id": intent["id"],
+                "client_secret": intent["client_secret"],
+                "status": intent["status"]
             }
         except Exception as e:
             logger.error(f"Stripe payment error: {e}")
@@ -55,19 +183,6 @@ class PaymentGatewayService:
             if not self.paypal_client_id or not self.paypal_client_secret:
                 raise Exception("PayPal not configured")
             
-            # Get access token
-            token_response = requests.post(
-                "https://api.sandbox.paypal.com/v1/oauth2/token",
-                auth=(self.paypal_client_id, self.paypal_client_secret),
-                data={"grant_type": "client_credentials"},
-                headers={"Accept": "application/json"}
-            )
-            
-            if token_response.status_code != 200:
-                raise Exception("Failed to get PayPal access token")
-            
-            access_token = token_response.json()["access_token"]
-            
             # Create payment
             payment_data = {
                 "intent": "sale",
@@ -85,14 +200,7 @@ class PaymentGatewayService:
                 }
             }
             
-            payment_response = requests.post(
-                "https://api.sandbox.paypal.com/v1/payments/payment",
-                headers={
-                    "Authorization": f"Bearer {access_token}",
-                    "Content-Type": "application/json"
-                },
-                json=payment_data
-            )
+            payment_response = await self._paypal_request("POST", "/v1/payments/payment", json=payment_data)
             
             if payment_response.status_code != 201:
                 raise Exception("Failed to create PayPal payment")
@@ -129,13 +237,9 @@ class PaymentGatewayService:
                 "note": kwargs.get('note', 'Donation')
             }
             
-            payment_response = requests.post(
-                "https://connect.squareupsandbox.com/v2/payments",
-                headers={
-                    "Authorization": f"Bearer {self.square_access_token}",
-                    "Content-Type": "application/json",
-                    "Square-Version": "2023-10-18"
-                },
+            payment_response = await get_gateway_client("square").post(
+                "/v2/payments",
+                headers=self._square_headers(),
                 json=payment_data
             )
             
@@ -163,39 +267,28 @@ class PaymentGatewayService:
                 if not self.stripe_secret_key:
                     raise Exception("Stripe not configured")
                 
-                intent = stripe.PaymentIntent.retrieve(transaction_id)
+                response = await get_gateway_client("stripe").get(
+                    f"/v1/payment_intents/{transaction_id}",
+                    headers=self._stripe_headers()
+                )
+                
+                if response.status_code != 200:
+                    raise Exception("Failed to verify Stripe payment")
+                
+                intent = response.json()
                 return {
                     "success": True,
-                    "status": intent.status,
-                    "amount": intent.amount / 100,  # Convert from cents
-                    "currency": intent.currency
+                    "status": intent["status"],
+                    "amount": intent["amount"] / 100,  # Convert from cents
+                    "currency": intent["currency"]
                 }
             
             elif gateway == "paypal":
                 if not self.paypal_client_id or not self.paypal_client_secret:
                     raise Exception("PayPal not configured")
                 
-                # Get access token
-                token_response = requests.post(
-                    "https://api.sandbox.paypal.com/v1/oauth2/token",
-                    auth=(self.paypal_client_id, self.paypal_client_secret),
-                    data={"grant_type": "client_credentials"},
-                    headers={"Accept": "application/json"}
-                )
-                
-                if token_response.status_code != 200:
-                    raise Exception("Failed to get PayPal access token")
-                
-                access_token = token_response.json()["access_token"]
-                
                 # Get payment details
-                payment_response = requests.get(
-                    f"https://api.sandbox.paypal.com/v1/payments/payment/{transaction_id}",
-                    headers={
-                        "Authorization": f"Bearer {access_token}",
-                        "Content-Type": "application/json"
-                    }
-                )
+                payment_response = await self._paypal_request("GET", f"/v1/payments/payment/{transaction_id}")
                 
                 if payment_response.status_code != 200:
                     raise Exception("Failed to verify PayPal payment")
@@ -213,12 +306,9 @@ class PaymentGatewayService:
                 if not self.square_access_token:
                     raise Exception("Square not configured")
                 
-                payment_response = requests.get(
-                    f"https://connect.squareupsandbox.com/v2/payments/{transaction_id}",
-                    headers={
-                        "Authorization": f"Bearer {self.square_access_token}",
-                        "Square-Version": "2023-10-18"
-                    }
+                payment_response = await get_gateway_client("square").get(
+                    f"/v2/payments/{transaction_id}",
+                    headers=self._square_headers()
                 )
                 
                 if payment_response.status_code != 200:
@@ -235,7 +325,7 @@ class PaymentGatewayService:
             
             else:
                 raise Exception(f"Unsupported payment gateway: {gateway}")
-                
+        
         except Exception as e:
             logger.error(f"Payment verification error: {e}")
             return {
@@ -1,13 +1,33 @@
-from typing import Optional, List
+from typing import Optional, List, Dict, Any
 from datetime import datetime
+import asyncio
 import logging
 from decimal import Decimal
 
 from app.models.payment import Payment, PaymentCreate, PaymentStatus, PaymentMethod
+from app.models.receipt import Receipt
+from app.core.config import settings
 from app.core.exceptions import NotFoundException, ValidationException, PaymentException
+from app.core.jobs import Job, start_job
+from app.core.pagination import fetch_page
+from app.services.campaign_service import invalidate_campaign_cache
+from app.services.admin_service import record_donation_in_stats
+from app.services.receipt_service import ReceiptService
 
 logger = logging.getLogger(__name__)
 
+PAYMENT_PROCESSING_JOB = "payment_processing"
+
+_processing_limiter: Optional[asyncio.Semaphore] = None
+
+
+def _get_processing_limiter() -> asyncio.Semaphore:
+    """Get the semaphore capping concurrent payment jobs (created inside the running loop)"""
+    global _processing_limiter
+    if _processing_limiter is None:
+        _processing_limiter = asyncio.Semaphore(settings.PAYMENT_WORKERS)
+    return _processing_limiter
+
 
 class PaymentService:
     def __init__(self, supabase):
@@ -34,7 +54,7 @@ class PaymentService:
             }
             
             # Insert payment into database
-            result = self.supabase.table("campaign_payments").insert(payment_dict).execute()
+            result = await self.supabase.table("campaign_payments").insert(payment_dict).execute()
             
             if not result.data:
                 raise ValidationException("Failed to create payment")
@@ -49,7 +69,7 @@ class PaymentService:
     async def get_payment_by_id(self, payment_id: int) -> Optional[Payment]:
         """Get payment by ID"""
         try:
-            result = self.supabase.table("campaign_payments").select("*").eq("id", payment_id).execute()
+            result = await self.supabase.table("campaign_payments").select("*").eq("id", payment_id).execute()
             
             if not result.data:
                 return None
@@ -59,132 +79,194 @@ class PaymentService:
             logger.error(f"Error getting payment by ID: {e}")
             return None
 
-    async def get_campaign_payments(self, campaign_id: int) -> List[Payment]:
-        """Get payments for a specific campaign"""
+    async def get_campaign_payments(
+        self,
+        campaign_id: int,
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Get a page of payments for a specific campaign, newest first"""
+        query = self.supabase.table("campaign_payments").select("*").eq("campaign_id", campaign_id)
         try:
-            result = self.supabase.table("campaign_payments").select("*").eq("campaign_id", campaign_id).order("created_at", desc=True).execute()
-            
-            payments = []
-            if result.data:
-                for payment_data in result.data:
-                    payments.append(Payment(**payment_data))
-            
-            return payments
+            page = await fetch_page(query, cursor, limit)
+        except ValidationException:
+            raise
         except Exception as e:
             logger.error(f"Error getting campaign payments: {e}")
-            return []
+            return {"items": [], "next_cursor": None}
+        
+        return {
+            "items": [Payment(**payment_data) for payment_data in page["items"]],
+            "next_cursor": page["next_cursor"]
+        }
 
-    async def get_user_payments(self, user_id: int) -> List[Payment]:
-        """Get payments made by a user"""
+    async def get_user_payments(
+        self,
+        user_id: int,
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Get a page of payments made by a user, newest first"""
+        query = self.supabase.table("campaign_payments").select("*").eq("donor_id", user_id)
         try:
-            result = self.supabase.table("campaign_payments").select("*").eq("donor_id", user_id).order("created_at", desc=True).execute()
-            
-            payments = []
-            if result.data:
-                for payment_data in result.data:
-                    payments.append(Payment(**payment_data))
-            
-            return payments
+            page = await fetch_page(query, cursor, limit)
+        except ValidationException:
+            raise
         except Exception as e:
             logger.error(f"Error getting user payments: {e}")
-            return []
+            return {"items": [], "next_cursor": None}
+        
+        return {
+            "items": [Payment(**payment_data) for payment_data in page["items"]],
+            "next_cursor": page["next_cursor"]
+        }
+
+    def start_processing(self, payment_id: int, owner_id: Optional[int] = None) -> Job:
+        """Queue a payment for processing in the background"""
+        job = start_job(
+            PAYMENT_PROCESSING_JOB,
+            lambda job: self._run_processing_job(job, payment_id),
+            owner_id=owner_id,
+            limiter=_get_processing_limiter()
+        )
+        job.progress = {"payment_id": payment_id, "stage": "queued"}
+        return job
+
+    async def _run_processing_job(self, job: Job, payment_id: int) -> Dict[str, Any]:
+        """Job body for start_processing"""
+        payment = await self.process_payment(payment_id, job)
+        if not payment:
+            raise PaymentException("Failed to process payment")
+        return {
+            "payment_id": payment.id,
+            "status": payment.status.value,
+            "transaction_id": payment.transaction_id,
+            "processed_at": payment.processed_at.isoformat() if payment.processed_at else None
+        }
+
+    async def process_payment(self, payment_id: int, job: Optional[Job] = None) -> Optional[Payment]:
+        """Process a pending payment and return it completed, or None on failure"""
+        def set_stage(stage: str):
+            if job is not None:
+                job.progress["stage"] = stage
 
-    async def process_payment(self, payment_id: int) -> bool:
-        """Process a payment"""
         try:
-            # Update payment status to processing
-            result = self.supabase.table("campaign_payments").update({
+            # Claim the payment; only pending payments move to processing, so a
+            # payment queued twice is never charged or counted twice
+            set_stage("claiming")
+            result = await self.supabase.table("campaign_payments").update({
                 "status": PaymentStatus.PROCESSING.value,
                 "updated_at": datetime.utcnow().isoformat()
-            }).eq("id", payment_id).execute()
+            }).eq("id", payment_id).eq("status", PaymentStatus.PENDING.value).execute()
             
             if not result.data:
-                return False
-            
-            # Here you would integrate with payment gateways (Stripe, PayPal, Square)
-            # For now, we'll simulate successful processing
-            await self._simulate_payment_processing(payment_id)
-            
-            return True
+                return None
         except Exception as e:
             logger.error(f"Error processing payment: {e}")
-            return False
+            return None
 
-    async def _simulate_payment_processing(self, payment_id: int):
-        """Simulate payment processing"""
         try:
-            # Get payment details
-            payment = await self.get_payment_by_id(payment_id)
-            if not payment:
-                return False
+            payment = Payment(**result.data[0])
             
-            # Simulate processing delay
-            import asyncio
-            await asyncio.sleep(2)
+            # Here you would integrate with payment gateways (Stripe, PayPal, Square)
+            # For now, we'll simulate successful processing
+            set_stage("charging")
+            transaction_id = await self._simulate_payment_processing(payment)
             
-            # Update payment status to completed
-            result = self.supabase.table("campaign_payments").update({
+            set_stage("recording")
+            now = datetime.utcnow().isoformat()
+            result = await self.supabase.table("campaign_payments").update({
                 "status": PaymentStatus.COMPLETED.value,
-                "transaction_id": f"txn_{payment_id}_{datetime.utcnow().timestamp()}",
-                "processed_at": datetime.utcnow().isoformat(),
-                "updated_at": datetime.utcnow().isoformat()
-            }).eq("id", payment_id).execute()
+                "transaction_id": transaction_id,
+                "processed_at": now,
+                "updated_at": now
+            }).eq("id", payment_id).eq("status", PaymentStatus.PROCESSING.value).execute()
             
-            if result.data:
-                # Update campaign amount
-                await self._update_campaign_amount(payment.campaign_id, payment.amount)
-                
-                # Generate receipt
-                await self._generate_receipt(payment_id)
-            
-            return len(result.data) > 0
+            if not result.data:
+                return None
+            payment = Payment(**result.data[0])
         except Exception as e:
-            logger.error(f"Error simulating payment processing: {e}")
-            return False
+            logger.error(f"Error processing payment: {e}")
+            await self._mark_failed(payment_id)
+            return None
 
-    async def _update_campaign_amount(self, campaign_id: int, amount: Decimal):
-        """Update campaign current amount"""
+        # The campaign total and the receipt are independent of each other
+        set_stage("finalizing")
+        await asyncio.gather(
+            self._update_campaign_amount(payment.campaign_id, payment.amount, payment.id),
+            self._generate_receipt(payment)
+        )
+        record_donation_in_stats(payment.amount)
+        set_stage("done")
+        return payment
+
+    async def _simulate_payment_processing(self, payment: Payment) -> str:
+        """Simulate a gateway charge and return its transaction id"""
+        await asyncio.sleep(2)
+        return f"txn_{payment.id}_{datetime.utcnow().timestamp()}"
+
+    async def _mark_failed(self, payment_id: int):
+        """Move a payment stuck in processing to failed"""
         try:
-            # Get current campaign amount
-            result = self.supabase.table("campaigns").select("current_amount").eq("id", campaign_id).execute()
-            
-            if not result.data:
-                return False
-            
-            current_amount = Decimal(str(result.data[0]["current_amount"]))
-            new_amount = current_amount + amount
-            
-            # Update campaign amount
-            self.supabase.table("campaigns").update({
-                "current_amount": float(new_amount),
+            await self.supabase.table("campaign_payments").update({
+                "status": PaymentStatus.FAILED.value,
                 "updated_at": datetime.utcnow().isoformat()
-            }).eq("id", campaign_id).execute()
-            
-            return True
+            }).eq("id", payment_id).eq("status", PaymentStatus.PROCESSING.value).execute()
+        except Exception as e:
+            logger.error(f"Error marking payment {payment_id} failed: {e}")
+
+    async def _update_campaign_amount(self, campaign_id: int, amount: Decimal, payment_id: Optional[int] = None):
+        """Atomically add amount to campaign current amount (and record it in the donation ledger)"""
+        try:
+            result = await self.supabase.rpc("increment_campaign_amount", {
+                "campaign_id": campaign_id,
+                "delta": float(amount),
+                "payment_id": payment_id
+            }).execute()
+            invalidate_campaign_cache(campaign_id)
+            
+            return bool(result.data)
         except Exception as e:
             logger.error(f"Error updating campaign amount: {e}")
             return False
 
-    async def _generate_receipt(self, payment_id: int):
-        """Generate receipt for payment"""
+    async def _generate_receipt(self, payment: Payment):
+        """Record a receipt for a completed payment and queue its rendering"""
         try:
             from app.core.security import generate_receipt_uuid
             
-            receipt_uuid = generate_receipt_uuid()
+            campaign_result = await self.supabase.table("campaigns").select("title").eq("id", payment.campaign_id).execute()
+            campaign_title = campaign_result.data[0]["title"] if campaign_result.data else None
             
-            # Create receipt
+            generated_at = datetime.utcnow().isoformat()
             receipt_dict = {
-                "payment_id": payment_id,
-                "receipt_uuid": receipt_uuid,
-                "generated_at": datetime.utcnow().isoformat(),
+                "payment_id": payment.id,
+                "receipt_uuid": generate_receipt_uuid(),
+                "generated_at": generated_at,
                 "data": {
-                    "payment_id": payment_id,
-                    "generated_at": datetime.utcnow().isoformat()
+                    "payment_id": payment.id,
+                    "campaign_id": payment.campaign_id,
+                    "campaign_title": campaign_title,
+                    "donor_name": payment.donor_name,
+                    "donor_email": payment.donor_email,
+                    "is_anonymous": payment.is_anonymous,
+                    "amount": str(payment.amount),
+                    "currency": "USD",
+                    "method": payment.method.value,
+                    "transaction_id": payment.transaction_id,
+                    "processed_at": payment.processed_at.isoformat() if payment.processed_at else None,
+                    "generated_at": generated_at
                 }
             }
             
-            result = self.supabase.table("receipts").insert(receipt_dict).execute()
-            return len(result.data) > 0
+            result = await self.supabase.table("receipts").insert(receipt_dict).execute()
+            if not result.data:
+                return False
+            
+            # Rendering the HTML/PDF artifacts happens off the payment's path
+            receipt_service = ReceiptService(self.supabase)
+            receipt_service.start_rendering(Receipt(**result.data[0]))
+            return True
         except Exception as e:
             logger.error(f"Error generating receipt: {e}")
             return False
@@ -201,48 +283,31 @@ class PaymentService:
             if payment.status != PaymentStatus.COMPLETED:
                 raise PaymentException("Only completed payments can be refunded")
             
-            # Update payment status to refunded
-            result = self.supabase.table("campaign_payments").update({
+            # Only a still-completed payment moves to refunded, so concurrent
+            # refunds of the same payment subtract it from the campaign once
+            result = await self.supabase.table("campaign_payments").update({
                 "status": PaymentStatus.REFUNDED.value,
                 "updated_at": datetime.utcnow().isoformat()
-            }).eq("id", payment_id).execute()
+            }).eq("id", payment_id).eq("status", PaymentStatus.COMPLETED.value).execute()
             
             if result.data:
                 # Subtract amount from campaign
-                await self._subtract_campaign_amount(payment.campaign_id, payment.amount)
+                await self._subtract_campaign_amount(payment.campaign_id, payment.amount, payment.id)
+                record_donation_in_stats(-payment.amount, -1)
             
             return len(result.data) > 0
         except Exception as e:
             logger.error(f"Error refunding payment: {e}")
             return False
 
-    async def _subtract_campaign_amount(self, campaign_id: int, amount: Decimal):
-        """Subtract amount from campaign current amount"""
-        try:
-            # Get current campaign amount
-            result = self.supabase.table("campaigns").select("current_amount").eq("id", campaign_id).execute()
-            
-            if not result.data:
-                return False
-            
-            current_amount = Decimal(str(result.data[0]["current_amount"]))
-            new_amount = max(Decimal('0'), current_amount - amount)  # Don't go below 0
-            
-            # Update campaign amount
-            self.supabase.table("campaigns").update({
-                "current_amount": float(new_amount),
-                "updated_at": datetime.utcnow().isoformat()
-            }).eq("id", campaign_id).execute()
-            
-            return True
-        except Exception as e:
-            logger.error(f"Error subtracting campaign amount: {e}")
-            return False
+    async def _subtract_campaign_amount(self, campaign_id: int, amount: Decimal, payment_id: Optional[int] = None):
+        """Subtract amount from campaign current amount (never below 0)"""
+        return await self._update_campaign_amount(campaign_id, -amount, payment_id)
 
     async def get_campaign_by_payment_id(self, payment_id: int):
         """Get campaign by payment ID"""
         try:
-            result = self.supabase.table("campaign_payments").select("campaign_id").eq("id", payment_id).execute()
+            result = await self.supabase.table("campaign_payments").select("campaign_id").eq("id", payment_id).execute()
             
             if not result.data:
                 return None
@@ -250,7 +315,7 @@ class PaymentService:
             campaign_id = result.data[0]["campaign_id"]
             
             # Get campaign details
-            campaign_result = self.supabase.table("campaigns").select("*").eq("id", campaign_id).execute()
+            campaign_result = await self.supabase.table("campaigns").select("*").eq("id", campaign_id).execute()
             
             if not campaign_result.data:
                 return None
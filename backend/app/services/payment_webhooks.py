@@ -0,0 +1,232 @@
+"""
+Signature checks and event parsing for payment gateway webhooks.
+
+Each gateway signs its deliveries differently; verify_webhook checks the
+signature against the raw body and parse_webhook reduces the gateway's event
+to the few fields the webhook worker needs to move a payment along.
+"""
+
+from decimal import Decimal, InvalidOperation
+from typing import Any, Dict, Mapping, NamedTuple, Optional
+from urllib.parse import urlparse
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import time
+import zlib
+
+from app.core.config import settings
+from app.models.payment import PaymentStatus
+from app.services.payment_gateways import get_gateway_client
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_GATEWAYS = ("stripe", "paypal", "square")
+
+STRIPE_TRANSITIONS = {
+    "payment_intent.succeeded": PaymentStatus.COMPLETED,
+    "payment_intent.payment_failed": PaymentStatus.FAILED,
+    "payment_intent.canceled": PaymentStatus.CANCELLED,
+    "charge.refunded": PaymentStatus.REFUNDED,
+}
+PAYPAL_TRANSITIONS = {
+    "PAYMENT.SALE.COMPLETED": PaymentStatus.COMPLETED,
+    "PAYMENT.SALE.DENIED": PaymentStatus.FAILED,
+    "PAYMENT.SALE.REFUNDED": PaymentStatus.REFUNDED,
+    "PAYMENT.SALE.REVERSED": PaymentStatus.REFUNDED,
+}
+SQUARE_PAYMENT_STATUSES = {
+    "COMPLETED": PaymentStatus.COMPLETED,
+    "FAILED": PaymentStatus.FAILED,
+    "CANCELED": PaymentStatus.CANCELLED,
+}
+
+# PayPal signing certificates by URL; they rotate rarely
+_paypal_certs: Dict[str, Any] = {}
+
+
+class WebhookEvent(NamedTuple):
+    gateway: str
+    event_id: str
+    event_type: str
+    transaction_id: Optional[str]
+    payment_id: Optional[int]
+    target_status: Optional[PaymentStatus]
+    payload: Dict[str, Any]
+
+
+def _as_payment_id(value: Any) -> Optional[int]:
+    try:
+        return int(value) if value not in (None, "") else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _verify_stripe(headers: Mapping[str, str], body: bytes) -> bool:
+    """Stripe-Signature: t=<timestamp>,v1=<hex HMAC-SHA256 of "t.body">"""
+    secret = settings.STRIPE_WEBHOOK_SECRET
+    if not secret:
+        return False
+    parts: Dict[str, list] = {}
+    for item in headers.get("stripe-signature", "").split(","):
+        key, _, value = item.strip().partition("=")
+        parts.setdefault(key, []).append(value)
+    try:
+        timestamp = int(parts["t"][0])
+    except (KeyError, ValueError):
+        return False
+    if abs(time.time() - timestamp) > settings.WEBHOOK_SIGNATURE_TOLERANCE_SECONDS:
+        return False
+    expected = hmac.new(secret.encode("utf-8"), f"{timestamp}.".encode("utf-8") + body, hashlib.sha256).hexdigest()
+    return any(hmac.compare_digest(expected, signature) for signature in parts.get("v1", []))
+
+
+def _verify_square(headers: Mapping[str, str], body: bytes, notification_url: str) -> bool:
+    """x-square-hmacsha256-signature: base64 HMAC-SHA256 of notification URL + body"""
+    key = settings.SQUARE_WEBHOOK_SIGNATURE_KEY
+    if not key:
+        return False
+    digest = hmac.new(key.encode("utf-8"), notification_url.encode("utf-8") + body, hashlib.sha256).digest()
+    expected = base64.b64encode(digest).decode("ascii")
+    return hmac.compare_digest(expected, headers.get("x-square-hmacsha256-signature", ""))
+
+
+def _paypal_cert_allowed(cert_url: str) -> bool:
+    host = urlparse(cert_url).hostname or ""
+    return host == "paypal.com" or host.endswith(".paypal.com") or host == urlparse(settings.PAYPAL_API_BASE).hostname
+
+
+async def _verify_paypal(headers: Mapping[str, str], body: bytes) -> bool:
+    """RSA-SHA256 over "transmission id|time|webhook id|crc32(body)" with PayPal's cached cert"""
+    from cryptography import x509
+    from cryptography.hazmat.primitives import hashes
+    from cryptography.hazmat.primitives.asymmetric import padding
+
+    webhook_id = settings.PAYPAL_WEBHOOK_ID
+    cert_url = headers.get("paypal-cert-url", "")
+    if not webhook_id or not cert_url or not _paypal_cert_allowed(cert_url):
+        return False
+
+    public_key = _paypal_certs.get(cert_url)
+    if public_key is None:
+        response = await get_gateway_client("paypal").get(cert_url)
+        if response.status_code != 200:
+            return False
+        public_key = x509.load_pem_x509_certificate(response.content).public_key()
+        _paypal_certs[cert_url] = public_key
+
+    message = "|".join((
+        headers.get("paypal-transmission-id", ""),
+        headers.get("paypal-transmission-time", ""),
+        webhook_id,
+        str(zlib.crc32(body)),
+    ))
+    try:
+        public_key.verify(
+            base64.b64decode(headers.get("paypal-transmission-sig", "")),
+            message.encode("utf-8"),
+            padding.PKCS1v15(),
+            hashes.SHA256()
+        )
+        return True
+    except Exception:
+        return False
+
+
+async def verify_webhook(gateway: str, headers: Mapping[str, str], body: bytes, notification_url: str) -> bool:
+    """Check a delivery's signature; only PayPal may need a (cached) certificate fetch"""
+    try:
+        if gateway == "stripe":
+            return _verify_stripe(headers, body)
+        if gateway == "square":
+            return _verify_square(headers, body, notification_url)
+        if gateway == "paypal":
+            return await _verify_paypal(headers, body)
+    except Exception as e:
+        logger.warning(f"Error verifying {gateway} webhook signature: {e}")
+    return False
+
+
+def _parse_stripe(event: Dict[str, Any]) -> WebhookEvent:
+    event_type = event.get("type", "")
+    obj = (event.get("data") or {}).get("object") or {}
+    # Refunds arrive on the charge, which points back at the payment intent
+    transaction_id = obj.get("payment_intent") if event_type.startswith("charge.") else obj.get("id")
+    target_status = STRIPE_TRANSITIONS.get(event_type)
+    # charge.refunded is also sent for partial refunds; only a fully refunded
+    # charge has refunded=true
+    if target_status == PaymentStatus.REFUNDED and not obj.get("refunded"):
+        target_status = None
+    return WebhookEvent(
+        "stripe", event["id"], event_type, transaction_id,
+        _as_payment_id((obj.get("metadata") or {}).get("payment_id")),
+        target_status, event
+    )
+
+
+def _parse_paypal(event: Dict[str, Any]) -> WebhookEvent:
+    event_type = event.get("event_type", "")
+    resource = event.get("resource") or {}
+    return WebhookEvent(
+        "paypal", event["id"], event_type, resource.get("parent_payment"),
+        _as_payment_id(resource.get("custom")),
+        PAYPAL_TRANSITIONS.get(event_type), event
+    )
+
+
+def _parse_square(event: Dict[str, Any]) -> WebhookEvent:
+    event_type = event.get("type", "")
+    obj = (event.get("data") or {}).get("object") or {}
+    target_status = None
+    if "refund" in obj:
+        refund = obj["refund"]
+        transaction_id = refund.get("payment_id")
+        payment_id = None
+        if refund.get("status") == "COMPLETED":
+            target_status = PaymentStatus.REFUNDED
+    else:
+        payment = obj.get("payment") or {}
+        transaction_id = payment.get("id")
+        payment_id = _as_payment_id(payment.get("reference_id"))
+        target_status = SQUARE_PAYMENT_STATUSES.get(payment.get("status"))
+    return WebhookEvent("square", event["event_id"], event_type, transaction_id, payment_id, target_status, event)
+
+
+def refunded_amount(gateway: str, payload: Dict[str, Any]) -> Optional[Decimal]:
+    """Amount a refund event says was refunded in total, if it says.
+
+    PayPal and Square refund events do not carry the original payment amount,
+    so whether a refund is full can only be decided against the stored payment.
+    """
+    try:
+        if gateway == "stripe":
+            cents = ((payload.get("data") or {}).get("object") or {}).get("amount_refunded")
+            return Decimal(cents) / 100 if cents is not None else None
+        if gateway == "paypal":
+            resource = payload.get("resource") or {}
+            total = (resource.get("total_refunded_amount") or resource.get("amount") or {}).get("total")
+            return abs(Decimal(str(total))) if total is not None else None
+        if gateway == "square":
+            refund = ((payload.get("data") or {}).get("object") or {}).get("refund") or {}
+            cents = (refund.get("amount_money") or {}).get("amount")
+            return Decimal(cents) / 100 if cents is not None else None
+    except (AttributeError, InvalidOperation, TypeError):
+        pass
+    return None
+
+
+PARSERS = {
+    "stripe": _parse_stripe,
+    "paypal": _parse_paypal,
+    "square": _parse_square,
+}
+
+
+def parse_webhook(gateway: str, body: bytes) -> WebhookEvent:
+    """Decode a verified delivery; raises ValueError if it is not a usable event"""
+    try:
+        return PARSERS[gateway](json.loads(body))
+    except (KeyError, TypeError, AttributeError, json.JSONDecodeError) as e:
+        raise ValueError(f"Malformed {gateway} webhook event: {e}")
@@ -1,12 +1,152 @@
-from typing import Optional, List
+from typing import Optional, List, Dict, Any, Tuple
 from datetime import datetime
+from pathlib import Path
+import asyncio
+import hashlib
+import io
 import logging
+import os
+import time
+
+from jinja2 import Environment, FileSystemLoader
+from PIL import Image, ImageDraw, ImageFont
 
 from app.models.receipt import Receipt
+from app.core.config import settings
 from app.core.exceptions import NotFoundException
+from app.core.jobs import Job, start_job
 
 logger = logging.getLogger(__name__)
 
+RECEIPT_RENDER_JOB = "receipt_render"
+RECEIPT_MEDIA_TYPES = {
+    "html": "text/html",
+    "pdf": "application/pdf",
+}
+ORGANIZATION = "Fundraising Platform"
+TEMPLATE_DIR = Path(__file__).resolve().parent.parent / "templates" / "receipts"
+
+# A4 at 150 DPI
+PDF_PAGE_SIZE = (1240, 1754)
+PDF_RESOLUTION = 150.0
+
+_environment: Optional[Environment] = None
+_render_limiter: Optional[asyncio.Semaphore] = None
+
+
+def _get_environment() -> Environment:
+    global _environment
+    if _environment is None:
+        _environment = Environment(loader=FileSystemLoader(str(TEMPLATE_DIR)), autoescape=True)
+    return _environment
+
+
+def _get_render_limiter() -> asyncio.Semaphore:
+    """Get the semaphore capping concurrent renders (created inside the running loop)"""
+    global _render_limiter
+    if _render_limiter is None:
+        _render_limiter = asyncio.Semaphore(settings.RECEIPT_RENDER_WORKERS)
+    return _render_limiter
+
+
+def _load_font(size: int):
+    try:
+        return ImageFont.load_default(size=size)
+    except (TypeError, ImportError):
+        # Older Pillow or no FreeType: fall back to the fixed bitmap font
+        return ImageFont.load_default()
+
+
+def _receipt_fields(receipt_uuid: str, data: Dict[str, Any]) -> Dict[str, Any]:
+    """Turn stored receipt data into the labelled lines both formats print"""
+    donor = "Anonymous Donor" if data.get("is_anonymous") else (data.get("donor_name") or "Donor")
+    lines = [
+        ("Receipt number", receipt_uuid),
+        ("Donor", donor),
+        ("Donor email", data.get("donor_email") or ""),
+        ("Campaign", data.get("campaign_title") or f"Campaign #{data.get('campaign_id')}"),
+        ("Payment method", str(data.get("method") or "").replace("_", " ").title()),
+        ("Transaction", data.get("transaction_id") or ""),
+        ("Date", str(data.get("processed_at") or "")[:19].replace("T", " ")),
+    ]
+    return {
+        "organization": ORGANIZATION,
+        "receipt_uuid": receipt_uuid,
+        "lines": [(label, value) for label, value in lines if value],
+        "amount": f"${float(data.get('amount') or 0):,.2f} {data.get('currency', 'USD')}",
+        "issued_at": str(data.get("generated_at") or "")[:19].replace("T", " "),
+    }
+
+
+def render_receipt_html(receipt_uuid: str, data: Dict[str, Any]) -> bytes:
+    """Render a receipt as a standalone HTML page"""
+    template = _get_environment().get_template("receipt.html.j2")
+    return template.render(**_receipt_fields(receipt_uuid, data)).encode("utf-8")
+
+
+def render_receipt_pdf(receipt_uuid: str, data: Dict[str, Any]) -> bytes:
+    """Render a receipt as a one-page PDF with Pillow"""
+    fields = _receipt_fields(receipt_uuid, data)
+    page = Image.new("L", PDF_PAGE_SIZE, 255)
+    draw = ImageDraw.Draw(page)
+    title_font, body_font, total_font = _load_font(48), _load_font(26), _load_font(34)
+
+    x, y = 120, 140
+    draw.text((x, y), "Donation Receipt", fill=0, font=title_font)
+    y += 80
+    draw.text((x, y), fields["organization"], fill=110, font=body_font)
+    y += 90
+    for label, value in fields["lines"]:
+        draw.text((x, y), label, fill=90, font=body_font)
+        draw.text((x + 380, y), str(value), fill=0, font=body_font)
+        y += 56
+    y += 20
+    draw.line((x, y, PDF_PAGE_SIZE[0] - x, y), fill=180, width=2)
+    y += 40
+    draw.text((x, y), "Amount", fill=0, font=total_font)
+    draw.text((x + 380, y), fields["amount"], fill=0, font=total_font)
+    y += 120
+    draw.text((x, y), "Thank you for supporting student fundraisers!", fill=0, font=body_font)
+    draw.text((x, y + 50), f"Issued {fields['issued_at']} UTC", fill=110, font=body_font)
+
+    # Pin the PDF dates so identical receipts hash identically
+    try:
+        issued = time.strptime(fields["issued_at"], "%Y-%m-%d %H:%M:%S")
+    except ValueError:
+        issued = time.gmtime(0)
+    buffer = io.BytesIO()
+    page.save(buffer, "PDF", resolution=PDF_RESOLUTION, title=f"Receipt {receipt_uuid}",
+              creationDate=issued, modDate=issued)
+    return buffer.getvalue()
+
+
+RENDERERS = {
+    "html": render_receipt_html,
+    "pdf": render_receipt_pdf,
+}
+
+
+def artifact_path(digest: str, fmt: str) -> Path:
+    """Location of a stored artifact, sharded by the first byte of its hash"""
+    return Path(settings.RECEIPT_STORAGE_DIR) / digest[:2] / f"{digest}.{fmt}"
+
+
+def _store_artifact(content: bytes, fmt: str) -> str:
+    """Write an artifact under its SHA-256 unless it is already stored"""
+    digest = hashlib.sha256(content).hexdigest()
+    path = artifact_path(digest, fmt)
+    if not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        tmp_path.write_bytes(content)
+        os.replace(tmp_path, path)
+    return digest
+
+
+def _render_artifacts(receipt_uuid: str, data: Dict[str, Any]) -> Dict[str, str]:
+    """Render and store every format, returning their content hashes"""
+    return {fmt: _store_artifact(render(receipt_uuid, data), fmt) for fmt, render in RENDERERS.items()}
+
 
 class ReceiptService:
     def __init__(self, supabase):
@@ -15,7 +155,7 @@ class ReceiptService:
     async def get_payment_receipt(self, payment_id: int) -> Optional[Receipt]:
         """Get receipt for a specific payment"""
         try:
-            result = self.supabase.table("receipts").select("*").eq("payment_id", payment_id).execute()
+            result = await self.supabase.table("receipts").select("*").eq("payment_id", payment_id).execute()
             
             if not result.data:
                 return None
@@ -29,7 +169,7 @@ class ReceiptService:
         """Get receipts for a user"""
         try:
             # Get receipts through payments made by user
-            result = self.supabase.table("receipts").select("*, campaign_payments!inner(*)").eq("campaign_payments.donor_id", user_id).execute()
+            result = await self.supabase.table("receipts").select("*, campaign_payments!inner(*)").eq("campaign_payments.donor_id", user_id).execute()
             
             receipts = []
             if result.data:
@@ -40,3 +180,40 @@ class ReceiptService:
         except Exception as e:
             logger.error(f"Error getting user receipts: {e}")
             return []
+
+    async def render_receipt(self, receipt: Receipt) -> Dict[str, str]:
+        """Render a receipt's artifacts off the event loop and record their hashes"""
+        data = dict(receipt.data or {})
+        loop = asyncio.get_running_loop()
+        artifacts = await loop.run_in_executor(None, _render_artifacts, receipt.receipt_uuid, data)
+        
+        if data.get("artifacts") != artifacts:
+            data["artifacts"] = artifacts
+            await self.supabase.table("receipts").update({
+                "data": data,
+                "receipt_url": f"/api/v1/receipts/payment/{receipt.payment_id}/download"
+            }).eq("id", receipt.id).execute()
+            receipt.data = data
+        
+        return artifacts
+
+    def start_rendering(self, receipt: Receipt) -> Job:
+        """Render a receipt in the background"""
+        return start_job(
+            RECEIPT_RENDER_JOB,
+            lambda job: self.render_receipt(receipt),
+            limiter=_get_render_limiter()
+        )
+
+    async def get_artifact(self, receipt: Receipt, fmt: str) -> Tuple[str, Path]:
+        """Get the content hash and file of a receipt artifact, rendering it if missing"""
+        if fmt not in RENDERERS:
+            raise NotFoundException(f"Unsupported receipt format: {fmt}")
+        
+        digest = ((receipt.data or {}).get("artifacts") or {}).get(fmt)
+        if digest and artifact_path(digest, fmt).exists():
+            return digest, artifact_path(digest, fmt)
+        
+        # Not rendered yet (or rendered before artifacts existed): do it now
+        digest = (await self.render_receipt(receipt))[fmt]
+        return digest, artifact_path(digest, fmt)
@@ -5,6 +5,7 @@ import logging
 from app.models.referral import Referral, ReferralCreate, ReferralStats, ReferralStatus
 from app.core.security import generate_referral_token
 from app.core.exceptions import NotFoundException, ValidationException
+from app.services.user_service import invalidate_user_cache
 
 logger = logging.getLogger(__name__)
 
@@ -31,7 +32,7 @@ class ReferralService:
             }
             
             # Insert referral into database
-            result = self.supabase.table("referrals").insert(referral_dict).execute()
+            result = await self.supabase.table("referrals").insert(referral_dict).execute()
             
             if not result.data:
                 raise ValidationException("Failed to create referral")
@@ -46,7 +47,7 @@ class ReferralService:
     async def get_campaign_referrals(self, campaign_id: int) -> List[Referral]:
         """Get referrals for a specific campaign"""
         try:
-            result = self.supabase.table("referrals").select("*").eq("campaign_id", campaign_id).order("created_at", desc=True).execute()
+            result = await self.supabase.table("referrals").select("*").eq("campaign_id", campaign_id).order("created_at", desc=True).execute()
             
             referrals = []
             if result.data:
@@ -61,7 +62,7 @@ class ReferralService:
     async def get_referral_by_token(self, token: str) -> Optional[Referral]:
         """Get referral by token"""
         try:
-            result = self.supabase.table("referrals").select("*").eq("token", token).execute()
+            result = await self.supabase.table("referrals").select("*").eq("token", token).execute()
             
             if not result.data:
                 return None
@@ -84,7 +85,7 @@ class ReferralService:
                 return False
             
             # Update referral status to accepted
-            result = self.supabase.table("referrals").update({
+            result = await self.supabase.table("referrals").update({
                 "status": ReferralStatus.ACCEPTED.value,
                 "accepted_at": datetime.utcnow().isoformat()
             }).eq("token", token).execute()
@@ -102,7 +103,7 @@ class ReferralService:
         """Update user's referral count when referral is accepted"""
         try:
             # Get campaign to find user_id
-            campaign_result = self.supabase.table("campaigns").select("user_id").eq("id", campaign_id).execute()
+            campaign_result = await self.supabase.table("campaigns").select("user_id").eq("id", campaign_id).execute()
             
             if not campaign_result.data:
                 return False
@@ -110,7 +111,7 @@ class ReferralService:
             user_id = campaign_result.data[0]["user_id"]
             
             # Get current referral count
-            user_result = self.supabase.table("users").select("referral_count").eq("id", user_id).execute()
+            user_result = await self.supabase.table("users").select("referral_count").eq("id", user_id).execute()
             
             if not user_result.data:
                 return False
@@ -119,10 +120,11 @@ class ReferralService:
             new_count = current_count + 1
             
             # Update referral count
-            self.supabase.table("users").update({
+            await self.supabase.table("users").update({
                 "referral_count": new_count,
                 "updated_at": datetime.utcnow().isoformat()
             }).eq("id", user_id).execute()
+            invalidate_user_cache(user_id)
             
             return True
         except Exception as e:
@@ -133,7 +135,7 @@ class ReferralService:
         """Get referral statistics for a campaign"""
         try:
             # Get all referrals for campaign
-            result = self.supabase.table("referrals").select("status").eq("campaign_id", campaign_id).execute()
+            result = await self.supabase.table("referrals").select("status").eq("campaign_id", campaign_id).execute()
             
             if not result.data:
                 return ReferralStats(
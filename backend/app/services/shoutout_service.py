@@ -26,7 +26,7 @@ class ShoutoutService:
             }
             
             # Insert shoutout into database
-            result = self.supabase.table("shoutouts").insert(shoutout_dict).execute()
+            result = await self.supabase.table("shoutouts").insert(shoutout_dict).execute()
             
             if not result.data:
                 raise ValidationException("Failed to create shoutout")
@@ -41,7 +41,7 @@ class ShoutoutService:
     async def get_campaign_shoutouts(self, campaign_id: int) -> List[Shoutout]:
         """Get shoutouts for a specific campaign"""
         try:
-            result = self.supabase.table("shoutouts").select("*").eq("campaign_id", campaign_id).eq("visible", True).order("created_at", desc=True).execute()
+            result = await self.supabase.table("shoutouts").select("*").eq("campaign_id", campaign_id).eq("visible", True).order("created_at", desc=True).execute()
             
             shoutouts = []
             if result.data:
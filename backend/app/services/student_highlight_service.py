@@ -17,7 +17,7 @@ class StudentHighlightService:
         """Get the currently highlighted student"""
         try:
             # Get the most recent highlighted student
-            result = self.supabase.table("student_highlights").select(
+            result = await self.supabase.table("student_highlights").select(
                 "*, users(first_name, last_name)"
             ).eq("is_active", True).order("created_at", desc=True).limit(1).execute()
             
@@ -47,7 +47,7 @@ class StudentHighlightService:
         """Create a new student highlight"""
         try:
             # Deactivate current highlights
-            self.supabase.table("student_highlights").update({
+            await self.supabase.table("student_highlights").update({
                 "is_active": False
             }).eq("is_active", True).execute()
             
@@ -61,7 +61,7 @@ class StudentHighlightService:
                 "created_at": datetime.utcnow().isoformat()
             }
             
-            result = self.supabase.table("student_highlights").insert(highlight_dict).execute()
+            result = await self.supabase.table("student_highlights").insert(highlight_dict).execute()
             return len(result.data) > 0
         except Exception as e:
             logger.error(f"Error creating student highlight: {e}")
@@ -71,7 +71,7 @@ class StudentHighlightService:
         """Get list of highlighted donors (without revealing amounts)"""
         try:
             # Get recent large donations (anonymized)
-            result = self.supabase.table("campaign_payments").select(
+            result = await self.supabase.table("campaign_payments").select(
                 "donor_name, display_name, created_at, campaigns(title)"
             ).eq("is_anonymous", False).order("created_at", desc=True).limit(limit).execute()
             
@@ -92,7 +92,7 @@ class StudentHighlightService:
     async def get_student_achievements(self, user_id: int) -> List[Dict[str, Any]]:
         """Get achievements for a specific student"""
         try:
-            result = self.supabase.table("student_highlights").select("*").eq("user_id", user_id).order("created_at", desc=True).execute()
+            result = await self.supabase.table("student_highlights").select("*").eq("user_id", user_id).order("created_at", desc=True).execute()
             
             achievements = []
             if result.data:
@@ -117,7 +117,7 @@ class StudentHighlightService:
             # Get highlights from the past week
             week_ago = (datetime.utcnow() - timedelta(days=7)).isoformat()
             
-            result = self.supabase.table("student_highlights").select(
+            result = await self.supabase.table("student_highlights").select(
                 "*, users(first_name, last_name)"
             ).gte("created_at", week_ago).order("created_at", desc=True).execute()
             
@@ -6,13 +6,23 @@ import string
 
 from app.models.user import User, UserCreate, UserUpdate, UserProfile, UserRole
 from app.models.user_internal import UserInternal
-from app.core.security import get_password_hash, generate_secure_token
-from app.core.exceptions import NotFoundException, ValidationException
+from app.core.cache import create_cache
+from app.core.config import settings
+from app.core.security import get_password_hash_async, generate_secure_token
+from app.core.exceptions import NotFoundException, ValidationException, ServiceBusyException
 from app.services.email_service import EmailService
-from app.services.email_templates import get_password_reset_email_html, get_password_reset_email_text
+from app.services.email_templates import render_email
 
 logger = logging.getLogger(__name__)
 
+# Public User objects for authenticated requests, keyed by user id
+user_cache = create_cache("users", settings.USER_CACHE_MAX_ENTRIES, settings.USER_CACHE_TTL_SECONDS)
+
+
+def invalidate_user_cache(user_id: int):
+    """Drop a cached user after its row changes"""
+    user_cache.invalidate(int(user_id))
+
 
 class UserService:
     def __init__(self, supabase):
@@ -22,10 +32,10 @@ class UserService:
         """Create a new user"""
         try:
             # Generate referral code
-            referral_code = self._generate_referral_code()
+            referral_code = await self._generate_referral_code()
             
             # Hash password
-            password_hash = get_password_hash(user_data.password)
+            password_hash = await get_password_hash_async(user_data.password)
             
             # Check if referred by someone
             referred_by = None
@@ -55,7 +65,7 @@ class UserService:
             }
             
             # Insert user into database
-            result = self.supabase.table("users").insert(user_dict).execute()
+            result = await self.supabase.table("users").insert(user_dict).execute()
             
             if not result.data:
                 raise ValidationException("Failed to create user")
@@ -63,6 +73,8 @@ class UserService:
             user_data_dict = result.data[0]
             return User(**user_data_dict)
             
+        except ServiceBusyException:
+            raise
         except Exception as e:
             logger.error(f"Error creating user: {e}")
             raise ValidationException(f"Failed to create user: {str(e)}")
@@ -70,7 +82,7 @@ class UserService:
     async def get_user_by_id(self, user_id: int) -> Optional[User]:
         """Get user by ID"""
         try:
-            result = self.supabase.table("users").select("*").eq("id", user_id).execute()
+            result = await self.supabase.table("users").select("*").eq("id", user_id).execute()
             
             if not result.data:
                 return None
@@ -84,7 +96,7 @@ class UserService:
     async def get_user_by_email(self, email: str) -> Optional[User]:
         """Get user by email"""
         try:
-            result = self.supabase.table("users").select("*").eq("email", email.lower()).execute()
+            result = await self.supabase.table("users").select("*").eq("email", email.lower()).execute()
             
             if not result.data:
                 return None
@@ -98,7 +110,7 @@ class UserService:
     async def get_user_internal_by_email(self, email: str) -> Optional[UserInternal]:
         """Get internal user by email (includes password_hash for authentication)"""
         try:
-            result = self.supabase.table("users").select("*").eq("email", email.lower()).execute()
+            result = await self.supabase.table("users").select("*").eq("email", email.lower()).execute()
             
             if not result.data:
                 return None
@@ -111,7 +123,7 @@ class UserService:
     async def get_user_by_referral_code(self, referral_code: str) -> Optional[User]:
         """Get user by referral code"""
         try:
-            result = self.supabase.table("users").select("*").eq("referral_code", referral_code).execute()
+            result = await self.supabase.table("users").select("*").eq("referral_code", referral_code).execute()
             
             if not result.data:
                 return None
@@ -133,11 +145,12 @@ class UserService:
             if user_data.phone:
                 update_dict["phone"] = user_data.phone
             if user_data.password:
-                update_dict["password_hash"] = get_password_hash(user_data.password)
+                update_dict["password_hash"] = await get_password_hash_async(user_data.password)
             
             update_dict["updated_at"] = datetime.utcnow().isoformat()
             
-            result = self.supabase.table("users").update(update_dict).eq("id", user_id).execute()
+            result = await self.supabase.table("users").update(update_dict).eq("id", user_id).execute()
+            invalidate_user_cache(user_id)
             
             if not result.data:
                 return None
@@ -156,11 +169,11 @@ class UserService:
                 raise NotFoundException("User not found")
             
             # Get user campaigns for statistics
-            campaigns_result = self.supabase.table("campaigns").select("current_amount").eq("user_id", user_id).execute()
+            campaigns_result = await self.supabase.table("campaigns").select("current_amount").eq("user_id", user_id).execute()
             campaigns = campaigns_result.data if campaigns_result.data else []
             
             # Calculate total donations made
-            donations_result = self.supabase.table("campaign_payments").select("amount").eq("donor_id", user_id).execute()
+            donations_result = await self.supabase.table("campaign_payments").select("amount").eq("donor_id", user_id).execute()
             total_donations = sum(float(payment["amount"]) for payment in donations_result.data) if donations_result.data else 0.0
             
             # Calculate total raised from campaigns
@@ -190,11 +203,13 @@ class UserService:
         try:
             # In a real implementation, you would validate the token
             # and update the user's verification status
-            result = self.supabase.table("users").update({
+            result = await self.supabase.table("users").update({
                 "is_verified": True,
                 "updated_at": datetime.utcnow().isoformat()
             }).eq("verification_token", token).execute()
             
+            for row in result.data:
+                invalidate_user_cache(row["id"])
             return len(result.data) > 0
         except Exception as e:
             logger.error(f"Error verifying email: {e}")
@@ -212,7 +227,7 @@ class UserService:
             reset_token = generate_secure_token(32)
             
             # Store reset token with expiration
-            self.supabase.table("users").update({
+            await self.supabase.table("users").update({
                 "reset_token": reset_token,
                 "reset_token_expires": (datetime.utcnow() + timedelta(hours=1)).isoformat()
             }).eq("id", user.id).execute()
@@ -221,8 +236,7 @@ class UserService:
             email_service = EmailService()
             user_name = f"{user.first_name} {user.last_name}"
             subject = "Reset your password - Fundraising Platform"
-            html_content = get_password_reset_email_html(user_name, reset_token)
-            text_content = get_password_reset_email_text(user_name, reset_token)
+            html_content, text_content = render_email("password_reset", user_name=user_name, reset_token=reset_token)
             
             email_sent = await email_service.send_email(
                 to_email=email,
@@ -247,7 +261,7 @@ class UserService:
         """Reset password with token"""
         try:
             # Find user by reset token
-            result = self.supabase.table("users").select("*").eq("reset_token", token).execute()
+            result = await self.supabase.table("users").select("*").eq("reset_token", token).execute()
             
             if not result.data:
                 return False
@@ -259,23 +273,24 @@ class UserService:
                 return False
             
             # Update password and clear reset token
-            self.supabase.table("users").update({
-                "password_hash": get_password_hash(new_password),
+            await self.supabase.table("users").update({
+                "password_hash": await get_password_hash_async(new_password),
                 "reset_token": None,
                 "reset_token_expires": None,
                 "updated_at": datetime.utcnow().isoformat()
             }).eq("id", user_data["id"]).execute()
+            invalidate_user_cache(user_data["id"])
             
             return True
         except Exception as e:
             logger.error(f"Error resetting password: {e}")
             return False
 
-    def _generate_referral_code(self) -> str:
+    async def _generate_referral_code(self) -> str:
         """Generate a unique referral code"""
         while True:
             code = generate_secure_token(8)
             # Check if code already exists
-            result = self.supabase.table("users").select("id").eq("referral_code", code).execute()
+            result = await self.supabase.table("users").select("id").eq("referral_code", code).execute()
             if not result.data:
                 return code
@@ -0,0 +1,323 @@
+from typing import Any, Dict, List, Optional, Tuple
+from collections import OrderedDict, defaultdict
+from datetime import datetime
+from decimal import Decimal
+import asyncio
+import logging
+
+from app.core.config import settings
+from app.models.payment import Payment, PaymentStatus
+from app.services.admin_service import record_donation_in_stats
+from app.services.payment_service import PaymentService
+from app.services.payment_webhooks import WebhookEvent, refunded_amount
+
+logger = logging.getLogger(__name__)
+
+# Which statuses a payment may be in for a webhook to move it to each target
+ALLOWED_TRANSITIONS = {
+    PaymentStatus.COMPLETED: (PaymentStatus.PENDING, PaymentStatus.PROCESSING, PaymentStatus.FAILED),
+    PaymentStatus.FAILED: (PaymentStatus.PENDING, PaymentStatus.PROCESSING),
+    PaymentStatus.CANCELLED: (PaymentStatus.PENDING, PaymentStatus.PROCESSING, PaymentStatus.FAILED),
+    PaymentStatus.REFUNDED: (PaymentStatus.COMPLETED,),
+}
+
+# Recently accepted (gateway, event_id) pairs, so redeliveries are acknowledged
+# without a database round trip; the table's unique key catches the rest
+_seen_events: "OrderedDict[Tuple[str, str], None]" = OrderedDict()
+
+_worker_tasks: List[asyncio.Task] = []
+_wakeup: Optional[asyncio.Event] = None
+_webhook_stats: Dict[str, int] = {
+    "received": 0, "duplicates": 0, "rejected": 0,
+    "applied": 0, "ignored": 0, "failed": 0, "batches": 0,
+}
+
+
+def _remember(key: Tuple[str, str]):
+    _seen_events[key] = None
+    _seen_events.move_to_end(key)
+    while len(_seen_events) > settings.WEBHOOK_SEEN_EVENTS_MAX:
+        _seen_events.popitem(last=False)
+
+
+def record_rejected_webhook():
+    """Count a delivery refused for a bad signature or body"""
+    _webhook_stats["rejected"] += 1
+
+
+class WebhookService:
+    """Stores raw gateway events and applies them to payments in batches"""
+
+    def __init__(self, supabase):
+        self.supabase = supabase
+
+    async def ingest(self, event: WebhookEvent) -> bool:
+        """Persist a verified event for the worker; returns False for a duplicate"""
+        key = (event.gateway, event.event_id)
+        if key in _seen_events:
+            _webhook_stats["duplicates"] += 1
+            return False
+
+        result = await self.supabase.table("payment_webhook_events").upsert({
+            "gateway": event.gateway,
+            "event_id": event.event_id,
+            "event_type": event.event_type,
+            "transaction_id": event.transaction_id,
+            "payment_id": event.payment_id,
+            "target_status": event.target_status.value if event.target_status else None,
+            "payload": event.payload,
+            "status": "pending",
+            "next_attempt_at": datetime.utcnow().isoformat()
+        }, on_conflict="gateway,event_id", ignore_duplicates=True).execute()
+
+        _remember(key)
+        if not result.data:
+            _webhook_stats["duplicates"] += 1
+            return False
+
+        _webhook_stats["received"] += 1
+        notify_webhook_workers()
+        return True
+
+    async def claim_batch(self, limit: int) -> List[Dict[str, Any]]:
+        """Lease up to limit due events to the calling worker"""
+        result = await self.supabase.rpc("claim_payment_webhook_events", {
+            "batch_size": limit,
+            "lease_seconds": settings.WEBHOOK_LEASE_SECONDS
+        }).execute()
+        return result.data or []
+
+    async def _load_payments(self, events: List[Dict[str, Any]]) -> Dict[Tuple[str, Any], Payment]:
+        """Fetch every payment a batch refers to, by id and by gateway transaction id"""
+        payment_ids = sorted({event["payment_id"] for event in events if event.get("payment_id")})
+        transaction_ids = sorted({
+            event["transaction_id"] for event in events
+            if not event.get("payment_id") and event.get("transaction_id")
+        })
+
+        queries = []
+        table = self.supabase.table
+        if payment_ids:
+            queries.append(table("campaign_payments").select("*").in_("id", payment_ids).execute())
+        if transaction_ids:
+            queries.append(table("campaign_payments").select("*").in_("transaction_id", transaction_ids).execute())
+
+        payments: Dict[Tuple[str, Any], Payment] = {}
+        for result in await asyncio.gather(*queries):
+            for row in result.data or []:
+                payment = Payment(**row)
+                payments[("id", payment.id)] = payment
+                if payment.transaction_id:
+                    payments[("txn", payment.transaction_id)] = payment
+        return payments
+
+    async def apply_batch(self, events: List[Dict[str, Any]]) -> Dict[str, int]:
+        """Apply a batch of claimed events with one conditional update per target status"""
+        payments = await self._load_payments(events)
+
+        # Group each payment's transitions in arrival order; the n-th transition
+        # of every payment goes into wave n so one payment never races itself
+        waves: List[Dict[int, Tuple[PaymentStatus, Dict[str, Any]]]] = []
+        applied_events: List[int] = []
+        ignored_events: List[int] = []
+        depth: Dict[int, int] = defaultdict(int)
+        current: Dict[int, PaymentStatus] = {}
+
+        for event in sorted(events, key=lambda row: row["id"]):
+            target = PaymentStatus(event["target_status"]) if event.get("target_status") else None
+            payment = payments.get(("id", event.get("payment_id"))) or payments.get(("txn", event.get("transaction_id")))
+            if target is None or payment is None:
+                ignored_events.append(event["id"])
+                continue
+
+            status = current.get(payment.id, payment.status)
+            if status not in ALLOWED_TRANSITIONS[target]:
+                ignored_events.append(event["id"])
+                continue
+
+            # Partial refunds leave the payment completed; only a refund of the
+            # whole amount takes it off the campaign total
+            if target == PaymentStatus.REFUNDED:
+                refunded = refunded_amount(event["gateway"], event.get("payload") or {})
+                if refunded is not None and refunded < payment.amount:
+                    logger.info(f"Partial refund of {refunded} on payment {payment.id} ignored")
+                    ignored_events.append(event["id"])
+                    continue
+
+            current[payment.id] = target
+            wave = depth[payment.id]
+            depth[payment.id] += 1
+            if wave == len(waves):
+                waves.append({})
+            waves[wave][payment.id] = (target, event)
+
+        # (payment, signed amount) per applied transition, so each ledger row
+        # points at the payment that caused it
+        amount_changes: List[Tuple[Payment, Decimal]] = []
+        completed: List[Payment] = []
+        for wave in waves:
+            by_target: Dict[PaymentStatus, List[int]] = defaultdict(list)
+            for payment_id, (target, _) in wave.items():
+                by_target[target].append(payment_id)
+
+            results = await asyncio.gather(*(
+                self._transition(target, payment_ids, wave) for target, payment_ids in by_target.items()
+            ))
+            for target, rows in zip(by_target, results):
+                moved = {row["id"]: Payment(**row) for row in rows}
+                for payment_id in by_target[target]:
+                    event_id = wave[payment_id][1]["id"]
+                    payment = moved.get(payment_id)
+                    if payment is None:
+                        # Someone else moved it first
+                        ignored_events.append(event_id)
+                        continue
+                    applied_events.append(event_id)
+                    if target == PaymentStatus.COMPLETED:
+                        amount_changes.append((payment, payment.amount))
+                        record_donation_in_stats(payment.amount)
+                        completed.append(payment)
+                    elif target == PaymentStatus.REFUNDED:
+                        amount_changes.append((payment, -payment.amount))
+                        record_donation_in_stats(-payment.amount, -1)
+
+        await self._apply_side_effects(amount_changes, completed)
+        await asyncio.gather(
+            self._settle_events(applied_events, "applied"),
+            self._settle_events(ignored_events, "ignored")
+        )
+        return {"applied": len(applied_events), "ignored": len(ignored_events)}
+
+    async def _transition(
+        self,
+        target: PaymentStatus,
+        payment_ids: List[int],
+        wave: Dict[int, Tuple[PaymentStatus, Dict[str, Any]]]
+    ) -> List[Dict[str, Any]]:
+        """Move payments to target if they are still in a status that allows it"""
+        now = datetime.utcnow().isoformat()
+        update: Dict[str, Any] = {"status": target.value, "updated_at": now}
+        if target == PaymentStatus.COMPLETED:
+            update["processed_at"] = now
+
+        result = await self.supabase.table("campaign_payments").update(update).in_(
+            "id", payment_ids
+        ).in_(
+            "status", [status.value for status in ALLOWED_TRANSITIONS[target]]
+        ).execute()
+        rows = result.data or []
+
+        # Record the gateway's transaction id on payments that did not have one yet
+        if target == PaymentStatus.COMPLETED:
+            missing = [
+                (row["id"], wave[row["id"]][1].get("transaction_id")) for row in rows
+                if not row.get("transaction_id") and wave[row["id"]][1].get("transaction_id")
+            ]
+            await asyncio.gather(*(
+                self.supabase.table("campaign_payments").update({"transaction_id": transaction_id}).eq("id", payment_id).execute()
+                for payment_id, transaction_id in missing
+            ))
+            for row in rows:
+                row["transaction_id"] = row.get("transaction_id") or wave[row["id"]][1].get("transaction_id")
+        return rows
+
+    async def _apply_side_effects(self, amount_changes: List[Tuple[Payment, Decimal]], completed: List[Payment]):
+        """Campaign total and ledger update per payment, then receipts for completed payments"""
+        payment_service = PaymentService(self.supabase)
+        await asyncio.gather(*(
+            payment_service._update_campaign_amount(payment.campaign_id, amount, payment.id)
+            for payment, amount in amount_changes
+        ))
+        await asyncio.gather(*(payment_service._generate_receipt(payment) for payment in completed))
+
+    async def _settle_events(self, event_ids: List[int], status: str):
+        """Mark a set of events finished in one update"""
+        if not event_ids:
+            return
+        await self.supabase.table("payment_webhook_events").update({
+            "status": status,
+            "processed_at": datetime.utcnow().isoformat()
+        }).in_("id", event_ids).execute()
+        _webhook_stats[status] += len(event_ids)
+
+    async def fail_batch(self, events: List[Dict[str, Any]], error: str):
+        """Give up on events that exhausted their attempts; the rest retry after their lease"""
+        exhausted = [event["id"] for event in events if event.get("attempts", 0) >= settings.WEBHOOK_MAX_ATTEMPTS]
+        if exhausted:
+            await self.supabase.table("payment_webhook_events").update({
+                "status": "failed",
+                "last_error": error[:1000],
+                "processed_at": datetime.utcnow().isoformat()
+            }).in_("id", exhausted).execute()
+            _webhook_stats["failed"] += len(exhausted)
+
+
+def notify_webhook_workers():
+    """Wake idle workers so new events are applied immediately"""
+    if _wakeup is not None:
+        _wakeup.set()
+
+
+async def _worker_loop(worker_id: int):
+    """Apply claimed webhook events in batches until cancelled"""
+    from app.core.database import get_supabase_admin
+
+    try:
+        service = WebhookService(get_supabase_admin())
+    except Exception as e:
+        logger.error(f"Webhook worker {worker_id} not started, database unavailable: {e}")
+        return
+
+    while True:
+        batch: List[Dict[str, Any]] = []
+        try:
+            batch = await service.claim_batch(settings.WEBHOOK_BATCH_SIZE)
+            if batch:
+                _webhook_stats["batches"] += 1
+                try:
+                    await service.apply_batch(batch)
+                except Exception as e:
+                    logger.error(f"Webhook worker {worker_id} failed to apply {len(batch)} events: {e}")
+                    await service.fail_batch(batch, str(e))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Webhook worker {worker_id} error: {e}")
+            batch = []
+
+        if len(batch) < settings.WEBHOOK_BATCH_SIZE:
+            try:
+                await asyncio.wait_for(_wakeup.wait(), timeout=settings.WEBHOOK_POLL_SECONDS)
+                # Let a burst of deliveries accumulate into one batch
+                await asyncio.sleep(settings.WEBHOOK_BATCH_WAIT_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            _wakeup.clear()
+
+
+def start_webhook_workers():
+    """Start the background webhook workers on the running event loop"""
+    global _wakeup
+    if _worker_tasks:
+        return
+    _wakeup = asyncio.Event()
+    for worker_id in range(settings.WEBHOOK_WORKERS):
+        _worker_tasks.append(asyncio.create_task(_worker_loop(worker_id)))
+    logger.info(f"Started {settings.WEBHOOK_WORKERS} payment webhook workers")
+
+
+async def stop_webhook_workers():
+    """Cancel the webhook workers; leased events are retried after their lease expires"""
+    for task in _worker_tasks:
+        task.cancel()
+    await asyncio.gather(*_worker_tasks, return_exceptions=True)
+    _worker_tasks.clear()
+
+
+def get_webhook_metrics() -> Dict[str, Any]:
+    """Get ingestion and apply counters for this process"""
+    return {
+        "workers": len(_worker_tasks),
+        "seen_events": len(_seen_events),
+        **_webhook_stats
+    }
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Database concurrency benchmark
+Compares concurrent-request throughput of the old blocking Supabase/PostgREST
+calls against the pooled async client in app.core.database, using a local
+PostgREST stand-in that answers every query after a fixed latency.
+"""
+
+import asyncio
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+# Add the backend directory to Python path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from postgrest import SyncPostgrestClient
+
+from app.core.database import PooledPostgrestClient
+
+# Configuration
+HOST = "127.0.0.1"
+PORT = 54321
+LATENCY_SECONDS = 0.05  # simulated PostgREST round trip
+TOTAL_REQUESTS = 200
+REST_URL = f"http://{HOST}:{PORT}/rest/v1"
+
+
+class PostgrestStandIn(BaseHTTPRequestHandler):
+    """Answers every table query with a single campaign row after a fixed delay"""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        # Drain any request body so keep-alive connections stay in sync
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        time.sleep(LATENCY_SECONDS)
+        body = json.dumps([{"id": 1, "title": "Benchmark campaign", "status": "active"}]).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stand_in() -> ThreadingHTTPServer:
+    """Start the PostgREST stand-in on a background thread"""
+    server = ThreadingHTTPServer((HOST, PORT), PostgrestStandIn)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+async def run_blocking() -> float:
+    """Old behaviour: async handlers calling the synchronous client"""
+    client = SyncPostgrestClient(REST_URL)
+
+    async def handler():
+        client.table("campaigns").select("*").eq("id", 1).execute()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(handler() for _ in range(TOTAL_REQUESTS)))
+    elapsed = time.perf_counter() - start
+    client.aclose()
+    return elapsed
+
+
+async def run_async() -> float:
+    """New behaviour: async handlers awaiting the pooled client"""
+    client = PooledPostgrestClient(REST_URL)
+
+    async def handler():
+        await client.table("campaigns").select("*").eq("id", 1).execute()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(handler() for _ in range(TOTAL_REQUESTS)))
+    elapsed = time.perf_counter() - start
+    await client.aclose()
+    return elapsed
+
+
+def main():
+    """Run both scenarios and print throughput"""
+    print("🎯 Fundraising Platform Backend - DB Concurrency Benchmark")
+    print("=" * 60)
+    print(f"📋 {TOTAL_REQUESTS} concurrent requests, {LATENCY_SECONDS * 1000:.0f} ms simulated query latency")
+
+    server = start_stand_in()
+    try:
+        blocking = asyncio.run(run_blocking())
+        pooled = asyncio.run(run_async())
+    finally:
+        server.shutdown()
+
+    print("-" * 60)
+    print(f"🐢 Blocking client: {blocking:.2f}s ({TOTAL_REQUESTS / blocking:.1f} req/s)")
+    print(f"🚀 Pooled async client: {pooled:.2f}s ({TOTAL_REQUESTS / pooled:.1f} req/s)")
+    print(f"📊 Speedup: {blocking / pooled:.1f}x")
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Email template rendering benchmark
+Compares the previous inline f-string password reset email (HTML and text
+built separately on every send) against the precompiled Jinja2 template,
+which renders both alternatives from one source with autoescaping.
+Also reports cold start time with and without the on-disk bytecode cache.
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add the backend directory to Python path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.core.config import settings
+from app.services import email_templates
+
+# Configuration
+ITERATIONS = 5000
+USER_NAME = "Jordan Lee"
+RESET_TOKEN = "x" * 32
+
+
+def render_fstring(user_name: str, reset_token: str):
+    """The password reset email as it was built before the template package"""
+    html_content = f"""
+    <html>
+    <body style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto; padding: 20px;">
+        <div style="background-color: #f8f9fa; padding: 20px; border-radius: 10px;">
+            <h2 style="color: #4F46E5;">Password Reset Request</h2>
+            <p>Hello {user_name},</p>
+            <p>You requested to reset your password for your Fundraising Platform account.</p>
+            <p>Click the button below to reset your password:</p>
+            <div style="text-align: center; margin: 30px 0;">
+                <a href="{settings.FRONTEND_URL}/reset-password?token={reset_token}" 
+                   style="background-color: #4F46E5; color: white; padding: 15px 30px; text-decoration: none; border-radius: 8px; display: inline-block; font-weight: bold;">
+                   Reset My Password
+                </a>
+            </div>
+            <p><strong>Important:</strong></p>
+            <ul>
+                <li>This link will expire in 1 hour</li>
+                <li>If you didn't request this, please ignore this email</li>
+                <li>Your password will remain unchanged until you click the link above</li>
+            </ul>
+            <p>If the button doesn't work, copy and paste this link into your browser:</p>
+            <p style="word-break: break-all; background-color: #e9ecef; padding: 10px; border-radius: 5px;">
+                {settings.FRONTEND_URL}/reset-password?token={reset_token}
+            </p>
+            <hr style="margin: 30px 0; border: none; border-top: 1px solid #dee2e6;">
+            <p style="color: #6c757d; font-size: 14px;">
+                Best regards,<br>
+                The Fundraising Platform Team<br>
+                <a href="{settings.FRONTEND_URL}">{settings.FRONTEND_URL}</a>
+            </p>
+        </div>
+    </body>
+    </html>
+    """
+    text_content = f"""
+    Password Reset Request
+    
+    Hello {user_name},
+    
+    You requested to reset your password for your Fundraising Platform account.
+    
+    To reset your password, click this link:
+    {settings.FRONTEND_URL}/reset-password?token={reset_token}
+    
+    This link will expire in 1 hour.
+    
+    If you didn't request this, please ignore this email.
+    
+    Best regards,
+    The Fundraising Platform Team
+    """
+    return html_content, text_content
+
+
+def time_renders(render) -> float:
+    """Average microseconds per (html, text) pair"""
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        render()
+    return (time.perf_counter() - start) / ITERATIONS * 1_000_000
+
+
+def time_cold_load() -> float:
+    """Milliseconds to compile every template from a fresh environment"""
+    email_templates._templates.clear()
+    email_templates._environments.clear()
+    start = time.perf_counter()
+    email_templates.load_email_templates()
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    """Run the benchmark and print timings"""
+    print("🎯 Fundraising Platform Backend - Email Template Benchmark")
+    print("=" * 60)
+    print(f"📋 {ITERATIONS} renders of the password reset email (HTML + text)")
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        settings.EMAIL_TEMPLATE_CACHE_DIR = cache_dir
+        compile_ms = time_cold_load()
+        cached_ms = time_cold_load()
+
+        fstring_us = time_renders(lambda: render_fstring(USER_NAME, RESET_TOKEN))
+        jinja_us = time_renders(lambda: email_templates.render_email(
+            "password_reset", user_name=USER_NAME, reset_token=RESET_TOKEN
+        ))
+
+    print("-" * 60)
+    print(f"🧱 Template load, empty bytecode cache: {compile_ms:.1f} ms")
+    print(f"⚡ Template load, warm bytecode cache: {cached_ms:.1f} ms")
+    print(f"📝 Inline f-strings: {fstring_us:.1f} µs per email")
+    print(f"📝 Compiled Jinja2 (autoescaped): {jinja_us:.1f} µs per email ({1_000_000 / jinja_us:.0f} emails/s)")
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the thumbnail pipeline
+Pushes a corpus of JPEG/PNG/WebP uploads through thumbnail generation twice:
+inline on the event loop (how uploads used to work) and through the image
+worker pool. Reports throughput, per-upload latency and how long the event
+loop was blocked, then overfills the pool to check that it sheds load.
+
+Pass a directory of real photos to use them; otherwise a photo-like corpus
+is generated.
+
+Usage: python benchmark_image_pipeline.py [image_dir] [uploads]
+"""
+
+import asyncio
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add the backend directory to Python path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import numpy as np
+from PIL import Image
+
+from app.core.config import settings
+from app.core.exceptions import ServiceBusyException
+from app.services.image_processing import render_thumbnails
+from app.services.image_service import (
+    get_image_pipeline_metrics, image_service, run_image_job, shutdown_image_executor
+)
+
+# Typical phone-camera and screenshot sizes per format
+GENERATED_CORPUS = [
+    ("photo.jpg", "JPEG", (4032, 3024), {"quality": 90}),
+    ("portrait.jpg", "JPEG", (3000, 4000), {"quality": 85}),
+    ("banner.png", "PNG", (2400, 1200), {}),
+    ("screenshot.png", "PNG", (1920, 1080), {}),
+    ("photo.webp", "WEBP", (3000, 2000), {"quality": 80}),
+]
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp"}
+
+
+def make_photo(size, seed: int) -> Image.Image:
+    """Smooth gradients plus sensor-like noise, so files compress like photos"""
+    rng = np.random.default_rng(seed)
+    width, height = size
+    y, x = np.mgrid[0:height, 0:width].astype(np.float32)
+    channels = []
+    for phase in rng.uniform(0, 6.28, size=3):
+        wave = np.sin(x / width * 6 + phase) * np.cos(y / height * 4 - phase)
+        channels.append(127 + 90 * wave + rng.normal(0, 12, size=(height, width)))
+    pixels = np.clip(np.stack(channels, axis=-1), 0, 255).astype(np.uint8)
+    return Image.fromarray(pixels, "RGB")
+
+
+def build_corpus(directory: str):
+    corpus = []
+    for seed, (name, fmt, size, options) in enumerate(GENERATED_CORPUS):
+        path = os.path.join(directory, name)
+        make_photo(size, seed).save(path, fmt, **options)
+        corpus.append(path)
+    return corpus
+
+
+def load_corpus(directory: str):
+    return sorted(
+        str(path) for path in Path(directory).iterdir()
+        if path.suffix.lower() in IMAGE_EXTENSIONS
+    )
+
+
+def percentile(values, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+async def run_uploads(uploads, work_dir: str, sizes, use_pool: bool):
+    """Thumbnail every upload concurrently while measuring event loop lag"""
+    latencies = []
+    max_lag = 0.0
+    running = True
+
+    async def heartbeat():
+        nonlocal max_lag
+        interval = 0.005
+        while running:
+            before = time.perf_counter()
+            await asyncio.sleep(interval)
+            max_lag = max(max_lag, time.perf_counter() - before - interval)
+
+    # Stage the uploads on disk first, as upload_image has saved them by then
+    staged = []
+    for index, source in enumerate(uploads):
+        filename = f"{index}{os.path.splitext(source)[1]}"
+        shutil.copyfile(source, os.path.join(work_dir, filename))
+        staged.append(filename)
+
+    # All uploads arrive together, so latency counts from the start of the batch
+    async def upload(filename: str):
+        path = os.path.join(work_dir, filename)
+        if use_pool:
+            await run_image_job(render_thumbnails, path, work_dir, filename, sizes)
+        else:
+            render_thumbnails(path, work_dir, filename, sizes)
+        latencies.append(time.perf_counter() - start)
+
+    ticker = asyncio.create_task(heartbeat())
+    await asyncio.sleep(0.01)
+    start = time.perf_counter()
+    await asyncio.gather(*(upload(filename) for filename in staged))
+    elapsed = time.perf_counter() - start
+    running = False
+    await ticker
+    return elapsed, latencies, max_lag
+
+
+async def overfill(source: str, work_dir: str, sizes, count: int):
+    """Submit more uploads than the pool accepts; the excess must be rejected"""
+    shutil.copyfile(source, os.path.join(work_dir, "overfill.jpg"))
+
+    async def upload():
+        try:
+            await run_image_job(render_thumbnails, os.path.join(work_dir, "overfill.jpg"), work_dir, "overfill.jpg", sizes)
+            return True
+        except ServiceBusyException:
+            return False
+
+    results = await asyncio.gather(*(upload() for _ in range(count)))
+    return results.count(True), results.count(False)
+
+
+async def run(corpus, uploads: int) -> bool:
+    sizes = image_service.thumbnail_sizes
+    batch = [corpus[i % len(corpus)] for i in range(uploads)]
+    success = True
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        # Warm the pool so process start-up is not billed to the first uploads
+        await run_image_job(render_thumbnails, batch[0], work_dir, "warmup.jpg", sizes)
+
+        print("\n📐 Per-format thumbnail time (single upload, pool idle):")
+        for source in corpus:
+            start = time.perf_counter()
+            await run_image_job(render_thumbnails, source, work_dir, os.path.basename(source), sizes)
+            with Image.open(source) as img:
+                described = f"{img.format} {img.size[0]}x{img.size[1]}"
+            print(f"   {os.path.basename(source):<20} {described:<16} "
+                  f"{os.path.getsize(source) / 1024:>8.0f} KB  {(time.perf_counter() - start) * 1000:>7.1f}ms")
+
+        results = {}
+        for label, use_pool in (("inline", False), ("pool", True)):
+            elapsed, latencies, max_lag = await run_uploads(batch, work_dir, sizes, use_pool)
+            results[label] = (elapsed, max_lag)
+            print(f"\n{'🐢' if not use_pool else '🚀'} {label:<6} {uploads / elapsed:6.1f} uploads/s, "
+                  f"latency p50 {percentile(latencies, 0.5) * 1000:.0f}ms "
+                  f"p95 {percentile(latencies, 0.95) * 1000:.0f}ms, "
+                  f"event loop blocked up to {max_lag * 1000:.0f}ms")
+
+        capacity = get_image_pipeline_metrics()["workers"] + settings.IMAGE_MAX_QUEUE
+        accepted, rejected = await overfill(corpus[0], work_dir, sizes, capacity * 2)
+        print(f"\n🚦 Backpressure: {capacity * 2} simultaneous uploads, {accepted} accepted, {rejected} rejected with 503")
+        print(f"📊 Pool metrics: {get_image_pipeline_metrics()}")
+
+    if results["pool"][1] >= results["inline"][1]:
+        print("❌ The pool did not reduce event loop blocking")
+        success = False
+    if accepted != capacity or rejected != capacity:
+        print("❌ Backpressure did not cap in-flight uploads at the pool capacity")
+        success = False
+    if success:
+        print("\n✅ Thumbnails no longer block the event loop and excess load is shed")
+    return success
+
+
+def main():
+    """Main benchmark function"""
+    image_dir = sys.argv[1] if len(sys.argv) > 1 else None
+    uploads = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+    print("🎯 Fundraising Platform Backend - Image Pipeline Benchmark")
+    print("=" * 60)
+    print(f"🖥️  {os.cpu_count()} CPU cores, {get_image_pipeline_metrics()['workers']} image workers, "
+          f"queue {settings.IMAGE_MAX_QUEUE}")
+
+    with tempfile.TemporaryDirectory() as corpus_dir:
+        corpus = load_corpus(image_dir) if image_dir else build_corpus(corpus_dir)
+        if not corpus:
+            print(f"❌ No JPEG/PNG/WebP files in {image_dir}")
+            return False
+        print(f"🖼️  {len(corpus)} corpus images, {uploads} uploads per run")
+        try:
+            return asyncio.run(run(corpus, uploads))
+        finally:
+            shutdown_image_executor()
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Benchmark for thumbnail generation
+Compares the old approach (a full-resolution copy plus a LANCZOS thumbnail()
+per size) with the pyramid builder (reduced JPEG decode, one resize to the
+largest size, smaller sizes derived from the previous one) on JPEG/PNG/WebP
+uploads. Reports time, peak memory and PSNR of both against an exact
+full-resolution LANCZOS resample.
+
+Usage: python benchmark_thumbnails.py [image_dir] [repeats]
+"""
+
+import os
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+
+# Add the backend directory to Python path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import numpy as np
+from PIL import Image
+
+from app.services.image_processing import build_pyramid, fit_size
+from benchmark_image_pipeline import build_corpus, load_corpus
+
+SIZES = [(150, 150), (300, 300), (600, 600)]
+MIN_PSNR = 35.0
+
+
+def legacy_thumbnails(path: str):
+    """What _generate_thumbnails used to do"""
+    thumbnails = {}
+    with Image.open(path) as img:
+        if img.mode in ("RGBA", "P"):
+            img = img.convert("RGB")
+        for size in SIZES:
+            thumbnail = img.copy()
+            thumbnail.thumbnail(size, Image.Resampling.LANCZOS)
+            thumbnails[size] = thumbnail
+    return thumbnails
+
+
+def pyramid_thumbnails(path: str):
+    with Image.open(path) as img:
+        pyramid = build_pyramid(img, SIZES)
+        for thumbnail in pyramid.values():
+            thumbnail.load()
+        return pyramid
+
+
+METHODS = {"legacy": legacy_thumbnails, "pyramid": pyramid_thumbnails}
+
+
+def reference_thumbnails(path: str):
+    """Exact resample of the fully decoded image, with no reduce/draft shortcuts"""
+    with Image.open(path) as img:
+        img = img.convert("RGB")
+        return {size: img.resize(fit_size(img.size, size), Image.Resampling.LANCZOS) for size in SIZES}
+
+
+def psnr(image: Image.Image, reference: Image.Image) -> float:
+    if image.size != reference.size:
+        image = image.resize(reference.size, Image.Resampling.LANCZOS)
+    a = np.asarray(image.convert("RGB"), dtype=np.float64)
+    b = np.asarray(reference, dtype=np.float64)
+    mse = np.mean((a - b) ** 2)
+    return float("inf") if mse == 0 else 10 * np.log10(255 ** 2 / mse)
+
+
+def _rss_kb(field: str) -> int:
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith(field + ":"):
+                return int(line.split()[1])
+    return 0
+
+
+def peak_memory(method: str, path: str) -> float:
+    """Peak RSS growth in MB while one upload is thumbnailed (runs in a fresh process)"""
+    try:
+        # Reset the high-water mark, which otherwise carries over from the parent
+        with open("/proc/self/clear_refs", "w") as clear_refs:
+            clear_refs.write("5")
+        baseline = _rss_kb("VmRSS")
+        METHODS[method](path)
+        return (_rss_kb("VmHWM") - baseline) / 1024
+    except OSError:
+        baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        METHODS[method](path)
+        return (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - baseline) / 1024
+
+
+def measure(corpus, repeats: int) -> bool:
+    success = True
+    totals = {method: 0.0 for method in METHODS}
+    print(f"\n{'image':<16} {'method':<8} {'time':>9} {'peak mem':>9}   PSNR 600/300/150 (dB)")
+
+    for path in corpus:
+        reference = reference_thumbnails(path)
+        for method, func in METHODS.items():
+            start = time.perf_counter()
+            for _ in range(repeats):
+                thumbnails = func(path)
+            elapsed = (time.perf_counter() - start) / repeats
+            totals[method] += elapsed
+
+            with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+                memory = pool.submit(peak_memory, method, path).result()
+
+            scores = [psnr(thumbnails[size], reference[size]) for size in reversed(SIZES)]
+            print(f"{os.path.basename(path):<16} {method:<8} {elapsed * 1000:>7.1f}ms {memory:>7.1f}MB   "
+                  + " / ".join(f"{score:.1f}" for score in scores))
+            if method == "pyramid" and min(scores) < MIN_PSNR:
+                success = False
+
+    speedup = totals["legacy"] / totals["pyramid"]
+    print(f"\n⏱️  Total per corpus pass: legacy {totals['legacy'] * 1000:.0f}ms, "
+          f"pyramid {totals['pyramid'] * 1000:.0f}ms ({speedup:.1f}x faster)")
+    if not success:
+        print(f"❌ Some pyramid thumbnails fell below {MIN_PSNR} dB PSNR")
+    return success and speedup > 1
+
+
+def main():
+    """Main benchmark function"""
+    image_dir = sys.argv[1] if len(sys.argv) > 1 else None
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+    print("🎯 Fundraising Platform Backend - Thumbnail Benchmark")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as corpus_dir:
+        corpus = load_corpus(image_dir) if image_dir else build_corpus(corpus_dir)
+        if not corpus:
+            print(f"❌ No JPEG/PNG/WebP files in {image_dir}")
+            return False
+        print(f"🖼️  {len(corpus)} corpus images, sizes {SIZES}, time averaged over {repeats} runs")
+        success = measure(corpus, repeats)
+
+    if success:
+        print("✅ Pyramid thumbnails are faster and visually equivalent")
+    return success
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -60,6 +60,7 @@ CREATE TABLE IF NOT EXISTS campaign_payments (
     is_anonymous BOOLEAN DEFAULT FALSE,
     message TEXT,
     created_at TIMESTAMP DEFAULT NOW(),
+    updated_at TIMESTAMP DEFAULT NOW(),
     processed_at TIMESTAMP
 );
 
@@ -178,6 +179,15 @@ CREATE INDEX IF NOT EXISTS idx_companies_partner ON companies(is_partner);
 CREATE INDEX IF NOT EXISTS idx_highlights_active ON student_highlights(is_active);
 CREATE INDEX IF NOT EXISTS idx_grants_active ON grants(is_active);
 
+-- Keyset pagination indexes (newest first on (created_at, id))
+CREATE INDEX IF NOT EXISTS idx_users_created_id ON users(created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_campaigns_created_id ON campaigns(created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_payments_created_id ON campaign_payments(created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_referrals_created_id ON referrals(created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_shoutouts_created_id ON shoutouts(created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_milestones_created_id ON milestones(created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_receipts_generated_id ON receipts(generated_at DESC, id DESC);
+
 -- DISABLE Row Level Security for development (easier to work with)
 -- In production, you would enable RLS and create proper policies
 ALTER TABLE users DISABLE ROW LEVEL SECURITY;
@@ -192,6 +202,311 @@ ALTER TABLE company_partnerships DISABLE ROW LEVEL SECURITY;
 ALTER TABLE student_highlights DISABLE ROW LEVEL SECURITY;
 ALTER TABLE grants DISABLE ROW LEVEL SECURITY;
 
+-- 13. Email outbox table (drained by the background email workers)
+CREATE TABLE IF NOT EXISTS email_outbox (
+    id BIGSERIAL PRIMARY KEY,
+    to_email VARCHAR(255) NOT NULL,
+    subject VARCHAR(500) NOT NULL,
+    html_content TEXT NOT NULL,
+    text_content TEXT,
+    status VARCHAR(20) DEFAULT 'pending' CHECK (status IN ('pending', 'sending', 'sent', 'dead')),
+    attempts INTEGER DEFAULT 0,
+    next_attempt_at TIMESTAMP DEFAULT NOW(),
+    last_error TEXT,
+    created_at TIMESTAMP DEFAULT NOW(),
+    sent_at TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_email_outbox_due ON email_outbox(next_attempt_at) WHERE status IN ('pending', 'sending');
+CREATE INDEX IF NOT EXISTS idx_email_outbox_created_id ON email_outbox(created_at DESC, id DESC);
+
+ALTER TABLE email_outbox DISABLE ROW LEVEL SECURITY;
+
+-- 14. Email unsubscribes (opt-outs from campaign update mailings)
+CREATE TABLE IF NOT EXISTS email_unsubscribes (
+    email VARCHAR(255) PRIMARY KEY,
+    created_at TIMESTAMP DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_payments_campaign_donor_email ON campaign_payments(campaign_id, LOWER(donor_email));
+
+ALTER TABLE email_unsubscribes DISABLE ROW LEVEL SECURITY;
+
+-- 15. Payment gateway webhook events (raw events, applied in batches by the webhook worker)
+CREATE TABLE IF NOT EXISTS payment_webhook_events (
+    id BIGSERIAL PRIMARY KEY,
+    gateway VARCHAR(20) NOT NULL,
+    event_id VARCHAR(255) NOT NULL,
+    event_type VARCHAR(100),
+    transaction_id VARCHAR(255),
+    payment_id BIGINT,
+    target_status VARCHAR(20),
+    payload JSONB NOT NULL,
+    status VARCHAR(20) DEFAULT 'pending' CHECK (status IN ('pending', 'processing', 'applied', 'ignored', 'failed')),
+    attempts INTEGER DEFAULT 0,
+    next_attempt_at TIMESTAMP DEFAULT NOW(),
+    last_error TEXT,
+    received_at TIMESTAMP DEFAULT NOW(),
+    processed_at TIMESTAMP,
+    UNIQUE (gateway, event_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_webhook_events_due ON payment_webhook_events(next_attempt_at) WHERE status IN ('pending', 'processing');
+CREATE INDEX IF NOT EXISTS idx_payments_transaction_id ON campaign_payments(transaction_id);
+
+-- Status transitions (payment processing, webhooks, refunds) stamp updated_at;
+-- databases created before the column was added to campaign_payments get it here
+ALTER TABLE campaign_payments ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP DEFAULT NOW();
+
+ALTER TABLE payment_webhook_events DISABLE ROW LEVEL SECURITY;
+
+-- 16. Donation ledger (append-only record of every change to a campaign total, in cents)
+CREATE TABLE IF NOT EXISTS donation_ledger (
+    id BIGSERIAL PRIMARY KEY,
+    campaign_id BIGINT NOT NULL REFERENCES campaigns(id) ON DELETE CASCADE,
+    payment_id BIGINT REFERENCES campaign_payments(id) ON DELETE SET NULL,
+    entry_type VARCHAR(20) NOT NULL CHECK (entry_type IN ('donation', 'refund', 'correction')),
+    amount_cents BIGINT NOT NULL,
+    created_at TIMESTAMP DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_donation_ledger_campaign ON donation_ledger(campaign_id, id);
+CREATE INDEX IF NOT EXISTS idx_payments_completed_id ON campaign_payments(id) WHERE status = 'completed';
+
+-- Ledger rows never change, except that deleting a payment detaches its
+-- entries (payment_id ON DELETE SET NULL), which must not be rejected
+CREATE OR REPLACE FUNCTION reject_ledger_update()
+RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    IF OLD.payment_id IS NOT NULL AND NEW.payment_id IS NULL
+       AND (NEW.id, NEW.campaign_id, NEW.entry_type, NEW.amount_cents, NEW.created_at)
+           IS NOT DISTINCT FROM (OLD.id, OLD.campaign_id, OLD.entry_type, OLD.amount_cents, OLD.created_at) THEN
+        RETURN NEW;
+    END IF;
+    RAISE EXCEPTION 'donation_ledger is append-only';
+END;
+$$;
+
+DROP TRIGGER IF EXISTS donation_ledger_append_only ON donation_ledger;
+CREATE TRIGGER donation_ledger_append_only
+    BEFORE UPDATE ON donation_ledger
+    FOR EACH ROW EXECUTE FUNCTION reject_ledger_update();
+
+ALTER TABLE donation_ledger DISABLE ROW LEVEL SECURITY;
+
+-- Database functions
+-- Donor counts for a page of campaigns in a single round trip
+CREATE OR REPLACE FUNCTION get_campaign_donor_counts(campaign_ids BIGINT[])
+RETURNS TABLE (campaign_id BIGINT, donor_count BIGINT)
+LANGUAGE sql STABLE
+AS $$
+    SELECT p.campaign_id, COUNT(*) AS donor_count
+    FROM campaign_payments p
+    WHERE p.campaign_id = ANY(campaign_ids)
+    GROUP BY p.campaign_id;
+$$;
+
+-- Atomically add a donation (or refund, with a negative delta) to a campaign
+-- total and record the change in the donation ledger
+DROP FUNCTION IF EXISTS increment_campaign_amount(BIGINT, DECIMAL);
+CREATE OR REPLACE FUNCTION increment_campaign_amount(
+    campaign_id BIGINT,
+    delta DECIMAL,
+    payment_id BIGINT DEFAULT NULL
+)
+RETURNS SETOF campaigns
+LANGUAGE sql
+AS $$
+    -- The total never goes below 0, so the ledger records the change actually
+    -- applied; the ledger then always sums to current_amount
+    WITH previous AS (
+        SELECT c.id, COALESCE(c.current_amount, 0) AS amount
+        FROM campaigns c
+        WHERE c.id = increment_campaign_amount.campaign_id
+        FOR UPDATE
+    ),
+    updated AS (
+        UPDATE campaigns c
+        SET current_amount = GREATEST(0, previous.amount + increment_campaign_amount.delta),
+            updated_at = NOW()
+        FROM previous
+        WHERE c.id = previous.id
+        RETURNING c.*
+    ),
+    logged AS (
+        INSERT INTO donation_ledger (campaign_id, payment_id, entry_type, amount_cents)
+        SELECT
+            updated.id,
+            increment_campaign_amount.payment_id,
+            CASE WHEN increment_campaign_amount.delta < 0 THEN 'refund' ELSE 'donation' END,
+            ROUND((updated.current_amount - previous.amount) * 100)::BIGINT
+        FROM updated
+        JOIN previous ON previous.id = updated.id
+    )
+    SELECT * FROM updated;
+$$;
+
+-- Admin dashboard totals in a single round trip
+CREATE OR REPLACE FUNCTION get_platform_stats()
+RETURNS TABLE (
+    total_users BIGINT,
+    total_campaigns BIGINT,
+    active_campaigns BIGINT,
+    total_donations DECIMAL,
+    donation_count BIGINT
+)
+LANGUAGE sql STABLE
+AS $$
+    SELECT
+        (SELECT COUNT(*) FROM users),
+        (SELECT COUNT(*) FROM campaigns),
+        (SELECT COUNT(*) FROM campaigns WHERE status = 'active'),
+        (SELECT COALESCE(SUM(amount), 0) FROM campaign_payments WHERE status = 'completed'),
+        (SELECT COUNT(*) FROM campaign_payments WHERE status = 'completed');
+$$;
+
+-- Lease a batch of due outbox emails to one worker. Rows stuck in 'sending'
+-- past their lease (crashed worker) become due again.
+CREATE OR REPLACE FUNCTION claim_email_outbox(batch_size INT, lease_seconds INT)
+RETURNS SETOF email_outbox
+LANGUAGE sql
+AS $$
+    UPDATE email_outbox
+    SET status = 'sending',
+        attempts = attempts + 1,
+        next_attempt_at = NOW() + make_interval(secs => lease_seconds)
+    WHERE id IN (
+        SELECT id FROM email_outbox
+        WHERE status IN ('pending', 'sending') AND next_attempt_at <= NOW()
+        ORDER BY next_attempt_at
+        LIMIT batch_size
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING *;
+$$;
+
+-- One page of distinct donor addresses for a campaign update, ordered by
+-- address for keyset paging. Donors who opted out are skipped; a donor who
+-- gave anonymously even once is treated as anonymous.
+CREATE OR REPLACE FUNCTION get_campaign_update_recipients(campaign_id BIGINT, after_email TEXT, page_size INT)
+RETURNS TABLE (email TEXT, donor_name TEXT, is_anonymous BOOLEAN)
+LANGUAGE sql STABLE
+AS $$
+    SELECT LOWER(p.donor_email) AS email,
+           MAX(p.donor_name)::TEXT AS donor_name,
+           BOOL_OR(COALESCE(p.is_anonymous, FALSE)) AS is_anonymous
+    FROM campaign_payments p
+    WHERE p.campaign_id = get_campaign_update_recipients.campaign_id
+      AND p.status = 'completed'
+      AND p.donor_email IS NOT NULL
+      AND LOWER(p.donor_email) > COALESCE(after_email, '')
+      AND NOT EXISTS (SELECT 1 FROM email_unsubscribes u WHERE u.email = LOWER(p.donor_email))
+    GROUP BY LOWER(p.donor_email)
+    ORDER BY LOWER(p.donor_email)
+    LIMIT page_size;
+$$;
+
+-- Lease up to batch_size due webhook events to a worker, in arrival order.
+-- SKIP LOCKED lets several workers claim batches without blocking each other.
+CREATE OR REPLACE FUNCTION claim_payment_webhook_events(batch_size INT, lease_seconds INT)
+RETURNS SETOF payment_webhook_events
+LANGUAGE sql
+AS $$
+    UPDATE payment_webhook_events
+    SET status = 'processing',
+        attempts = attempts + 1,
+        next_attempt_at = NOW() + make_interval(secs => lease_seconds)
+    WHERE id IN (
+        SELECT id FROM payment_webhook_events
+        WHERE status IN ('pending', 'processing') AND next_attempt_at <= NOW()
+        ORDER BY id
+        LIMIT batch_size
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING *;
+$$;
+
+-- Every campaign's recorded total in cents, as two parallel arrays
+CREATE OR REPLACE FUNCTION get_campaign_amount_columns()
+RETURNS TABLE (campaign_ids BIGINT[], amount_cents BIGINT[])
+LANGUAGE sql STABLE
+AS $$
+    SELECT ARRAY_AGG(c.id ORDER BY c.id),
+           ARRAY_AGG(ROUND(COALESCE(c.current_amount, 0) * 100)::BIGINT ORDER BY c.id)
+    FROM campaigns c;
+$$;
+
+-- One batch of completed payments after after_id, as parallel arrays of
+-- campaign ids and amounts in cents (one row, so PostgREST row limits do not apply)
+CREATE OR REPLACE FUNCTION get_completed_payment_columns(after_id BIGINT, batch_size INT)
+RETURNS TABLE (last_id BIGINT, campaign_ids BIGINT[], amount_cents BIGINT[])
+LANGUAGE sql STABLE
+AS $$
+    SELECT MAX(b.id), ARRAY_AGG(b.campaign_id ORDER BY b.id), ARRAY_AGG(b.cents ORDER BY b.id)
+    FROM (
+        SELECT p.id, p.campaign_id, ROUND(p.amount * 100)::BIGINT AS cents
+        FROM campaign_payments p
+        WHERE p.status = 'completed' AND p.id > get_completed_payment_columns.after_id
+        ORDER BY p.id
+        LIMIT get_completed_payment_columns.batch_size
+    ) b;
+$$;
+
+-- Recorded and expected (completed payments) totals of the given campaigns in
+-- cents, read in one snapshot so reconciliation can re-check drift before fixing it
+CREATE OR REPLACE FUNCTION get_campaign_drift_columns(drifted_ids BIGINT[])
+RETURNS TABLE (campaign_ids BIGINT[], recorded_cents BIGINT[], expected_cents BIGINT[])
+LANGUAGE sql STABLE
+AS $$
+    SELECT ARRAY_AGG(c.id ORDER BY c.id),
+           ARRAY_AGG(ROUND(COALESCE(c.current_amount, 0) * 100)::BIGINT ORDER BY c.id),
+           ARRAY_AGG(COALESCE(p.cents, 0) ORDER BY c.id)
+    FROM campaigns c
+    LEFT JOIN (
+        SELECT campaign_id, SUM(ROUND(amount * 100))::BIGINT AS cents
+        FROM campaign_payments
+        WHERE status = 'completed' AND campaign_id = ANY(get_campaign_drift_columns.drifted_ids)
+        GROUP BY campaign_id
+    ) p ON p.campaign_id = c.id
+    WHERE c.id = ANY(get_campaign_drift_columns.drifted_ids);
+$$;
+
+-- Set drifted campaign totals in one statement and log each fix in the ledger.
+-- A campaign whose total changed since it was observed is left alone.
+CREATE OR REPLACE FUNCTION apply_campaign_corrections(
+    campaign_ids BIGINT[],
+    observed_cents BIGINT[],
+    expected_cents BIGINT[]
+)
+RETURNS TABLE (campaign_id BIGINT, previous_amount DECIMAL, current_amount DECIMAL)
+LANGUAGE sql
+AS $$
+    WITH expected AS (
+        SELECT *
+        FROM UNNEST(
+            apply_campaign_corrections.campaign_ids,
+            apply_campaign_corrections.observed_cents,
+            apply_campaign_corrections.expected_cents
+        ) AS e(id, observed, cents)
+    ),
+    corrected AS (
+        UPDATE campaigns c
+        SET current_amount = e.cents / 100.0,
+            updated_at = NOW()
+        FROM expected e
+        WHERE c.id = e.id
+          AND ROUND(COALESCE(c.current_amount, 0) * 100)::BIGINT = e.observed
+        RETURNING c.id, e.observed, e.cents, c.current_amount
+    ),
+    logged AS (
+        INSERT INTO donation_ledger (campaign_id, entry_type, amount_cents)
+        SELECT corrected.id, 'correction', corrected.cents - corrected.observed FROM corrected
+    )
+    SELECT corrected.id, corrected.observed / 100.0, corrected.current_amount FROM corrected;
+$$;
+
 -- Insert a default admin user (replace with your details)
 INSERT INTO users (email, password_hash, first_name, last_name, role, is_verified) 
 VALUES ('admin@fundraising.com', '$2b$12$LQv3c1yqBWVHxkd0LHAkCOYz6TtxMQJqhN8/LewdBPj4J/8.8.8.8', 'Admin', 'User', 'admin', true)
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Local mock of the Stripe, PayPal and Square endpoints used by PaymentGatewayService
+Point the gateway base URLs at it to exercise payments without real credentials:
+
+    STRIPE_API_BASE=http://127.0.0.1:8900/stripe
+    PAYPAL_API_BASE=http://127.0.0.1:8900/paypal
+    SQUARE_API_BASE=http://127.0.0.1:8900/square
+
+Usage: python mock_payment_gateways.py [port]
+"""
+
+import sys
+import uuid
+
+from fastapi import FastAPI, Form, Header, Request
+from fastapi.responses import JSONResponse
+
+TOKEN_LIFETIME_SECONDS = 32400
+
+app = FastAPI(title="Mock Payment Gateways")
+app.state.counters = {"paypal_tokens": 0, "requests": 0}
+app.state.payments = {}
+app.state.valid_tokens = set()
+
+
+@app.middleware("http")
+async def count_requests(request: Request, call_next):
+    request.app.state.counters["requests"] += 1
+    return await call_next(request)
+
+
+@app.post("/stripe/v1/payment_intents")
+async def stripe_create_intent(request: Request, amount: int = Form(...), currency: str = Form(...)):
+    intent = {
+        "id": f"pi_{uuid.uuid4().hex[:24]}",
+        "client_secret": f"pi_secret_{uuid.uuid4().hex[:16]}",
+        "status": "requires_payment_method",
+        "amount": amount,
+        "currency": currency,
+    }
+    request.app.state.payments[intent["id"]] = intent
+    return intent
+
+
+@app.get("/stripe/v1/payment_intents/{intent_id}")
+async def stripe_get_intent(request: Request, intent_id: str):
+    intent = request.app.state.payments.get(intent_id)
+    if intent is None:
+        return JSONResponse({"error": {"message": "No such payment_intent"}}, status_code=404)
+    return intent
+
+
+@app.post("/paypal/v1/oauth2/token")
+async def paypal_token(request: Request):
+    request.app.state.counters["paypal_tokens"] += 1
+    token = f"A21AA{uuid.uuid4().hex}"
+    request.app.state.valid_tokens.add(token)
+    return {"access_token": token, "token_type": "Bearer", "expires_in": TOKEN_LIFETIME_SECONDS}
+
+
+def _paypal_authorized(request: Request, authorization: str) -> bool:
+    return authorization.removeprefix("Bearer ") in request.app.state.valid_tokens
+
+
+@app.post("/paypal/v1/payments/payment")
+async def paypal_create_payment(request: Request, authorization: str = Header("")):
+    if not _paypal_authorized(request, authorization):
+        return JSONResponse({"error": "invalid_token"}, status_code=401)
+    body = await request.json()
+    payment = {
+        "id": f"PAYID-{uuid.uuid4().hex[:20].upper()}",
+        "state": "created",
+        "transactions": body["transactions"],
+        "links": [{"rel": "approval_url", "href": "https://www.sandbox.paypal.com/checkoutnow?token=EC-MOCK"}],
+    }
+    request.app.state.payments[payment["id"]] = payment
+    return JSONResponse(payment, status_code=201)
+
+
+@app.get("/paypal/v1/payments/payment/{payment_id}")
+async def paypal_get_payment(request: Request, payment_id: str, authorization: str = Header("")):
+    if not _paypal_authorized(request, authorization):
+        return JSONResponse({"error": "invalid_token"}, status_code=401)
+    payment = request.app.state.payments.get(payment_id)
+    if payment is None:
+        return JSONResponse({"name": "INVALID_RESOURCE_ID"}, status_code=404)
+    return payment
+
+
+@app.post("/square/v2/payments")
+async def square_create_payment(request: Request):
+    body = await request.json()
+    payment = {"id": uuid.uuid4().hex, "status": "COMPLETED", "amount_money": body["amount_money"]}
+    request.app.state.payments[payment["id"]] = payment
+    return {"payment": payment}
+
+
+@app.get("/square/v2/payments/{payment_id}")
+async def square_get_payment(request: Request, payment_id: str):
+    payment = request.app.state.payments.get(payment_id)
+    if payment is None:
+        return JSONResponse({"errors": [{"code": "NOT_FOUND"}]}, status_code=404)
+    return {"payment": payment}
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8900
+    print(f"🧪 Mock payment gateways on http://127.0.0.1:{port}")
+    uvicorn.run(app, host="127.0.0.1", port=port)
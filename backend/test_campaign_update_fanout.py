@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Test script for campaign update fan-out
+Sends an update to more donors than CAMPAIGN_UPDATE_RATE_PER_SECOND through
+the real fan-out loop (recipients and SMTP are replaced by in-memory stand-ins)
+and checks that every donor is reached at roughly the configured rate instead
+of the job stalling on the rate limiter.
+
+Usage: python test_campaign_update_fanout.py [recipients]
+"""
+
+import asyncio
+import sys
+import time
+from decimal import Decimal
+from pathlib import Path
+
+# Add the backend directory to Python path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.core.config import settings
+from app.core.jobs import Job
+from app.models.campaign import Campaign, CampaignDuration
+from app.services import campaign_update_service
+from app.services.campaign_update_service import CAMPAIGN_UPDATE_JOB, CampaignUpdateService, RateLimiter
+
+
+class _Result:
+    def __init__(self, data):
+        self.data = data
+
+
+class _Query:
+    def __init__(self, data):
+        self.data = data
+
+    async def execute(self):
+        return _Result(self.data)
+
+
+class RecipientDatabase:
+    """Answers get_campaign_update_recipients from a list of addresses"""
+
+    def __init__(self, recipients: int):
+        self.emails = sorted(f"donor{i:05d}@example.com" for i in range(recipients))
+
+    def rpc(self, name: str, params: dict):
+        after = params["after_email"]
+        page = [email for email in self.emails if after is None or email > after][:params["page_size"]]
+        return _Query([{"email": email, "donor_name": "Donor", "is_anonymous": False} for email in page])
+
+
+class RecordingEmailService:
+    """Collects what would have been handed to SMTP"""
+
+    sent = []
+
+    async def send_bulk(self, messages):
+        RecordingEmailService.sent.extend((time.monotonic(), m.to_email) for m in messages)
+        return [None] * len(messages)
+
+
+async def test_large_acquire(rate: float) -> bool:
+    """A single request bigger than the rate must still be granted"""
+    limiter = RateLimiter(rate)
+    try:
+        await asyncio.wait_for(limiter.acquire(int(rate) + 1), timeout=5)
+        print(f"✅ acquire({int(rate) + 1}) at {rate:g}/s returned")
+        return True
+    except asyncio.TimeoutError:
+        print(f"❌ acquire({int(rate) + 1}) at {rate:g}/s never returned")
+        return False
+
+
+async def test_fan_out(recipients: int) -> bool:
+    rate = settings.CAMPAIGN_UPDATE_RATE_PER_SECOND
+    campaign = Campaign(
+        id=1,
+        user_id=1,
+        title="Fan-out test campaign",
+        description="Campaign used to exercise the update fan-out",
+        goal_amount=Decimal("1000.00"),
+        duration_months=CampaignDuration.ONE_MONTH
+    )
+    service = CampaignUpdateService(RecipientDatabase(recipients))
+    campaign_update_service.EmailService = RecordingEmailService
+
+    # The limiter starts with a full bucket, so the first batch goes out at once
+    burst = settings.CAMPAIGN_UPDATE_BATCH_SIZE
+    budget = max(0, recipients - burst) / rate + 5
+    print(f"📨 Fanning out to {recipients} donors at {rate:g}/s (batches of {burst})...")
+    start = time.monotonic()
+    try:
+        result = await asyncio.wait_for(
+            service._fan_out(Job(CAMPAIGN_UPDATE_JOB), campaign, "Update", "Thank you!"), timeout=budget
+        )
+    except asyncio.TimeoutError:
+        print(f"❌ Fan-out stalled: {len(RecordingEmailService.sent)} of {recipients} sent after {budget:.0f}s")
+        return False
+    elapsed = time.monotonic() - start
+
+    delivered = {email for _, email in RecordingEmailService.sent}
+    print(f"📬 {result['sent']} sent to {len(delivered)} distinct donors in {elapsed:.1f}s")
+    if result["sent"] != recipients or len(delivered) != recipients:
+        print("❌ Not every donor received the update")
+        return False
+
+    # Outside the initial burst, no one-second window may exceed the rate
+    times = [sent_at - start for sent_at, _ in RecordingEmailService.sent]
+    worst = max(sum(1 for t in times if window <= t < window + 1) for window in times if window >= 1)
+    if worst > rate + burst:
+        print(f"❌ Up to {worst} emails went out in one second")
+        return False
+    print(f"✅ All donors reached, at most {worst} emails in any one second")
+    return True
+
+
+def main():
+    """Main test function"""
+    rate = settings.CAMPAIGN_UPDATE_RATE_PER_SECOND
+    recipients = int(sys.argv[1]) if len(sys.argv) > 1 else int(settings.CAMPAIGN_UPDATE_BATCH_SIZE + rate * 4)
+
+    print("🎯 Fundraising Platform Backend - Campaign Update Fan-out Test")
+    print("=" * 60)
+    if not settings.SECRET_KEY:
+        print("❌ SECRET_KEY must be set (unsubscribe links are signed with it)")
+        return False
+
+    async def run():
+        return await test_large_acquire(rate) and await test_fan_out(recipients)
+
+    return asyncio.run(run())
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
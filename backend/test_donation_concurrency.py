@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Test script for concurrent donation totals
+Fires hundreds of parallel donations at one campaign through
+increment_campaign_amount and checks that no update was lost.
+
+Usage: python test_donation_concurrency.py <campaign_id> [donations]
+"""
+
+import asyncio
+import sys
+from decimal import Decimal
+from pathlib import Path
+
+# Add the backend directory to Python path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.core.database import init_db, close_db, get_supabase_admin
+from app.services.campaign_service import CampaignService
+
+DONATION_AMOUNT = Decimal("1.25")
+
+
+async def get_current_amount(supabase, campaign_id: int) -> Decimal:
+    """Read the campaign total straight from the database"""
+    result = await supabase.table("campaigns").select("current_amount").eq("id", campaign_id).execute()
+    return Decimal(str(result.data[0]["current_amount"]))
+
+
+async def run(campaign_id: int, donations: int) -> bool:
+    await init_db()
+    try:
+        supabase = get_supabase_admin()
+        campaign_service = CampaignService(supabase)
+
+        start_amount = await get_current_amount(supabase, campaign_id)
+        print(f"💰 Starting total: {start_amount}")
+
+        print(f"🚀 Firing {donations} parallel donations of {DONATION_AMOUNT}...")
+        results = await asyncio.gather(*(
+            campaign_service.update_campaign_amount(campaign_id, DONATION_AMOUNT)
+            for _ in range(donations)
+        ))
+        failed = results.count(False)
+
+        end_amount = await get_current_amount(supabase, campaign_id)
+        expected = start_amount + DONATION_AMOUNT * donations
+        print(f"💰 Final total: {end_amount} (expected {expected}, {failed} failed calls)")
+
+        # Put the campaign back where it was
+        await campaign_service.update_campaign_amount(campaign_id, -(DONATION_AMOUNT * donations))
+
+        if failed == 0 and end_amount == expected:
+            print("✅ No lost updates")
+            return True
+        print("❌ Donation total drifted under concurrency")
+        return False
+    finally:
+        await close_db()
+
+
+def main():
+    """Main test function"""
+    if len(sys.argv) < 2:
+        print(__doc__)
+        return False
+
+    campaign_id = int(sys.argv[1])
+    donations = int(sys.argv[2]) if len(sys.argv) > 2 else 300
+
+    print("🎯 Fundraising Platform Backend - Donation Concurrency Test")
+    print("=" * 60)
+    return asyncio.run(run(campaign_id, donations))
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
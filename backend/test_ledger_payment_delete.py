@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Test script for deleting payments that have donation ledger entries
+Creates a completed payment on a campaign, records it in the ledger through
+increment_campaign_amount, deletes it the way the admin API does and checks
+that the delete succeeds while the ledger entry survives, detached from the
+deleted payment.
+
+Usage: python test_ledger_payment_delete.py <campaign_id>
+"""
+
+import asyncio
+import sys
+from datetime import datetime
+from decimal import Decimal
+from pathlib import Path
+
+# Add the backend directory to Python path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.core.database import init_db, close_db, get_supabase_admin
+from app.services.admin_service import AdminService
+from app.services.payment_service import PaymentService
+
+PAYMENT_AMOUNT = Decimal("2.50")
+
+
+async def run(campaign_id: int) -> bool:
+    await init_db()
+    try:
+        supabase = get_supabase_admin()
+        payment_service = PaymentService(supabase)
+
+        print("💳 Creating a completed payment...")
+        result = await supabase.table("campaign_payments").insert({
+            "campaign_id": campaign_id,
+            "donor_email": "ledger-delete-test@example.com",
+            "donor_name": "Ledger Delete Test",
+            "amount": str(PAYMENT_AMOUNT),
+            "method": "credit_card",
+            "status": "completed",
+            "processed_at": datetime.utcnow().isoformat()
+        }).execute()
+        payment_id = result.data[0]["id"]
+
+        await payment_service._update_campaign_amount(campaign_id, PAYMENT_AMOUNT, payment_id)
+        entries = await supabase.table("donation_ledger").select("id").eq("payment_id", payment_id).execute()
+        if not entries.data:
+            print("❌ increment_campaign_amount did not write a ledger entry")
+            return False
+        entry_id = entries.data[0]["id"]
+        print(f"📒 Ledger entry {entry_id} recorded for payment {payment_id}")
+
+        print("🗑️  Deleting the payment...")
+        deleted = await AdminService(supabase).delete_payment(payment_id)
+
+        # Take the donation back off the campaign whatever happened
+        await payment_service._update_campaign_amount(campaign_id, -PAYMENT_AMOUNT)
+
+        if not deleted:
+            print("❌ Payment with a ledger entry could not be deleted")
+            return False
+
+        entry = await supabase.table("donation_ledger").select("*").eq("id", entry_id).execute()
+        if not entry.data or entry.data[0]["payment_id"] is not None:
+            print(f"❌ Ledger entry after delete: {entry.data}")
+            return False
+        if entry.data[0]["amount_cents"] != int(PAYMENT_AMOUNT * 100):
+            print(f"❌ Ledger entry changed: {entry.data[0]}")
+            return False
+
+        print("✅ Payment deleted, ledger entry kept and detached")
+        return True
+    finally:
+        await close_db()
+
+
+def main():
+    """Main test function"""
+    if len(sys.argv) < 2:
+        print(__doc__)
+        return False
+
+    print("🎯 Fundraising Platform Backend - Ledger Payment Delete Test")
+    print("=" * 60)
+    return asyncio.run(run(int(sys.argv[1])))
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
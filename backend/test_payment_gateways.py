@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Test script for the payment gateway clients
+Runs PaymentGatewayService against the local mock gateways and checks that
+PayPal tokens are cached, refreshed after rejection, and that concurrent
+payments share the pooled clients.
+"""
+
+import asyncio
+import socket
+import sys
+import time
+from decimal import Decimal
+from pathlib import Path
+
+# Add the backend directory to Python path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import uvicorn
+
+from app.core.config import settings
+from app.services.payment_gateways import (
+    PaymentGatewayService, close_gateway_clients, get_gateway_metrics
+)
+from mock_payment_gateways import app as mock_app
+
+PAYPAL_DONATIONS = 50
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def run() -> bool:
+    port = free_port()
+    base = f"http://127.0.0.1:{port}"
+    settings.STRIPE_API_BASE = f"{base}/stripe"
+    settings.PAYPAL_API_BASE = f"{base}/paypal"
+    settings.SQUARE_API_BASE = f"{base}/square"
+    settings.STRIPE_SECRET_KEY = "sk_test_mock"
+    settings.PAYPAL_CLIENT_ID = "mock-client"
+    settings.PAYPAL_CLIENT_SECRET = "mock-secret"
+    settings.SQUARE_ACCESS_TOKEN = "square-mock"
+
+    server = uvicorn.Server(uvicorn.Config(mock_app, host="127.0.0.1", port=port, log_level="warning"))
+    server_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+
+    counters = mock_app.state.counters
+    gateways = PaymentGatewayService()
+    success = True
+    try:
+        # Stripe and Square round trip
+        for gateway, create in (
+            ("stripe", gateways.process_stripe_payment),
+            ("square", gateways.process_square_payment),
+        ):
+            created = await create(Decimal("12.50"), source_id="cnon:card-nonce-ok")
+            verified = await gateways.verify_payment(gateway, created.get("transaction_id", ""))
+            if created["success"] and verified["success"] and verified["amount"] == 12.5:
+                print(f"✅ {gateway}: created and verified {created['transaction_id']}")
+            else:
+                print(f"❌ {gateway}: {created} / {verified}")
+                success = False
+
+        # Many concurrent PayPal donations should share a single OAuth token
+        start = time.perf_counter()
+        results = await asyncio.gather(*(
+            gateways.process_paypal_payment(Decimal("5.00")) for _ in range(PAYPAL_DONATIONS)
+        ))
+        elapsed = time.perf_counter() - start
+        ok = sum(1 for result in results if result["success"])
+        print(f"💳 {ok}/{PAYPAL_DONATIONS} PayPal donations in {elapsed:.2f}s, "
+              f"{counters['paypal_tokens']} token fetch(es)")
+        if ok != PAYPAL_DONATIONS or counters["paypal_tokens"] != 1:
+            print("❌ PayPal token was not reused")
+            success = False
+
+        # A revoked token is replaced once and the request retried
+        mock_app.state.valid_tokens.clear()
+        verified = await gateways.verify_payment("paypal", results[0]["transaction_id"])
+        if verified["success"] and counters["paypal_tokens"] == 2:
+            print("✅ Rejected PayPal token refreshed and request retried")
+        else:
+            print(f"❌ PayPal token refresh failed: {verified}")
+            success = False
+
+        print(f"📊 Gateway metrics: {get_gateway_metrics()}")
+    finally:
+        await close_gateway_clients()
+        server.should_exit = True
+        await server_task
+
+    return success
+
+
+def main():
+    """Main test function"""
+    print("🎯 Fundraising Platform Backend - Payment Gateway Test")
+    print("=" * 60)
+    success = asyncio.run(run())
+    print("✅ All gateway checks passed" if success else "❌ Some gateway checks failed")
+    return success
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Load test for payment webhook ingestion
+Acts as a stand-in Stripe: signs thousands of payment_intent events with
+STRIPE_WEBHOOK_SECRET (some of them redelivered) and replays them
+concurrently against /api/v1/payments/webhooks/stripe, then reports
+acknowledgement latency and how many duplicates were recognised.
+
+Usage: python test_webhook_load.py [events] [concurrency] [base_url]
+"""
+
+import asyncio
+import hashlib
+import hmac
+import json
+import random
+import sys
+import time
+import uuid
+from pathlib import Path
+
+# Add the backend directory to Python path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import httpx
+
+from app.core.config import settings
+
+DUPLICATE_RATIO = 0.2
+EVENT_TYPES = ["payment_intent.succeeded", "payment_intent.payment_failed", "charge.refunded"]
+
+
+def make_event() -> bytes:
+    """A Stripe-shaped event for an intent the platform does not know about"""
+    intent_id = f"pi_load_{uuid.uuid4().hex[:20]}"
+    event_type = random.choice(EVENT_TYPES)
+    obj = {"id": intent_id, "metadata": {}}
+    if event_type.startswith("charge."):
+        obj = {"id": f"ch_{uuid.uuid4().hex[:20]}", "payment_intent": intent_id}
+    event = {"id": f"evt_load_{uuid.uuid4().hex}", "type": event_type, "data": {"object": obj}}
+    return json.dumps(event, separators=(",", ":")).encode("utf-8")
+
+
+def sign(body: bytes, secret: str) -> str:
+    timestamp = int(time.time())
+    signature = hmac.new(secret.encode("utf-8"), f"{timestamp}.".encode("utf-8") + body, hashlib.sha256).hexdigest()
+    return f"t={timestamp},v1={signature}"
+
+
+def percentile(values, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+async def run(events: int, concurrency: int, base_url: str) -> bool:
+    secret = settings.STRIPE_WEBHOOK_SECRET
+    if not secret:
+        print("❌ STRIPE_WEBHOOK_SECRET must be set (and match the running backend)")
+        return False
+
+    unique = [make_event() for _ in range(int(events * (1 - DUPLICATE_RATIO)))]
+    deliveries = unique + random.choices(unique, k=events - len(unique))
+    random.shuffle(deliveries)
+
+    url = f"{base_url.rstrip('/')}/api/v1/payments/webhooks/stripe"
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    statuses = {}
+    duplicates = 0
+
+    async with httpx.AsyncClient(timeout=30.0, limits=httpx.Limits(max_connections=concurrency)) as client:
+        async def deliver(body: bytes):
+            nonlocal duplicates
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.post(url, content=body, headers={
+                    "Content-Type": "application/json",
+                    "Stripe-Signature": sign(body, secret)
+                })
+                latencies.append((time.perf_counter() - start) * 1000)
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+                if response.status_code == 200 and response.json().get("duplicate"):
+                    duplicates += 1
+
+        print(f"🚀 Replaying {events} events ({len(unique)} unique) with concurrency {concurrency}...")
+        start = time.perf_counter()
+        await asyncio.gather(*(deliver(body) for body in deliveries))
+        elapsed = time.perf_counter() - start
+
+    print(f"📊 {events / elapsed:,.0f} events/s over {elapsed:.2f}s, status codes {statuses}")
+    print(f"⏱️  ack latency p50 {percentile(latencies, 0.5):.1f}ms, "
+          f"p95 {percentile(latencies, 0.95):.1f}ms, p99 {percentile(latencies, 0.99):.1f}ms")
+    print(f"🔁 {duplicates} duplicates acknowledged (expected {events - len(unique)})")
+
+    if statuses.get(200, 0) == events and duplicates == events - len(unique):
+        print("✅ Every event acknowledged exactly once")
+        return True
+    print("❌ Some events were rejected or double-counted")
+    return False
+
+
+def main():
+    """Main test function"""
+    events = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    base_url = sys.argv[3] if len(sys.argv) > 3 else settings.BACKEND_URL
+
+    print("🎯 Fundraising Platform Backend - Webhook Load Test")
+    print("=" * 60)
+    return asyncio.run(run(events, concurrency, base_url))
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
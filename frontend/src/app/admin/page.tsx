@@ -1,13 +1,15 @@
 "use client";
 import React, { useEffect, useState, useRef } from "react";
 import { useRouter } from "next/navigation";
-import { apiFetch } from "@/lib/api";
-import type { Campaign, User } from "@/types/api";
+import { apiFetch, withPage, CampaignAPI } from "@/lib/api";
+import type { Campaign, Page, User } from "@/types/api";
 import { useAuth } from "@/context/AuthContext";
 import Swal from "sweetalert2";
 import StudentProfileModal from "@/components/StudentProfileModal";
 import AdminSidebar from "@/components/AdminSidebar";
 
+const ADMIN_PAGE_SIZE = 50;
+
 interface PlatformStats {
   total_users: number;
   total_campaigns: number;
@@ -23,6 +25,10 @@ export default function AdminDashboard() {
   const [stats, setStats] = useState<PlatformStats | null>(null);
   const [campaigns, setCampaigns] = useState<Campaign[]>([]);
   const [users, setUsers] = useState<User[]>([]);
+  // next_cursor of the last page loaded; null once everything is shown
+  const [campaignsCursor, setCampaignsCursor] = useState<string | null>(null);
+  const [usersCursor, setUsersCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [activeTab, setActiveTab] = useState<'overview' | 'campaigns' | 'users'>('overview');
   const [selectedCampaign, setSelectedCampaign] = useState<Campaign | null>(null);
   const [showCreate, setShowCreate] = useState(false);
@@ -87,17 +93,19 @@ export default function AdminDashboard() {
     const loadData = async () => {
       try {
         console.log("Loading admin data...");
-        const [statsData, campaignsData, usersData] = await Promise.all([
+        const [statsData, campaignsPage, usersPage] = await Promise.all([
           apiFetch<PlatformStats>(`/admin/stats`, { token }),
-          apiFetch<Campaign[]>(`/admin/campaigns`, { token }),
-          apiFetch<User[]>(`/admin/users`, { token }),
+          apiFetch<Page<Campaign>>(withPage(`/admin/campaigns`, { limit: ADMIN_PAGE_SIZE }), { token }),
+          apiFetch<Page<User>>(withPage(`/admin/users`, { limit: ADMIN_PAGE_SIZE }), { token }),
         ]);
         
-        console.log("Admin data loaded:", { statsData, campaignsData, usersData });
+        console.log("Admin data loaded:", { statsData, campaignsPage, usersPage });
         
         setStats(statsData);
-        setCampaigns(Array.isArray(campaignsData) ? campaignsData : []);
-        setUsers(Array.isArray(usersData) ? usersData : []);
+        setCampaigns(campaignsPage?.items ?? []);
+        setCampaignsCursor(campaignsPage?.next_cursor ?? null);
+        setUsers(usersPage?.items ?? []);
+        setUsersCursor(usersPage?.next_cursor ?? null);
       } catch (e) {
         console.error("Error loading admin data:", e);
         setError(e instanceof Error ? e.message : "Failed to load admin data");
@@ -109,15 +117,56 @@ export default function AdminDashboard() {
     loadData();
   }, [token, user, router]);
 
+  const loadMoreCampaigns = async () => {
+    if (!campaignsCursor || loadingMore) return;
+    setLoadingMore(true);
+    try {
+      const page = await apiFetch<Page<Campaign>>(
+        withPage(`/admin/campaigns`, { limit: ADMIN_PAGE_SIZE, cursor: campaignsCursor }),
+        { token }
+      );
+      setCampaigns((prev) => [...prev, ...(page?.items ?? [])]);
+      setCampaignsCursor(page?.next_cursor ?? null);
+    } catch (e) {
+      setError(e instanceof Error ? e.message : "Failed to load campaigns");
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
+  const loadMoreUsers = async () => {
+    if (!usersCursor || loadingMore) return;
+    setLoadingMore(true);
+    try {
+      const page = await apiFetch<Page<User>>(
+        withPage(`/admin/users`, { limit: ADMIN_PAGE_SIZE, cursor: usersCursor }),
+        { token }
+      );
+      setUsers((prev) => [...prev, ...(page?.items ?? [])]);
+      setUsersCursor(page?.next_cursor ?? null);
+    } catch (e) {
+      setError(e instanceof Error ? e.message : "Failed to load users");
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
+  // Admin actions change one known row, so update it in place instead of reloading the list
+  const patchCampaign = (campaignId: number, changes: Partial<Campaign>) => {
+    setCampaigns((prev) => prev.map((c) => (c.id === campaignId ? { ...c, ...changes } : c)));
+  };
+
+  const patchUser = (userId: number, changes: Partial<User>) => {
+    setUsers((prev) => prev.map((u) => (u.id === userId ? { ...u, ...changes } : u)));
+  };
+
   const handleFeatureCampaign = async (campaignId: number) => {
     try {
       await apiFetch(`/admin/campaigns/${campaignId}/feature`, { 
         method: "POST", 
         token 
       });
-      // Reload campaigns to show updated status
-      const campaignsData = await apiFetch<Campaign[]>(`/admin/campaigns`, { token });
-      setCampaigns(Array.isArray(campaignsData) ? campaignsData : []);
+      patchCampaign(campaignId, { is_featured: true });
     } catch (e) {
       setError(e instanceof Error ? e.message : "Failed to feature campaign");
     }
@@ -129,8 +178,7 @@ export default function AdminDashboard() {
         method: "POST",
         token,
       });
-      const campaignsData = await apiFetch<Campaign[]>(`/admin/campaigns`, { token });
-      setCampaigns(Array.isArray(campaignsData) ? campaignsData : []);
+      patchCampaign(campaignId, { status: "closed", is_featured: false });
     } catch (e) {
       setError(e instanceof Error ? e.message : "Failed to close campaign");
     }
@@ -160,16 +208,9 @@ export default function AdminDashboard() {
       const response = await CampaignAPI.createWithImage(formData, token as string);
       console.log("Campaign created successfully:", response);
       
-      // Refresh all data
-      const [statsData, campaignsData, usersData] = await Promise.all([
-        apiFetch<PlatformStats>(`/admin/stats`, { token }),
-        apiFetch<Campaign[]>(`/admin/campaigns`, { token }),
-        apiFetch<User[]>(`/admin/users`, { token }),
-      ]);
-      
-      setStats(statsData);
-      setCampaigns(Array.isArray(campaignsData) ? campaignsData : []);
-      setUsers(Array.isArray(usersData) ? usersData : []);
+      // The list is newest first, so the new campaign goes on top
+      setCampaigns((prev) => [response as Campaign, ...prev]);
+      setStats(await apiFetch<PlatformStats>(`/admin/stats`, { token }));
       
       setShowCreate(false);
       setCreateForm({ title: "", description: "", goal_amount: 1000, duration_months: "3", category: "", image_url: "", video_url: "", story: "" });
@@ -249,9 +290,7 @@ export default function AdminDashboard() {
         body: backendData,
       });
       
-      // Reload users to show updated data
-      const usersData = await apiFetch<User[]>(`/admin/users`, { token });
-      setUsers(Array.isArray(usersData) ? usersData : []);
+      patchUser(editingStudent.id, { ...studentForm });
       
       setShowStudentForm(false);
       setEditingStudent(null);
@@ -624,9 +663,7 @@ export default function AdminDashboard() {
                                 const response = await apiFetch(`/admin/campaigns/${campaign.id}/status/active`, { method: 'POST', token });
                                 console.log("Campaign approved:", response);
                                 
-                                // Reload campaigns
-                                const campaignsData = await apiFetch<Campaign[]>(`/admin/campaigns`, { token });
-                                setCampaigns(Array.isArray(campaignsData) ? campaignsData : []);
+                                patchCampaign(campaign.id, { status: 'active' });
                                 
                                 Swal.fire({
                                   title: 'Success!',
@@ -656,9 +693,7 @@ export default function AdminDashboard() {
                                 const response = await apiFetch(`/admin/campaigns/${campaign.id}/status/cancelled`, { method: 'POST', token });
                                 console.log("Campaign rejected:", response);
                                 
-                                // Reload campaigns
-                                const campaignsData = await apiFetch<Campaign[]>(`/admin/campaigns`, { token });
-                                setCampaigns(Array.isArray(campaignsData) ? campaignsData : []);
+                                patchCampaign(campaign.id, { status: 'cancelled' });
                                 
                                 Swal.fire({
                                   title: 'Campaign Rejected',
@@ -770,10 +805,7 @@ export default function AdminDashboard() {
                             const response = await apiFetch(`/admin/campaigns/${campaign.id}/status/${next}`, { method: 'POST', token });
                             console.log("Status update response:", response);
                             
-                            // Reload campaigns to show updated status
-                            const campaignsData = await apiFetch<Campaign[]>(`/admin/campaigns`, { token });
-                            console.log("Reloaded campaigns:", campaignsData);
-                            setCampaigns(Array.isArray(campaignsData) ? campaignsData : []);
+                            patchCampaign(campaign.id, { status: next });
                             
                             // Show success message
                             Swal.fire({
@@ -811,6 +843,18 @@ export default function AdminDashboard() {
               ))}
             </div>
 
+            {campaignsCursor && (
+              <div className="text-center">
+                <button
+                  onClick={loadMoreCampaigns}
+                  disabled={loadingMore}
+                  className="btn-primary disabled:opacity-50 disabled:cursor-not-allowed"
+                >
+                  {loadingMore ? "Loading..." : "Load more campaigns"}
+                </button>
+              </div>
+            )}
+
             {/* Empty State */}
             {campaigns.length === 0 && (
               <div className="text-center py-12">
@@ -842,7 +886,7 @@ export default function AdminDashboard() {
                   <p className="mt-1 text-white/90">Manage user accounts and permissions</p>
                 </div>
                 <div className="bg-white/20 rounded-lg px-4 py-2 backdrop-blur-sm border border-white/20">
-                  <span className="text-sm font-medium">{users.length} Total Users</span>
+                  <span className="text-sm font-medium">{stats?.total_users ?? users.length} Total Users</span>
                 </div>
               </div>
             </div>
@@ -944,6 +988,18 @@ export default function AdminDashboard() {
               ))}
             </div>
 
+            {usersCursor && (
+              <div className="text-center">
+                <button
+                  onClick={loadMoreUsers}
+                  disabled={loadingMore}
+                  className="btn-primary disabled:opacity-50 disabled:cursor-not-allowed"
+                >
+                  {loadingMore ? "Loading..." : "Load more users"}
+                </button>
+              </div>
+            )}
+
             {/* Empty State */}
             {users.length === 0 && (
               <div className="text-center py-12">
@@ -1,6 +1,6 @@
 import { CampaignAPI, PaymentAPI, MilestoneAPI, ShoutoutAPI } from "@/lib/api";
 import { use } from "react";
-import type { Campaign, Payment, Milestone, Shoutout } from "@/types/api";
+import type { Campaign, Page, Payment, Milestone, Shoutout } from "@/types/api";
 import Link from "next/link";
 import DonateButton from "@/components/DonateButton";
 import CloseCampaignButton from "@/components/CloseCampaignButton";
@@ -28,7 +28,7 @@ interface Params {
 async function getData(id: string) {
   const [campaign, payments, milestones, shoutouts] = await Promise.all([
     CampaignAPI.get(id),
-    PaymentAPI.forCampaign(Number(id)),
+    PaymentAPI.forCampaign(Number(id), { limit: 6 }),
     MilestoneAPI.forCampaign(Number(id)).catch(() => []),
     ShoutoutAPI.forCampaign(Number(id)).catch(() => []),
   ]);
@@ -42,7 +42,7 @@ export default function CampaignDetailPage({ params }: Params) {
 
 async function CampaignDetail({ id }: { id: string }) {
   const { campaign, payments, milestones, shoutouts } = await getData(id) as unknown as {
-    campaign: Campaign; payments: Payment[]; milestones: Milestone[]; shoutouts: Shoutout[];
+    campaign: Campaign; payments: Page<Payment>; milestones: Milestone[]; shoutouts: Shoutout[];
   };
   return (
     <div className="space-y-8">
@@ -93,13 +93,13 @@ async function CampaignDetail({ id }: { id: string }) {
           <div className="rounded border p-4">
             <h2 className="mb-3 text-lg font-semibold">Recent donations</h2>
             <ul className="space-y-2">
-              {payments.slice(0, 6).map((p: Payment) => (
+              {payments.items.map((p: Payment) => (
                 <li key={p.id} className="flex items-center justify-between text-sm">
                   <span className="truncate">{p.is_anonymous ? "Anonymous" : (p.donor_name || p.donor_email)}</span>
                   <span>${'{'}p.amount{'}'}</span>
                 </li>
               ))}
-              {payments.length === 0 && <li className="text-sm text-gray-500">No donations yet.</li>}
+              {payments.items.length === 0 && <li className="text-sm text-gray-500">No donations yet.</li>}
             </ul>
           </div>
         </div>
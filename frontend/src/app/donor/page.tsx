@@ -1,18 +1,27 @@
 import { PaymentAPI } from "@/lib/api";
 import { cookies } from "next/headers";
+import Link from "next/link";
 import type { Payment } from "@/types/api";
 
-export default async function DonorDashboard() {
+interface Props {
+  searchParams: Promise<{ cursor?: string }>;
+}
+
+export default async function DonorDashboard({ searchParams }: Props) {
+  const { cursor } = await searchParams;
   const cookieStore = cookies();
   // Auth is stored in localStorage on client; for server, show instruction if not available.
   const authCookie = cookieStore.get("auth");
   let payments: Payment[] = [];
+  let nextCursor: string | null = null;
   if (!authCookie) {
     // render a message to use client nav
   } else {
     try {
       const parsed = JSON.parse(authCookie.value) as { token: string; user: { id: number } };
-      payments = await PaymentAPI.forUser(parsed.user.id, parsed.token);
+      const page = await PaymentAPI.forUser(parsed.user.id, parsed.token, { cursor });
+      payments = page.items;
+      nextCursor = page.next_cursor;
     } catch {
       payments = [];
     }
@@ -34,6 +43,16 @@ export default async function DonorDashboard() {
             ))}
           </ul>
         )}
+        {(cursor || nextCursor) && (
+          <div className="mt-4 flex justify-between text-sm">
+            {cursor ? <Link href="/donor" className="text-[#00AFF0] hover:underline">← Newest</Link> : <span />}
+            {nextCursor && (
+              <Link href={`/donor?cursor=${encodeURIComponent(nextCursor)}`} className="text-[#00AFF0] hover:underline">
+                Older donations →
+              </Link>
+            )}
+          </div>
+        )}
       </div>
     </div>
   );
@@ -1,17 +1,20 @@
+import type { Page, Payment } from "@/types/api";
+
 export const API_BASE_URL = process.env.NEXT_PUBLIC_API_BASE_URL || "http://localhost:8000/api/v1";
 
 export type HttpMethod = "GET" | "POST" | "PUT" | "DELETE" | "PATCH";
 
-export async function apiFetch<T>(
-  path: string,
-  options: {
-    method?: HttpMethod;
-    body?: unknown;
-    token?: string | null;
-    headers?: Record<string, string>;
-    cache?: RequestCache;
-  } = {}
-): Promise<T> {
+export const NEXT_CURSOR_HEADER = "X-Next-Cursor";
+
+type ApiFetchOptions = {
+  method?: HttpMethod;
+  body?: unknown;
+  token?: string | null;
+  headers?: Record<string, string>;
+  cache?: RequestCache;
+};
+
+async function apiRequest<T>(path: string, options: ApiFetchOptions = {}): Promise<{ data: T; headers: Headers }> {
   const { method = "GET", body, token, headers = {}, cache } = options;
   const url = `${API_BASE_URL}${path}`;
   const finalHeaders: Record<string, string> = {
@@ -35,10 +38,34 @@ export async function apiFetch<T>(
   }
   const contentType = res.headers.get("content-type");
   if (contentType && contentType.includes("application/json")) {
-    return (await res.json()) as T;
+    return { data: (await res.json()) as T, headers: res.headers };
   }
   // @ts-expect-error allow non-json responses
-  return undefined as T;
+  return { data: undefined as T, headers: res.headers };
+}
+
+export async function apiFetch<T>(path: string, options: ApiFetchOptions = {}): Promise<T> {
+  return (await apiRequest<T>(path, options)).data;
+}
+
+export interface PageParams {
+  cursor?: string | null;
+  limit?: number;
+}
+
+// Append keyset pagination params; pass a page's next_cursor back as cursor
+export function withPage(path: string, params: PageParams = {}): string {
+  const query = new URLSearchParams();
+  if (params.limit) query.set("limit", String(params.limit));
+  if (params.cursor) query.set("cursor", params.cursor);
+  const qs = query.toString();
+  return qs ? `${path}${path.includes("?") ? "&" : "?"}${qs}` : path;
+}
+
+// One page of a list endpoint that returns a plain array and the next cursor in X-Next-Cursor
+async function fetchHeaderPage<T>(path: string, params: PageParams = {}, options: ApiFetchOptions = {}): Promise<Page<T>> {
+  const { data, headers } = await apiRequest<T[]>(withPage(path, params), options);
+  return { items: data ?? [], next_cursor: headers.get(NEXT_CURSOR_HEADER) };
 }
 
 export interface LoginResponse {
@@ -113,8 +140,10 @@ export const PaymentAPI = {
     is_anonymous?: boolean;
     message?: string;
   }, token?: string | null) => apiFetch(`/payments/`, { method: "POST", body: data, token: token || null }),
-  forCampaign: (campaignId: number) => apiFetch(`/payments/campaign/${campaignId}`),
-  forUser: (userId: number, token: string) => apiFetch(`/payments/user/${userId}`, { token }),
+  forCampaign: (campaignId: number, params?: PageParams) =>
+    fetchHeaderPage<Payment>(`/payments/campaign/${campaignId}`, params),
+  forUser: (userId: number, token: string, params?: PageParams) =>
+    fetchHeaderPage<Payment>(`/payments/user/${userId}`, params, { token }),
 };
 
 export const ReferralAPI = {
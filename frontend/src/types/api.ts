@@ -76,4 +76,8 @@ export interface Shoutout {
   created_at: string;
 }
 
+export interface Page<T> {
+  items: T[];
+  next_cursor: string | null;
+}
 